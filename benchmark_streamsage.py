@@ -0,0 +1,209 @@
+"""
+Latency benchmark for StreamSage's LLM-backed mode functions.
+
+Drives every mode's backend function against an OpenAI-compatible endpoint
+(by default the bundled mock server, started in-process) and reports p50,
+p95 and p99 latency and throughput per mode.
+
+Usage:
+    python benchmark_streamsage.py --iterations 20 --concurrency 4
+    python benchmark_streamsage.py --stream --latency 0.5 --tokens-per-second 60
+    python benchmark_streamsage.py --base-url http://127.0.0.1:8900/v1 --json results.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from mock_openai_server import MockOpenAIServer, add_mock_arguments, settings_from_args
+
+SAMPLE_CODE = '''import streamlit as st
+import pandas as pd
+import requests
+
+API_KEY = "sk-hardcoded"
+data = requests.get("https://example.com/data.json").json()
+
+def load(path):
+    return pd.read_csv(path)
+
+st.title("Sales dashboard")
+df = load("sales.csv")
+for region in df["region"].unique():
+    st.write(region, df[df["region"] == region]["revenue"].sum())
+query = st.text_input("SQL filter")
+st.dataframe(pd.read_csv("sales.csv").query(query))
+'''
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of `values` (pct in 0-100)."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def build_modes(streamsage, run_id, warm):
+    """Map each mode name to a callable(iteration, on_token) exercising its backend function."""
+    temperature = streamsage.TEMPERATURE_DEFAULT
+    max_tokens = streamsage.MAX_TOKENS_DEFAULT
+    latest_updates = streamsage.load_streamlit_updates()
+
+    def tag(iteration):
+        # Unique inputs defeat the response caches unless --warm is given
+        return "" if warm else f" [{run_id}-{iteration}]"
+
+    return {
+        "chat": lambda i, on_token: streamsage.on_chat_submit(
+            f"How do I cache a database connection?{tag(i)}", latest_updates, temperature, max_tokens, on_token=on_token),
+        "code_generator": lambda i, on_token: streamsage.generate_streamlit_app(
+            f"a todo list app with categories{tag(i)}", temperature, max_tokens, _on_token=on_token),
+        "project_analyzer": lambda i, on_token: streamsage.analyze_streamlit_project(
+            SAMPLE_CODE + f"# {tag(i)}\n", temperature, max_tokens, _on_token=on_token),
+        "performance_profiler": lambda i, on_token: streamsage.analyze_performance(
+            SAMPLE_CODE + f"# {tag(i)}\n", temperature, max_tokens, _on_token=on_token),
+        "security_scanner": lambda i, on_token: streamsage.analyze_security(
+            SAMPLE_CODE + f"# {tag(i)}\n", temperature, max_tokens, _on_token=on_token),
+        "template_library": lambda i, on_token: streamsage.generate_template(
+            f"📊 Data Dashboard{tag(i)}", temperature, max_tokens, _on_token=on_token),
+        "deployment_assistant": lambda i, on_token: streamsage.generate_deployment_guide(
+            f"🐳 Docker{tag(i)}", temperature, max_tokens, _on_token=on_token),
+    }
+
+
+def run_mode(call, iterations, concurrency, stream):
+    """Run one mode `iterations` times with `concurrency` workers and collect timings."""
+    latencies = []
+    first_tokens = []
+    errors = []
+    lock = threading.Lock()
+
+    def one(iteration):
+        started = time.perf_counter()
+        first_token = []
+
+        def on_token(delta):
+            if not first_token:
+                first_token.append(time.perf_counter() - started)
+
+        try:
+            result = call(iteration, on_token if stream else None)
+            failed = result is None or (isinstance(result, str) and result.startswith("Error"))
+        except Exception as e:
+            failed = True
+            result = str(e)
+        elapsed = time.perf_counter() - started
+        with lock:
+            if failed:
+                errors.append(str(result)[:200])
+            else:
+                latencies.append(elapsed)
+                if first_token:
+                    first_tokens.append(first_token[0])
+
+    wall_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(iterations)))
+    wall = time.perf_counter() - wall_started
+
+    return {
+        "requests": iterations,
+        "errors": len(errors),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "mean": sum(latencies) / len(latencies) if latencies else float("nan"),
+        "ttft_p50": percentile(first_tokens, 50) if first_tokens else None,
+        "throughput": len(latencies) / wall if wall > 0 else float("nan"),
+        "sample_errors": errors[:3],
+    }
+
+
+def print_report(results, args):
+    print()
+    print(f"StreamSage benchmark: {args.iterations} requests/mode, concurrency {args.concurrency}, "
+          f"{'streaming' if args.stream else 'non-streaming'}, {'warm' if args.warm else 'cold'} caches")
+    header = f"{'mode':<22}{'ok':>5}{'err':>5}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}{'ttft s':>9}{'req/s':>9}"
+    print(header)
+    print("-" * len(header))
+    for mode, stats in results.items():
+        ttft = f"{stats['ttft_p50']:.3f}" if stats["ttft_p50"] is not None else "-"
+        print(f"{mode:<22}{stats['requests'] - stats['errors']:>5}{stats['errors']:>5}"
+              f"{stats['p50']:>9.3f}{stats['p95']:>9.3f}{stats['p99']:>9.3f}{ttft:>9}{stats['throughput']:>9.2f}")
+    for mode, stats in results.items():
+        for error in stats["sample_errors"]:
+            print(f"  {mode} error: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark StreamSage's LLM-backed mode functions.")
+    parser.add_argument("--iterations", type=int, default=20, help="Requests per mode (default: 20)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent requests per mode (default: 4)")
+    parser.add_argument("--modes", nargs="*", help="Only run these modes")
+    parser.add_argument("--stream", action="store_true", help="Use streaming and report time to first token")
+    parser.add_argument("--warm", action="store_true", help="Repeat identical inputs so the response caches are hit")
+    parser.add_argument("--base-url", help="Use this OpenAI-compatible endpoint instead of the bundled mock")
+    parser.add_argument("--rpm", type=int, default=100000, help="Client-side requests/minute limit during the run")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    server = None
+    if args.base_url:
+        base_url = args.base_url
+    else:
+        server = MockOpenAIServer(settings=settings_from_args(args)).start()
+        base_url = server.base_url
+
+    # streamsage reads its configuration at import time
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ["STREAMSAGE_RPM_LIMIT"] = str(args.rpm)
+    os.environ["STREAMSAGE_TPM_LIMIT"] = str(args.rpm * 10000)
+    cache_dir = tempfile.mkdtemp(prefix="streamsage-bench-")
+    os.environ["STREAMSAGE_RESPONSE_CACHE"] = os.path.join(cache_dir, "llm_responses.sqlite3")
+
+    import streamsage
+    # Bare-mode Streamlit warns about the missing script context on every worker thread
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("streamlit"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+    streamsage.initialize_session_state()
+
+    modes = build_modes(streamsage, uuid.uuid4().hex[:6], args.warm)
+    selected = args.modes or list(modes)
+    unknown = set(selected) - set(modes)
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(sorted(unknown))} (choose from {', '.join(modes)})")
+
+    results = {}
+    for mode in selected:
+        results[mode] = run_mode(modes[mode], args.iterations, args.concurrency, args.stream)
+
+    print_report(results, args)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"settings": vars(args), "base_url": base_url, "results": results}, f, indent=2)
+    if server is not None:
+        print(f"\nMock server: {server.settings.requests_served} requests, "
+              f"{server.settings.errors_injected} injected errors")
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Measure how many bytes StreamSage sends to the browser per rerun.
+
+Runs streamsage.py headlessly with Streamlit's AppTest, walks through every
+sidebar mode and records the ForwardMsgs each rerun produces. Sizes are
+reported both raw and after Streamlit's per-session message cache, which
+replaces large elements the browser has already seen with a hash reference.
+
+Usage:
+    python measure_rerun_payload.py                  # theme served from /app/static
+    python measure_rerun_payload.py --inline-theme   # theme CSS inlined on every rerun (old behaviour)
+    python measure_rerun_payload.py --reruns 5 --json payload.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+
+from mock_openai_server import MockOpenAIServer
+
+MODES = (
+    "API Configuration",
+    "Latest Updates",
+    "Chat with StreamSage",
+    "Code Generator",
+    "Project Analyzer",
+    "Performance Profiler",
+    "Security Scanner",
+    "Full Audit",
+    "Template Library",
+    "Deployment Assistant",
+)
+
+
+class PayloadRecorder:
+    """Collect the ForwardMsgs of every AppTest run and size them like the server would."""
+
+    def __init__(self):
+        self.runs = []
+        self.seen_hashes = set()
+
+    def install(self):
+        from streamlit.runtime.forward_msg_cache import create_reference_msg, populate_hash_if_needed
+        from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+        recorder = self
+        original_run = LocalScriptRunner.run
+
+        def run(runner, *args, **kwargs):
+            tree = original_run(runner, *args, **kwargs)
+            raw = sent = 0
+            for msg in runner.forward_msgs():
+                populate_hash_if_needed(msg)
+                size = msg.ByteSize()
+                raw += size
+                if msg.metadata.cacheable and msg.hash in recorder.seen_hashes:
+                    size = create_reference_msg(msg).ByteSize()
+                elif msg.metadata.cacheable:
+                    recorder.seen_hashes.add(msg.hash)
+                sent += size
+            recorder.runs.append({"messages": len(runner.forward_msgs()), "raw_bytes": raw, "sent_bytes": sent})
+            return tree
+
+        LocalScriptRunner.run = run
+
+    def take(self, label):
+        run = dict(self.runs[-1], label=label)
+        self.runs[-1] = run
+        return run
+
+
+def measure(reruns):
+    from streamlit.testing.v1 import AppTest
+
+    recorder = PayloadRecorder()
+    recorder.install()
+    app = AppTest.from_file("streamsage.py", default_timeout=60)
+
+    results = []
+    app.run()
+    results.append(recorder.take("first load"))
+    for mode in MODES:
+        app.sidebar.radio(key="mode_selection").set_value(mode).run()
+        results.append(recorder.take(f"switch to {mode}"))
+        for index in range(reruns):
+            app.run()
+            results.append(recorder.take(f"rerun {mode} #{index + 1}"))
+        if app.exception:
+            raise RuntimeError(f"{mode}: {app.exception[0].message}")
+    return results
+
+
+def summarize(results):
+    reruns = [r for r in results if r["label"].startswith("rerun")]
+    switches = [r for r in results if r["label"].startswith("switch")]
+
+    def mean(rows, field):
+        return sum(r[field] for r in rows) / len(rows) if rows else 0.0
+
+    return {
+        "first_load_raw": results[0]["raw_bytes"],
+        "first_load_sent": results[0]["sent_bytes"],
+        "mode_switch_raw_mean": mean(switches, "raw_bytes"),
+        "mode_switch_sent_mean": mean(switches, "sent_bytes"),
+        "rerun_raw_mean": mean(reruns, "raw_bytes"),
+        "rerun_sent_mean": mean(reruns, "sent_bytes"),
+        "total_sent": sum(r["sent_bytes"] for r in results),
+    }
+
+
+def print_report(results, summary, args):
+    print()
+    print(f"StreamSage rerun payload ({'inline' if args.inline_theme else 'static'} theme CSS)")
+    header = f"{'run':<40}{'msgs':>6}{'raw B':>10}{'sent B':>10}"
+    print(header)
+    print("-" * len(header))
+    for run in results:
+        print(f"{run['label'][:39]:<40}{run['messages']:>6}{run['raw_bytes']:>10}{run['sent_bytes']:>10}")
+    print()
+    print(f"first load:   {summary['first_load_raw']:>9} B raw, {summary['first_load_sent']:>9} B sent")
+    print(f"mode switch:  {summary['mode_switch_raw_mean']:>9.0f} B raw, {summary['mode_switch_sent_mean']:>9.0f} B sent (mean)")
+    print(f"plain rerun:  {summary['rerun_raw_mean']:>9.0f} B raw, {summary['rerun_sent_mean']:>9.0f} B sent (mean)")
+    print(f"whole session: {summary['total_sent']} B sent")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure bytes sent to the browser per StreamSage rerun.")
+    parser.add_argument("--inline-theme", action="store_true", help="Inline the theme CSS instead of linking it")
+    parser.add_argument("--reruns", type=int, default=2, help="Plain reruns per mode after switching to it (default: 2)")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    # No LLM calls are made, but the API key gate needs a reachable endpoint
+    server = MockOpenAIServer().start()
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-measure")
+    os.environ["STREAMSAGE_INLINE_THEME"] = "1" if args.inline_theme else "0"
+    cache_dir = tempfile.mkdtemp(prefix="streamsage-payload-")
+    os.environ["STREAMSAGE_RESPONSE_CACHE"] = os.path.join(cache_dir, "llm_responses.sqlite3")
+
+    try:
+        results = measure(args.reruns)
+    finally:
+        server.stop()
+
+    summary = summarize(results)
+    print_report(results, summary, args)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"settings": vars(args), "summary": summary, "runs": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
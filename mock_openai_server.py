@@ -0,0 +1,258 @@
+"""
+Local OpenAI-compatible stand-in for the chat completions endpoint.
+
+Serves ``POST /v1/chat/completions`` (streaming and non-streaming) with
+configurable latency, token rate and error injection, so StreamSage can be
+exercised and benchmarked without network access or API spend.
+
+Usage:
+    python mock_openai_server.py --port 8900 --latency 0.3 --tokens-per-second 80 --error-rate 0.05
+
+Point StreamSage at it with:
+    OPENAI_BASE_URL=http://127.0.0.1:8900/v1 OPENAI_API_KEY=sk-mock streamlit run streamsage.py
+"""
+
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LOREM_WORDS = (
+    "streamlit makes it easy to build data apps use st.cache_data for expensive loads "
+    "keep widgets keyed and session state small move heavy work out of the rerun path "
+    "prefer st.fragment for isolated updates and stream long responses to the user"
+).split()
+
+
+class MockSettings:
+    """Behaviour of the mock endpoint."""
+
+    def __init__(self, latency=0.2, latency_jitter=0.0, tokens_per_second=100.0, reply_tokens=120,
+                 error_rate=0.0, error_status=429, retry_after=1.0, seed=None):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.tokens_per_second = tokens_per_second
+        self.reply_tokens = reply_tokens
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests_served = 0
+        self.errors_injected = 0
+
+    def roll_error(self):
+        with self.lock:
+            self.requests_served += 1
+            if self.random.random() < self.error_rate:
+                self.errors_injected += 1
+                return True
+            return False
+
+    def first_token_delay(self):
+        with self.lock:
+            jitter = self.random.uniform(-self.latency_jitter, self.latency_jitter)
+        return max(0.0, self.latency + jitter)
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    """Request handler implementing the chat completions API shape."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    settings = MockSettings()
+
+    def log_message(self, format, *args):
+        logging.debug("mock-openai: " + format, *args)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/v1/models":
+            self._send_json(200, {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}})
+            return
+
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+            return
+
+        settings = self.settings
+        if settings.roll_error():
+            self._send_error(settings.error_status)
+            return
+
+        time.sleep(settings.first_token_delay())
+        words = self._reply_words(body)
+        if body.get("stream"):
+            self._stream_reply(body, words)
+        else:
+            if settings.tokens_per_second > 0:
+                time.sleep(len(words) / settings.tokens_per_second)
+            self._send_json(200, self._completion(body, " ".join(words)))
+
+    def _reply_words(self, body):
+        count = min(self.settings.reply_tokens, int(body.get("max_tokens") or self.settings.reply_tokens))
+        return [LOREM_WORDS[i % len(LOREM_WORDS)] for i in range(max(1, count))]
+
+    def _completion(self, body, text):
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in body.get("messages", []))
+        completion_tokens = len(text.split())
+        return {
+            "id": f"chatcmpl-mock-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def _stream_reply(self, body, words):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        chunk_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "gpt-4o-mini")
+        delay = 1.0 / self.settings.tokens_per_second if self.settings.tokens_per_second > 0 else 0.0
+        for index, word in enumerate(words):
+            delta = {"content": word if index == 0 else " " + word}
+            if index == 0:
+                delta["role"] = "assistant"
+            self._write_event(self._chunk(chunk_id, model, delta, None))
+            if delay:
+                time.sleep(delay)
+        self._write_event(self._chunk(chunk_id, model, {}, "stop"))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    @staticmethod
+    def _chunk(chunk_id, model, delta, finish_reason):
+        return {
+            "id": chunk_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+
+    def _write_event(self, payload):
+        self._write_chunk(f"data: {json.dumps(payload)}\n\n".encode())
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_error(self, status):
+        messages = {
+            429: ("Rate limit reached (injected by mock server)", "rate_limit_exceeded"),
+            500: ("Internal server error (injected by mock server)", "server_error"),
+            503: ("Service unavailable (injected by mock server)", "server_error"),
+        }
+        message, error_type = messages.get(status, ("Injected error", "server_error"))
+        headers = {"Retry-After": f"{self.settings.retry_after:g}"} if status == 429 else {}
+        self._send_json(status, {"error": {"message": message, "type": error_type, "code": error_type}}, headers)
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MockOpenAIServer:
+    """Run the mock endpoint on a background thread (for benchmarks and scripts)."""
+
+    def __init__(self, host="127.0.0.1", port=0, settings=None):
+        handler = type("ConfiguredMockOpenAIHandler", (MockOpenAIHandler,), {"settings": settings or MockSettings()})
+        self.settings = handler.settings
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def add_mock_arguments(parser):
+    """Register the mock behaviour options on an argument parser."""
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds before the first token (default: 0.2)")
+    parser.add_argument("--latency-jitter", type=float, default=0.0, help="Uniform +/- jitter on the latency in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=100.0, help="Reply token rate (default: 100)")
+    parser.add_argument("--reply-tokens", type=int, default=120, help="Reply length in tokens, capped by max_tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail (default: 0)")
+    parser.add_argument("--error-status", type=int, default=429, choices=[429, 500, 503], help="Status code of injected errors")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with injected 429s")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible error injection")
+
+
+def settings_from_args(args):
+    return MockSettings(
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        tokens_per_second=args.tokens_per_second,
+        reply_tokens=args.reply_tokens,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible chat completions stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = MockOpenAIServer(args.host, args.port, settings_from_args(args))
+    logging.info(f"Mock OpenAI server listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        logging.info(
+            f"Served {server.settings.requests_served} requests, injected {server.settings.errors_injected} errors"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Cold-start profile for StreamSage.
+
+Runs streamsage.py headlessly (Streamlit's AppTest) in a fresh interpreter
+started with ``python -X importtime``, once stopped at the API key gate and
+once with a key configured, and reports the wall time of the first run and of
+warm reruns together with the slowest imports triggered by the script itself
+(Streamlit's own startup is excluded).
+
+Usage:
+    python profile_startup.py
+    python profile_startup.py --scenarios gate --top 15 --reruns 5
+    python profile_startup.py --json startup.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+SCENARIOS = ("gate", "keyed")
+MARKER = "streamsage-startup-profile: script starts"
+
+
+def run_child(scenario, reruns):
+    """Inside the profiled interpreter: time the first run and the warm reruns of the app."""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file("streamsage.py", default_timeout=120)
+    sys.stderr.write(MARKER + "\n")
+    sys.stderr.flush()
+    started = time.perf_counter()
+    app.run()
+    first_run = time.perf_counter() - started
+
+    rerun_times = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        app.run()
+        rerun_times.append(time.perf_counter() - started)
+
+    result = {
+        "scenario": scenario,
+        "first_run": first_run,
+        "rerun_mean": sum(rerun_times) / len(rerun_times) if rerun_times else None,
+        "exception": app.exception[0].message if app.exception else None,
+        "gate_shown": any(t.key == "dynamic_api_input" for t in app.text_input),
+    }
+    print(json.dumps(result))
+    return 0
+
+
+def parse_importtime(stderr):
+    """Return (module, self_us, cumulative_us, depth) for every import logged after the marker."""
+    lines = stderr.splitlines()
+    if MARKER in lines:
+        lines = lines[lines.index(MARKER) + 1:]
+    imports = []
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            imports.append((name.strip(), int(self_us), int(cumulative_us), len(name) - len(name.lstrip()) - 1))
+        except ValueError:
+            continue  # header line
+    return imports
+
+
+def profile_scenario(scenario, reruns, base_url):
+    env = dict(os.environ, STREAMSAGE_UPDATES_REFRESH_SECONDS="0", STREAMSAGE_CHANGELOG_REFRESH_SECONDS="0")
+    env.pop("OPENAI_API_KEY", None)
+    if scenario == "keyed":
+        env["OPENAI_API_KEY"] = "sk-startup-profile"
+        env["OPENAI_BASE_URL"] = base_url
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--child", scenario, "--reruns", str(reruns)],
+        env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{scenario} run failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    imports = parse_importtime(proc.stderr)
+    # Only the outermost imports, so nested modules are not counted twice
+    top_level = [(name, cumulative) for name, _, cumulative, depth in imports if depth <= 1]
+    result["script_imports_ms"] = sum(cumulative for _, cumulative in top_level) / 1000
+    result["top_imports"] = sorted(top_level, key=lambda item: item[1], reverse=True)
+    return result
+
+
+def print_report(results, top):
+    for result in results:
+        print()
+        print(f"Scenario: {result['scenario']}" + (" (stopped at the API key gate)" if result["gate_shown"] else ""))
+        print(f"  first run:            {result['first_run'] * 1000:8.1f} ms")
+        if result["rerun_mean"] is not None:
+            print(f"  warm rerun (mean):    {result['rerun_mean'] * 1000:8.1f} ms")
+        print(f"  imports by script:    {result['script_imports_ms']:8.1f} ms")
+        if result["exception"]:
+            print(f"  exception: {result['exception']}")
+        for name, cumulative in result["top_imports"][:top]:
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile StreamSage's cold start and per-rerun import overhead.")
+    parser.add_argument("--scenarios", nargs="*", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--reruns", type=int, default=3, help="Warm reruns after the first run (default: 3)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list per scenario (default: 10)")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    if args.child:
+        return run_child(args.child, args.reruns)
+
+    from mock_openai_server import MockOpenAIServer
+
+    server = MockOpenAIServer().start()
+    try:
+        results = [profile_scenario(scenario, args.reruns, server.base_url) for scenario in args.scenarios]
+    finally:
+        server.stop()
+
+    print_report(results, args.top)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,31 +1,454 @@
-import openai
+import time
+
+SCRIPT_STARTED = time.perf_counter()
+SCRIPT_STARTED_CPU = time.thread_time()
+
 import streamlit as st
 import logging
-from PIL import Image, ImageEnhance
-import time
 import json
-import requests
+import html
 import base64
+import io
 import hashlib
+import importlib
+import contextlib
+import functools
+import sys
 import uuid
-from datetime import datetime
-from openai import OpenAI, OpenAIError
+import random
+import email.utils
+from datetime import datetime, timezone
 import os
-import psutil
 import platform
-from bs4 import BeautifulSoup
 import re
+import ast
+import sqlite3
+import threading
+import queue
+from collections import OrderedDict, Counter, deque
+import bisect
+from html.parser import HTMLParser
+import math
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Heavy dependencies (openai, httpx, requests, numpy, PIL, psutil, tiktoken) are
+# imported on first use through the accessors below, so a cold start that stops
+# at the API key gate never pays for them.
+TOP_LEVEL_IMPORT_SECONDS = time.perf_counter() - SCRIPT_STARTED
+
+class StartupProfile:
+    """
+    Process-wide record of cold-start import timings.
+
+    `cold_start` holds the top-level import time of the process's first
+    script run and `imports` the first-import time of every lazily loaded
+    module. Import overhead of later reruns is measured per run by
+    RerunProfile (its "imports" section).
+    """
+
+    def __init__(self):
+        self.created = time.time()
+        self.imports = {}  # module name -> seconds spent importing it
+        self.cold_start = None
+        self._lock = threading.Lock()
+
+    def record_cold_start(self, top_level_seconds):
+        """Record the top-level import time of the first script run (later calls are ignored)."""
+        with self._lock:
+            if self.cold_start is None:
+                self.cold_start = {"started": time.time(), "top_level_imports": top_level_seconds}
+
+    def record_import(self, module_name, seconds):
+        """Record the first import of a lazily loaded module."""
+        with self._lock:
+            self.imports.setdefault(module_name, seconds)
+
+    def summary(self):
+        """Return the cold-start record and the per-module first-import times, slowest first."""
+        with self._lock:
+            return {
+                "cold_start": dict(self.cold_start) if self.cold_start else None,
+                "lazy_imports": sum(self.imports.values()),
+                "imports": sorted(self.imports.items(), key=lambda item: item[1], reverse=True),
+            }
+
+@st.cache_resource(show_spinner=False)
+def get_startup_profile():
+    """Shared startup profile for the whole process."""
+    return StartupProfile()
+
+def lazy_import(module_name):
+    """Import `module_name` on first use, recording how long the import took."""
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    get_startup_profile().record_import(module_name, time.perf_counter() - started)
+    return module
+
+def openai_module():
+    return lazy_import("openai")
+
+def httpx_module():
+    return lazy_import("httpx")
+
+def requests_module():
+    return lazy_import("requests")
+
+def numpy_module():
+    return lazy_import("numpy")
+
+def psutil_module():
+    return lazy_import("psutil")
+
+def pil_image():
+    return lazy_import("PIL.Image")
+
+def tiktoken_module():
+    """Return tiktoken, or None if it isn't installed (token counts then fall back to an estimate)."""
+    try:
+        return lazy_import("tiktoken")
+    except ImportError:
+        return None
+
+get_startup_profile().record_cold_start(TOP_LEVEL_IMPORT_SECONDS)
+
+# Opt-in per-rerun profiler (STREAMSAGE_PROFILE=1, or ?profile=1 for one browser session where
+# STREAMSAGE_PROFILE_ALLOW_QUERY=1 is set in the environment or in secrets)
+PROFILE_ENABLED = os.getenv("STREAMSAGE_PROFILE", "").lower() in ("1", "true", "yes")
+PROFILE_ALLOW_QUERY = os.getenv("STREAMSAGE_PROFILE_ALLOW_QUERY", "").lower() in ("1", "true", "yes")
+PROFILE_LOG_PATH = os.getenv("STREAMSAGE_PROFILE_LOG", ".streamsage_cache/rerun_profile.jsonl")
+PROFILE_LOG_MAX_BYTES = int(os.getenv("STREAMSAGE_PROFILE_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+PROFILE_HISTORY_RUNS = 20
+NULL_SECTION = contextlib.nullcontext()
+
+class RerunProfile:
+    """
+    Timings of one script run (or fragment-only rerun) of one session.
+
+    Sections record wall time, CPU time of the script thread and the bytes of
+    the ForwardMsgs they sent to the browser; LLM calls record wall and CPU
+    time of the thread that ran them and whether a cache answered.
+    """
+
+    def __init__(self, kind, session_id, wall_start=None, cpu_start=None):
+        self.kind = kind
+        self.session_id = session_id
+        self.started = time.time()
+        self.sections = []
+        self.llm_calls = []
+        self.bytes_sent = 0
+        self.messages_sent = 0
+        self._wall = time.perf_counter() if wall_start is None else wall_start
+        self._cpu = time.thread_time() if cpu_start is None else cpu_start
+        self._checkpoint = (self._wall, self._cpu, 0)
+        self._lock = threading.Lock()
+        self.record = None
+        self.counts_bytes = True  # False when the session's outgoing messages cannot be intercepted
+
+    def count_message(self, msg):
+        self.bytes_sent += msg.ByteSize()
+        self.messages_sent += 1
+
+    @contextlib.contextmanager
+    def section(self, name):
+        """Time the enclosed block as one section of this run."""
+        wall, cpu, sent = time.perf_counter(), time.thread_time(), self.bytes_sent
+        try:
+            yield
+        finally:
+            self.add_section(name, time.perf_counter() - wall, time.thread_time() - cpu, self.bytes_sent - sent)
+
+    def add_section(self, name, wall, cpu, sent=0):
+        self.sections.append({"name": name, "wall_ms": wall * 1000, "cpu_ms": cpu * 1000, "bytes": sent})
+        self._checkpoint = (time.perf_counter(), time.thread_time(), self.bytes_sent)
+
+    def checkpoint(self, name):
+        """Record everything since the previous section or checkpoint as section `name`."""
+        wall, cpu, sent = self._checkpoint
+        self.add_section(name, time.perf_counter() - wall, time.thread_time() - cpu, self.bytes_sent - sent)
+
+    def add_llm_call(self, name, wall, cpu, cache):
+        with self._lock:
+            self.llm_calls.append({"name": name, "wall_ms": wall * 1000, "cpu_ms": cpu * 1000, "cache": cache})
+
+    def finish(self):
+        """Close the run and return its JSON-serializable record."""
+        if self.record is None:
+            with self._lock:
+                self.record = {
+                    "ts": datetime.fromtimestamp(self.started).isoformat(timespec="milliseconds"),
+                    "session": self.session_id,
+                    "kind": self.kind,
+                    "wall_ms": (time.perf_counter() - self._wall) * 1000,
+                    "cpu_ms": (time.thread_time() - self._cpu) * 1000,
+                    "bytes": self.bytes_sent if self.counts_bytes else None,
+                    "messages": self.messages_sent if self.counts_bytes else None,
+                    "sections": [
+                        section if self.counts_bytes else dict(section, bytes=None) for section in self.sections
+                    ],
+                    "llm_calls": list(self.llm_calls),
+                }
+        return self.record
+
+class ProfileLog:
+    """Rolling JSONL file of rerun profiles; rotated to `<path>.1` once it exceeds `max_bytes`."""
+
+    def __init__(self, path=PROFILE_LOG_PATH, max_bytes=PROFILE_LOG_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def append(self, record):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                if os.path.exists(self.path) and os.path.getsize(self.path) + len(line) > self.max_bytes:
+                    os.replace(self.path, self.path + ".1")
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+            except OSError as e:
+                logging.warning(f"Could not write rerun profile: {str(e)}")
+
+@st.cache_resource(show_spinner=False)
+def get_profile_log():
+    """Shared rerun profile log for all sessions."""
+    return ProfileLog()
+
+def profile_query_allowed():
+    """Whether ?profile=1 may turn on profiling (STREAMSAGE_PROFILE_ALLOW_QUERY in the environment or secrets)."""
+    if PROFILE_ALLOW_QUERY:
+        return True
+    try:
+        return str(st.secrets.get("STREAMSAGE_PROFILE_ALLOW_QUERY", "")).lower() in ("1", "true", "yes")
+    except FileNotFoundError:
+        return False
+
+def profiling_enabled():
+    return PROFILE_ENABLED or (st.query_params.get("profile") == "1" and profile_query_allowed())
+
+def count_sent_messages(ctx):
+    """
+    Route the session's outgoing ForwardMsgs through the active profile's byte counter (installed once per context).
+
+    This wraps Streamlit's private ScriptRunContext._enqueue. If a Streamlit
+    release drops it, byte counting is disabled with a warning instead.
+
+    Returns:
+    - bool: True if messages of this context are counted.
+    """
+    installed = getattr(ctx, "_streamsage_enqueue", None)
+    if installed is not None:
+        return installed is not False
+    if not callable(getattr(ctx, "_enqueue", None)):
+        logging.warning("ScriptRunContext._enqueue not found; rerun profiles will not count bytes sent")
+        ctx._streamsage_enqueue = False
+        return False
+    enqueue = ctx._enqueue
+    ctx._streamsage_enqueue = enqueue
+
+    def counting_enqueue(msg):
+        profile = getattr(ctx, "_streamsage_profile", None)
+        if profile is not None:
+            profile.count_message(msg)
+        enqueue(msg)
+
+    ctx._enqueue = counting_enqueue
+    return True
+
+def begin_rerun_profile(kind="script", wall_start=None, cpu_start=None):
+    """Start profiling this run if profiling is on; returns the profile or None."""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return None
+    if not profiling_enabled():
+        ctx._streamsage_profile = None  # drop a profile left behind by a run that died early
+        return None
+    profile = RerunProfile(kind, ctx.session_id, wall_start, cpu_start)
+    profile.counts_bytes = count_sent_messages(ctx)
+    ctx._streamsage_profile = profile
+    return profile
+
+def current_rerun_profile():
+    """Return the profile of the current run, or None when profiling is off."""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return getattr(ctx, "_streamsage_profile", None) if ctx is not None else None
+
+def finish_rerun_profile():
+    """Close the current run's profile, keep it for the debug panel and append it to the JSONL log."""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    profile = getattr(ctx, "_streamsage_profile", None) if ctx is not None else None
+    if profile is None or profile.record is not None:
+        return
+    record = profile.finish()
+    ctx._streamsage_profile = None
+    history = st.session_state.setdefault("rerun_profiles", deque(maxlen=PROFILE_HISTORY_RUNS))
+    history.append(record)
+    get_profile_log().append(record)
+
+def profile_section(name):
+    """Context manager timing a section of the current run (a no-op when profiling is off)."""
+    profile = current_rerun_profile()
+    return profile.section(name) if profile is not None else NULL_SECTION
+
+def profile_checkpoint(name):
+    """Record the time since the previous section as section `name` (for straight-line module code)."""
+    profile = current_rerun_profile()
+    if profile is not None:
+        profile.checkpoint(name)
+
+def profiled_fragment(name):
+    """
+    Decorator for fragment bodies: time the body as section `name`.
+
+    When only the fragment reruns the module-level code does not run, so the
+    fragment run is profiled (and logged) as a run of its own.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            ctx = get_script_run_ctx(suppress_warning=True)
+            if ctx is None or not ctx.fragment_ids_this_run or current_rerun_profile() is not None:
+                with profile_section(name):
+                    return func(*args, **kwargs)
+            profile = begin_rerun_profile(kind=f"fragment: {name}")
+            if profile is None:
+                return func(*args, **kwargs)
+            try:
+                with profile.section(name):
+                    return func(*args, **kwargs)
+            finally:
+                finish_rerun_profile()
+        return run
+    return decorate
+
+if begin_rerun_profile(wall_start=SCRIPT_STARTED, cpu_start=SCRIPT_STARTED_CPU) is not None:
+    profile_checkpoint("imports")
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
 # Constants
-NUMBER_OF_MESSAGES_TO_DISPLAY = 50
-API_DOCS_URL = "https://docs.streamlit.io/library/api-reference"
+CHAT_PAGE_SIZE = int(os.getenv("STREAMSAGE_CHAT_PAGE_SIZE", "10"))  # messages shown before "load earlier"
+API_DOCS_URL = os.getenv("STREAMSAGE_API_DOCS_URL", "https://docs.streamlit.io/library/api-reference")
 GITHUB_URL = "https://github.com/Coding-with-Akrash/StreamSage"
 PROJECT_VERSION = "2.0.0"
 MAX_TOKENS_DEFAULT = 2000
 TEMPERATURE_DEFAULT = 0.7
+OPENAI_MODEL = "gpt-4o-mini"
+LLM_WORKER_THREADS = int(os.getenv("STREAMSAGE_LLM_WORKERS", "8"))
+STREAM_RENDER_INTERVAL = 0.05  # seconds between partial re-renders while streaming
+
+# Persistent LLM response cache
+RESPONSE_CACHE_PATH = os.getenv("STREAMSAGE_RESPONSE_CACHE", ".streamsage_cache/llm_responses.sqlite3")
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("STREAMSAGE_RESPONSE_CACHE_TTL", str(7 * 24 * 3600)))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("STREAMSAGE_RESPONSE_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+# Chat history budget
+HISTORY_TOKEN_BUDGET = int(os.getenv("STREAMSAGE_HISTORY_TOKEN_BUDGET", "3000"))
+HISTORY_SUMMARY_MAX_TOKENS = 300
+
+# Chunked (map-reduce) project analysis
+ANALYSIS_CHUNK_TOKENS = int(os.getenv("STREAMSAGE_ANALYSIS_CHUNK_TOKENS", "1500"))
+ANALYSIS_CHUNK_REPLY_TOKENS = 700
+ANALYSIS_MAX_PARALLEL_CHUNKS = int(os.getenv("STREAMSAGE_ANALYSIS_PARALLEL_CHUNKS", "4"))
+
+# OpenAI connection pool settings (override via environment variables)
+OPENAI_MAX_CONNECTIONS = int(os.getenv("STREAMSAGE_MAX_CONNECTIONS", "20"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("STREAMSAGE_MAX_KEEPALIVE_CONNECTIONS", "10"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("STREAMSAGE_KEEPALIVE_EXPIRY", "60"))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("STREAMSAGE_CONNECT_TIMEOUT", "5"))
+OPENAI_READ_TIMEOUT = float(os.getenv("STREAMSAGE_READ_TIMEOUT", "120"))
+OPENAI_MAX_CLIENTS = int(os.getenv("STREAMSAGE_MAX_CLIENTS", "32"))
+OPENAI_CLIENT_IDLE_SECONDS = float(os.getenv("STREAMSAGE_CLIENT_IDLE_SECONDS", "900"))
+
+# Client-side rate limiting and retries (per API key)
+OPENAI_RPM_LIMIT = int(os.getenv("STREAMSAGE_RPM_LIMIT", "500"))
+OPENAI_TPM_LIMIT = int(os.getenv("STREAMSAGE_TPM_LIMIT", "200000"))
+OPENAI_MAX_RETRIES = int(os.getenv("STREAMSAGE_MAX_RETRIES", "4"))
+OPENAI_RETRY_BASE_DELAY = 1.0
+OPENAI_RETRY_MAX_DELAY = 30.0
+
+# Streamlit updates data and keyword search
+UPDATES_DATA_PATH = "data/streamlit_updates.json"
+# Releases ingested from the changelog; untracked, laid over UPDATES_DATA_PATH when loading
+UPDATES_OVERLAY_PATH = os.getenv("STREAMSAGE_UPDATES_OVERLAY", ".streamsage_cache/ingested_releases.json")
+UPDATES_SECTIONS = ("Highlights", "NotableChanges", "OtherChanges")
+UPDATES_SEARCH_TOP_K = 3
+UPDATES_PAGE_SIZE = 10
+UPDATES_COMPARE_MAX_ITEMS = 60
+VERSION_PATTERN = r"\d+\.\d+(?:\.\d+)?(?:[-.]?(?:dev|alpha|beta|rc|a|b)\.?\d*)?"
+UPDATES_SEARCH_MAX_RESULTS = 100
+UPDATES_DB_PATH = os.getenv("STREAMSAGE_UPDATES_DB")  # optional SQLite/FTS5 store, e.g. .streamsage_cache/updates.sqlite3
+BM25_K1 = 1.2
+BM25_B = 0.75
+CHAT_RETRIEVAL_TOP_K = 4
+CHAT_RETRIEVAL_MIN_SCORE = 2.0
+CHAT_RETRIEVAL_MAX_CHARS = 240
+
+# Changelog ingestion
+CHANGELOG_URL = os.getenv("STREAMSAGE_CHANGELOG_URL", "https://docs.streamlit.io/develop/quick-reference/release-notes")
+CHANGELOG_STATE_PATH = os.getenv("STREAMSAGE_CHANGELOG_STATE", ".streamsage_cache/changelog_state.json")
+CHANGELOG_MAX_NEW_RELEASES = 25
+HTTP_POOL_SIZE = 10
+UPDATES_REFRESH_SECONDS = float(os.getenv("STREAMSAGE_UPDATES_REFRESH_SECONDS", "30"))  # 0: only when triggered
+CHANGELOG_REFRESH_SECONDS = float(os.getenv("STREAMSAGE_CHANGELOG_REFRESH_SECONDS", "0"))  # opt-in, e.g. 21600; 0 disables
+HTTP_CONNECT_TIMEOUT = 5
+HTTP_READ_TIMEOUT = 15
+DOCS_VERSION_TTL_SECONDS = float(os.getenv("STREAMSAGE_DOCS_VERSION_TTL", "3600"))
+DOCS_VERSION_STATE_PATH = os.getenv("STREAMSAGE_DOCS_VERSION_STATE", ".streamsage_cache/docs_version.json")
+DOCS_PROBE_CONNECT_TIMEOUT = 3
+DOCS_PROBE_READ_TIMEOUT = 5
+DOCS_PROBE_DEADLINE_SECONDS = 8
+DOCS_PROBE_MAX_BYTES = 512 * 1024
+
+# Theme stylesheet (served from ./static when server.enableStaticServing is on)
+THEME_CSS_PATH = "static/streamsage_theme.css"
+THEME_CSS_URL = "app/static/streamsage_theme.css"
+INLINE_THEME = os.getenv("STREAMSAGE_INLINE_THEME", "").lower() in ("1", "true", "yes")
+
+@st.cache_resource(show_spinner=False)
+def get_theme_asset(file_version):
+    """
+    Read the theme stylesheet once per file version.
+
+    Returns:
+    - dict: `css` (the stylesheet text) and `url` (the static URL with a
+      content hash, so browsers fetch it again only when it changes).
+    """
+    try:
+        with open(THEME_CSS_PATH, "r", encoding="utf-8") as f:
+            css = f.read()
+    except OSError as e:
+        logging.error(f"Theme stylesheet unavailable: {str(e)}")
+        return {"css": "", "url": None}
+    digest = hashlib.sha256(css.encode()).hexdigest()[:12]
+    return {"css": css, "url": f"{THEME_CSS_URL}?v={digest}"}
+
+def inject_theme():
+    """
+    Apply the theme stylesheet.
+
+    With static file serving enabled only a one-line @import of the hashed
+    stylesheet URL is sent per rerun; the browser fetches and caches the file
+    itself. Otherwise (or with STREAMSAGE_INLINE_THEME=1) the stylesheet is
+    inlined as before.
+    """
+    try:
+        stat = os.stat(THEME_CSS_PATH)
+        asset = get_theme_asset((stat.st_mtime_ns, stat.st_size))
+    except OSError:
+        asset = get_theme_asset(None)
+    if asset["url"] and not INLINE_THEME and st.get_option("server.enableStaticServing"):
+        st.markdown(f'<style>@import url("{asset["url"]}");</style>', unsafe_allow_html=True)
+    elif asset["css"]:
+        st.markdown(f"<style>\n{asset['css']}</style>", unsafe_allow_html=True)
+
+inject_theme()
+profile_checkpoint("theme")
 
 # Retrieve and validate API key
 try:
@@ -58,11 +481,9 @@ try:
 except Exception as e:
     # Dynamic API Key Input Form - Shows every time app opens without API key
     st.markdown("""
-    <div style="background: rgba(26, 32, 44, 0.9); padding: 2rem; border-radius: 15px; border: 1px solid rgba(255, 154, 158, 0.3); margin: 1rem 0;">
-        <h2 style="color: #ffffff; margin-top: 0; text-align: center;">🔑 Enter Your OpenAI API Key</h2>
-        <p style="color: #e2e8f0; text-align: center; margin-bottom: 2rem;">
-            Please enter your OpenAI API key to start using StreamSage AI Assistant
-        </p>
+    <div class="gate-card">
+        <h2>🔑 Enter Your OpenAI API Key</h2>
+        <p>Please enter your OpenAI API key to start using StreamSage AI Assistant</p>
     </div>
     """, unsafe_allow_html=True)
 
@@ -104,54 +525,842 @@ except Exception as e:
 
     # Show setup instructions
     st.markdown("""
-    <div style="background: rgba(26, 32, 44, 0.8); padding: 2rem; border-radius: 15px; border: 1px solid rgba(255, 154, 158, 0.2); margin: 1rem 0;">
-        <h3 style="color: #ffffff; margin-top: 0;">📋 How to Get Your API Key</h3>
-
-        """, unsafe_allow_html=True)
-    
-    st.markdown("""
-        <div style="margin: 1.5rem 0;">
-            <h4 style="color: #ff9a9e;">Step 1: Get Your API Key</h4>
-            <p style="color: #e2e8f0; margin-bottom: 1rem;">
-                🌐 Visit: <a href="https://platform.openai.com/api-keys" style="color: #ff9a9e; text-decoration: none;" target="_blank">https://platform.openai.com/api-keys</a>
-            </p>
-            <ol style="color: #e2e8f0; line-height: 1.6;">
+    <div class="gate-help">
+        <h3>📋 How to Get Your API Key</h3>
+        <h4>Step 1: Get Your API Key</h4>
+        <p>
+            🌐 Visit: <a href="https://platform.openai.com/api-keys" target="_blank">https://platform.openai.com/api-keys</a>
+        </p>
+        <ol>
                 <li>🔐 Sign up or log in to your OpenAI account</li>
                 <li>🗝️ Navigate to "API Keys" section</li>
                 <li>➕ Click "Create new secret key"</li>
                 <li>📋 Copy the generated key (format: <code>sk-...</code>)</li>
                 <li>💾 Paste it above and click "Start StreamSage"</li>
-            </ol>
-        </div> """, unsafe_allow_html=True)
-    
-    st.markdown("""
-        <div style="margin: 1.5rem 0; padding: 1rem; background: rgba(255, 154, 158, 0.1); border-radius: 10px; border-left: 4px solid #ff9a9e;">
-            <h4 style="color: #ff9a9e; margin-top: 0;">💡 Note</h4>
-            <p style="color: #e2e8f0; margin-bottom: 0;">
-                🔄 You'll need to enter your API key each time you open the app.<br>
-                🚀 Your API key is only stored for this session and will be cleared when you close the app.<br>
-                🔒 For security, consider setting up an environment variable for permanent use.
-            </p>
-        </div>
+        </ol>
+    </div>
+    <div class="gate-note">
+        <h4>💡 Note</h4>
+        <p>
+            🔄 You'll need to enter your API key each time you open the app.<br>
+            🚀 Your API key is only stored for this session and will be cleared when you close the app.<br>
+            🔒 For security, consider setting up an environment variable for permanent use.
+        </p>
     </div>
     """, unsafe_allow_html=True)
 
+    profile_checkpoint("api_key_gate")
+    finish_rerun_profile()
     st.stop()
 
-# Assign OpenAI API Key
-openai.api_key = OPENAI_API_KEY
+profile_checkpoint("api_key_gate")
+
+class OpenAIClientRegistry:
+    """
+    Process-wide pool of OpenAI clients, one per API key.
+
+    Clients are keyed by a hash of the API key (the raw key is never stored as a
+    dict key) and keep their HTTP connection pool alive between calls, so repeated
+    chat turns and generations reuse warm TLS connections. Callers hold a client
+    through `lease()`. Clients that have been idle for too long, or that fall off
+    the end of the LRU order, are closed, but a client still leased (e.g. in the
+    middle of a streamed reply) is only closed when its last lease ends.
+    """
+
+    def __init__(self, max_clients=OPENAI_MAX_CLIENTS, idle_seconds=OPENAI_CLIENT_IDLE_SECONDS):
+        self.max_clients = max_clients
+        self.idle_seconds = idle_seconds
+        self._clients = OrderedDict()  # key hash -> {"client", "last_used", "leases", "retired"}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_hash(api_key):
+        """Return the registry key for an API key."""
+        return hashlib.sha256(api_key.encode()).hexdigest()
+
+    def _create_client(self, api_key):
+        openai = openai_module()
+        httpx = httpx_module()
+        http_client = openai.DefaultHttpxClient(
+            limits=httpx.Limits(
+                max_connections=OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(OPENAI_READ_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+        )
+        # Retries are owned by request_chat_completion so they respect the rate limiter
+        return openai.OpenAI(api_key=api_key, http_client=http_client, max_retries=0)
+
+    @contextlib.contextmanager
+    def lease(self, api_key):
+        """Hold the pooled client for `api_key` (created on first use) for the duration of the block."""
+        entry = self._acquire(api_key)
+        try:
+            yield entry["client"]
+        finally:
+            self._release(entry)
+
+    def _acquire(self, api_key):
+        key = self.key_hash(api_key)
+        now = time.monotonic()
+        with self._lock:
+            evicted = self._evict_idle(now)
+            entry = self._clients.pop(key, None)
+            if entry is None:
+                entry = {"client": self._create_client(api_key), "last_used": now, "leases": 0, "retired": False}
+            entry["leases"] += 1
+            entry["last_used"] = now
+            self._clients[key] = entry
+            while len(self._clients) > self.max_clients:
+                _, old = self._clients.popitem(last=False)
+                evicted.extend(self._retire(old))
+        for old_client in evicted:
+            self._close(old_client)
+        return entry
+
+    def _release(self, entry):
+        with self._lock:
+            entry["leases"] -= 1
+            entry["last_used"] = time.monotonic()
+            close = entry["retired"] and entry["leases"] == 0
+        if close:
+            self._close(entry["client"])
+
+    @staticmethod
+    def _retire(entry):
+        """Mark a client removed from the pool; return it if it can be closed now."""
+        entry["retired"] = True
+        return [entry["client"]] if entry["leases"] == 0 else []
+
+    def _evict_idle(self, now):
+        expired = [
+            key for key, entry in self._clients.items()
+            if entry["leases"] == 0 and now - entry["last_used"] > self.idle_seconds
+        ]
+        return [client for key in expired for client in self._retire(self._clients.pop(key))]
+
+    @staticmethod
+    def _close(client):
+        try:
+            client.close()
+        except Exception as e:
+            logging.warning(f"Error closing idle OpenAI client: {str(e)}")
+
+    def stats(self):
+        """Return the number of pooled and currently leased clients and the configured limits."""
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "leased": sum(1 for entry in self._clients.values() if entry["leases"]),
+                "max_clients": self.max_clients,
+                "idle_seconds": self.idle_seconds,
+            }
 
-def get_openai_client():
-    """Get OpenAI client with proper API key validation."""
+@st.cache_resource(show_spinner=False)
+def get_openai_client_registry():
+    """Return the process-wide OpenAI client registry shared by all sessions."""
+    return OpenAIClientRegistry()
+
+def get_openai_client(api_key=None):
+    """Lease the pooled OpenAI client (use as a context manager) with proper API key validation."""
     try:
-        if not OPENAI_API_KEY:
+        api_key = api_key or OPENAI_API_KEY
+        if not api_key:
             raise Exception("No API key available")
-        return openai.OpenAI(api_key=OPENAI_API_KEY)
+        return get_openai_client_registry().lease(api_key)
     except Exception as e:
         st.error(f"❌ **Error initializing OpenAI client:** {str(e)}")
         st.error("🔑 **Please configure your API key first.**")
         st.stop()
 
+def normalize_prompt_text(text):
+    """Normalize prompt text for cache keys: unify line endings and drop trailing whitespace."""
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip("\n")
+
+def response_cache_key(model, messages, temperature, max_tokens):
+    """
+    Build the content hash identifying a completion request.
+
+    The key covers the model, the system prompt, the normalized user content,
+    the temperature and max_tokens.
+    """
+    system_prompt = "\n".join(m["content"] for m in messages if m["role"] == "system")
+    user_content = "\n".join(
+        f"{m['role']}: {normalize_prompt_text(m['content'])}" for m in messages if m["role"] != "system"
+    )
+    payload = json.dumps({
+        "model": model,
+        "system": normalize_prompt_text(system_prompt),
+        "user": user_content,
+        "temperature": round(float(temperature), 3),
+        "max_tokens": int(max_tokens),
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class PersistentResponseStore:
+    """
+    On-disk LLM response cache that survives restarts.
+
+    Replies are stored in SQLite under their request content hash. Entries expire
+    after `ttl_seconds`, and once the stored replies exceed `max_bytes` the least
+    recently used entries are evicted. Any storage error is logged and treated as
+    a cache miss so a broken cache never breaks a request.
+    """
+
+    def __init__(self, path=RESPONSE_CACHE_PATH, ttl_seconds=RESPONSE_CACHE_TTL_SECONDS, max_bytes=RESPONSE_CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses(last_access)")
+        self.purge()
+        logging.info(f"Response cache warm-started with {len(self)} entries from {path}")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key):
+        """Return the cached reply for `key`, or None if missing or expired."""
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if now - row[1] > self.ttl_seconds:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    return None
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                return row[0]
+        except sqlite3.Error as e:
+            logging.warning(f"Response cache read failed: {str(e)}")
+            return None
+
+    def put(self, key, model, value):
+        """Store a reply and evict least recently used entries beyond the size limit."""
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, value, size, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model, value, len(value.encode()), now, now)
+                )
+                self._evict_over_size()
+        except sqlite3.Error as e:
+            logging.warning(f"Response cache write failed: {str(e)}")
+
+    def purge(self):
+        """Drop expired entries and enforce the size limit."""
+        try:
+            with self._lock, self._conn:
+                self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+                self._evict_over_size()
+        except sqlite3.Error as e:
+            logging.warning(f"Response cache purge failed: {str(e)}")
+
+    def _evict_over_size(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+@st.cache_resource(show_spinner=False)
+def get_response_store():
+    """Return the process-wide persistent response store."""
+    return PersistentResponseStore()
+
+class FlightAbandoned(Exception):
+    """The leader of an in-flight call stopped without a reply (e.g. its session reran or stopped)."""
+
+class InFlightCall:
+    """A single upstream LLM call that identical concurrent requests wait on."""
+
+    def __init__(self):
+        self.result = None
+        self.error = None
+        self._tokens = []
+        self._listeners = []
+        self._finished = False
+        self._lock = threading.Lock()
+
+    def publish(self, delta):
+        """Record a streamed text delta and forward it to waiting followers."""
+        with self._lock:
+            self._tokens.append(delta)
+            for listener in self._listeners:
+                listener.put(delta)
+
+    def finish(self, result=None, error=None):
+        """Publish the final reply (or error) and release every follower."""
+        with self._lock:
+            self.result = result
+            self.error = error
+            self._finished = True
+            for listener in self._listeners:
+                listener.put(None)
+            self._listeners = []
+
+    def join(self, on_token=None):
+        """
+        Wait for the call to finish and return its reply.
+
+        Followers asking for tokens get the deltas streamed so far replayed, then
+        the rest as they arrive. Tokens are delivered on the follower's own thread.
+        """
+        listener = queue.Queue()
+        with self._lock:
+            for delta in self._tokens:
+                listener.put(delta)
+            if self._finished:
+                listener.put(None)
+            else:
+                self._listeners.append(listener)
+
+        streamed = False
+        delta = listener.get()
+        while delta is not None:
+            if on_token is not None:
+                on_token(delta)
+                streamed = True
+            delta = listener.get()
+
+        if isinstance(self.error, FlightAbandoned) and streamed:
+            raise RuntimeError("The shared LLM call was interrupted mid-stream; please retry.")
+        if self.error is not None:
+            raise self.error
+        if on_token is not None and not streamed and self.result:
+            on_token(self.result)
+        return self.result
+
+class SingleFlight:
+    """
+    Coalesce identical in-flight LLM calls across sessions.
+
+    The first caller for a key runs the upstream call; callers arriving with the
+    same key while it is still running wait on it and share its reply, streamed
+    tokens included. The key is released as soon as the call finishes (also
+    when Streamlit's RerunException / StopException interrupt the leader), so
+    later requests go through the response caches as usual. Followers of an
+    abandoned call that have not received any tokens yet retry it themselves.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def run(self, key, call, on_token=None):
+        """
+        Run `call` once per in-flight `key` and return its reply.
+
+        Parameters:
+        - key (str): Request identity, e.g. a response cache key.
+        - call (callable): Performs the request; receives a token callback (or
+          None when nobody asked for streaming) and returns the reply.
+        - on_token (callable): Optional callback for streamed text deltas.
+
+        Returns:
+        - str: The reply shared by every caller of this flight.
+        """
+        while True:
+            with self._lock:
+                flight = self._calls.get(key)
+                is_leader = flight is None
+                if is_leader:
+                    flight = self._calls[key] = InFlightCall()
+                else:
+                    self.coalesced += 1
+            if is_leader:
+                break
+            try:
+                return flight.join(on_token)
+            except FlightAbandoned:
+                continue
+
+        def emit(delta):
+            flight.publish(delta)
+            on_token(delta)
+
+        result = error = None
+        try:
+            result = call(emit if on_token is not None else None)
+            return result
+        except Exception as e:
+            error = e
+            raise
+        except BaseException:
+            # RerunException / StopException belong to the leader's session; followers must not receive them
+            error = FlightAbandoned()
+            raise
+        finally:
+            self._release(key)
+            flight.finish(result=result, error=error)
+
+    def _release(self, key):
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def stats(self):
+        """Return the number of in-flight calls and how many requests were coalesced."""
+        with self._lock:
+            return {"in_flight": len(self._calls), "coalesced": self.coalesced}
+
+@st.cache_resource(show_spinner=False)
+def get_inflight_calls():
+    """Return the process-wide single-flight registry for LLM calls."""
+    return SingleFlight()
+
+def complete_chat(messages, temperature=TEMPERATURE_DEFAULT, max_tokens=MAX_TOKENS_DEFAULT, on_token=None, model=OPENAI_MODEL, persist=False):
+    """
+    Run a chat completion and return the assistant reply.
+
+    Parameters:
+    - messages (list): Chat messages to send.
+    - temperature (float): Sampling temperature.
+    - max_tokens (int): Maximum length of the reply.
+    - on_token (callable): When given, the completion is streamed and this is
+      called with each text delta as it arrives.
+    - model (str): Model name.
+    - persist (bool): Serve and store the reply through the on-disk response cache.
+
+    The on-disk response cache is shared by all API keys on purpose: a stored
+    reply depends only on the request, and serving it spends no one's quota.
+    In-flight calls are only shared between callers using the same key, so a
+    request is never billed to (or fails with the errors of) another tenant.
+
+    Returns:
+    - str: The full assistant reply.
+    """
+    api_key = OPENAI_API_KEY
+    key = response_cache_key(model, messages, temperature, max_tokens)
+    if persist:
+        cached_reply = get_response_store().get(key)
+        if cached_reply is not None:
+            note_llm_outcome("response store")
+            if on_token is not None:
+                on_token(cached_reply)
+            return cached_reply
+
+    called = []
+
+    def call(emit):
+        called.append(True)
+        note_llm_outcome("api")
+        reply = request_chat_completion(messages, temperature, max_tokens, on_token=emit, model=model, api_key=api_key)
+        if persist and reply:
+            get_response_store().put(key, model, reply)
+        return reply
+
+    flight_key = f"{OpenAIClientRegistry.key_hash(api_key or '')}:{key}"
+    reply = get_inflight_calls().run(flight_key, call, on_token=on_token)
+    if not called:
+        note_llm_outcome("coalesced")
+    return reply
+
+def request_chat_completion(messages, temperature=TEMPERATURE_DEFAULT, max_tokens=MAX_TOKENS_DEFAULT, on_token=None, model=OPENAI_MODEL, api_key=None, max_retries=OPENAI_MAX_RETRIES):
+    """
+    Send a chat completion request upstream through the per-key rate limiter.
+
+    Rate limits, connection errors and server errors are retried with
+    exponential backoff and jitter, honoring Retry-After. A streamed request is
+    only retried if it failed before producing any tokens.
+    """
+    api_key = api_key or OPENAI_API_KEY
+    limiter = get_rate_limiters().get(api_key)
+    token_cost = sum(count_message_tokens(m) for m in messages) + max_tokens
+    streamed = []
+
+    def forward(delta):
+        streamed.append(delta)
+        on_token(delta)
+
+    attempt = 0
+    while True:
+        limiter.acquire(current_session_id(), token_cost)
+        try:
+            # The lease keeps the client open until the (possibly streamed) reply is complete
+            with get_openai_client(api_key) as client:
+                return send_chat_completion(client, messages, temperature, max_tokens, forward if on_token else None, model)
+        except retryable_openai_errors() as e:
+            if streamed or attempt >= max_retries:
+                raise
+            delay = retry_delay(e, attempt)
+            attempt += 1
+            logging.warning(f"OpenAI request failed ({type(e).__name__}), retry {attempt}/{max_retries} in {delay:.1f}s")
+            if isinstance(e, openai_module().RateLimitError):
+                limiter.pause(delay)
+            else:
+                time.sleep(delay)
+
+def send_chat_completion(client, messages, temperature, max_tokens, on_token, model):
+    """Issue a single chat completion call, streaming it when `on_token` is given."""
+    if on_token is None:
+        response = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+        return response.choices[0].message.content
+
+    stream = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        stream=True
+    )
+    parts = []
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            on_token(delta)
+    return "".join(parts)
+
+@st.cache_resource(show_spinner=False)
+def get_llm_executor():
+    """Return the process-wide thread pool used to run LLM calls off the script thread."""
+    return ThreadPoolExecutor(max_workers=LLM_WORKER_THREADS, thread_name_prefix="streamsage-llm")
+
+def _drain_tokens(tokens, texts, wait):
+    """Move queued (index, delta) tokens into `texts`; return the indices that changed."""
+    updated = set()
+    try:
+        index, delta = tokens.get(timeout=STREAM_RENDER_INTERVAL) if wait else tokens.get_nowait()
+    except queue.Empty:
+        return updated
+    while True:
+        texts[index] += delta
+        updated.add(index)
+        try:
+            index, delta = tokens.get_nowait()
+        except queue.Empty:
+            return updated
+
+def stream_cached_llm_calls(calls):
+    """
+    Run LLM-backed cached functions concurrently and render their replies while they stream.
+
+    Each function runs on a worker thread with a token callback (passed as the
+    unhashed `_on_token` argument, so the cache key is unchanged). Tokens are
+    rendered as they arrive; on a cache hit the stored reply is rendered at once.
+    The completed replies are stored by the functions' own caches as usual.
+
+    Parameters:
+    - calls (list): (cached_func, args, render) tuples, where `render` is called
+      with the text rendered so far.
+
+    Returns:
+    - list: The complete replies, in call order.
+    """
+    tokens = queue.Queue()
+    futures = [
+        submit_llm_job(cached_func, *args, _on_token=lambda delta, index=index: tokens.put((index, delta)))
+        for index, (cached_func, args, _) in enumerate(calls)
+    ]
+    texts = [""] * len(calls)
+    results = [None] * len(calls)
+    pending = set(range(len(calls)))
+    while pending:
+        # A finished worker has queued all of its tokens, so check completion before draining
+        finished = {index for index in pending if futures[index].done()}
+        for index in _drain_tokens(tokens, texts, wait=not finished) - finished:
+            calls[index][2](texts[index] + " ▌")
+        for index in finished:
+            results[index] = futures[index].result()
+            if results[index]:
+                calls[index][2](results[index])
+            pending.discard(index)
+    return results
+
+def run_llm_tasks(calls, stream=False, spinner_text="Working on it..."):
+    """
+    Run LLM-backed functions concurrently and render each result as soon as it is ready.
+
+    Parameters:
+    - calls (list): (cached_func, args, render) tuples.
+    - stream (bool): Render replies token by token as they are generated.
+    - spinner_text (str): Spinner message shown while waiting without streaming.
+
+    Returns:
+    - list: The complete replies, in call order.
+    """
+    if stream:
+        return stream_cached_llm_calls(calls)
+    results = [None] * len(calls)
+    with st.spinner(spinner_text):
+        futures = {
+            submit_llm_job(cached_func, *args): index
+            for index, (cached_func, args, _) in enumerate(calls)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            results[index] = future.result()
+            if results[index]:
+                calls[index][2](results[index])
+    return results
+
+def run_llm_task(cached_func, args, render, stream=False, spinner_text="Working on it..."):
+    """
+    Run an LLM-backed function and render its result, streaming it if requested.
+
+    Returns:
+    - str: The complete reply.
+    """
+    return run_llm_tasks([(cached_func, args, render)], stream=stream, spinner_text=spinner_text)[0]
+
+def render_result_card(container, text):
+    """Render an analysis or guide result inside the standard dark result card."""
+    container.markdown(f"""
+    <div style="color: #ffffff; line-height: 1.6; white-space: pre-line; background: rgba(26, 32, 44, 0.7); padding: 2rem; border-radius: 15px; border: 1px solid rgba(255, 154, 158, 0.2);">
+        {text}
+    </div>
+    """, unsafe_allow_html=True)
+
+class TokenBucket:
+    """Token bucket refilled continuously at `capacity` units per minute."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.refill_per_second = capacity / 60.0
+        self.updated = time.monotonic()
+
+    def wait_time(self, amount, now):
+        """Seconds until `amount` units are available (amounts above capacity wait for a full bucket)."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.refill_per_second
+
+    def take(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+class KeyRateLimiter:
+    """
+    Request and token budget for one API key, shared fairly between sessions.
+
+    Callers queue per session and are granted in round-robin order across
+    sessions, so one session firing many requests cannot starve the others.
+    A 429 pauses the whole key until its Retry-After has passed.
+    """
+
+    def __init__(self, requests_per_minute=OPENAI_RPM_LIMIT, tokens_per_minute=OPENAI_TPM_LIMIT):
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._waiting = OrderedDict()  # session id -> deque of tickets, in round-robin order
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self, session_id, token_cost):
+        """Block until this session's turn comes up and the key has budget for the request."""
+        ticket = object()
+        with self._cond:
+            self._waiting.setdefault(session_id, deque()).append(ticket)
+            try:
+                while True:
+                    timeout = None
+                    if self._is_next(session_id, ticket):
+                        now = time.monotonic()
+                        timeout = max(
+                            self._paused_until - now,
+                            self._requests.wait_time(1, now),
+                            self._tokens.wait_time(token_cost, now),
+                        )
+                        if timeout <= 0:
+                            self._requests.take(1)
+                            self._tokens.take(token_cost)
+                            return
+                    self._cond.wait(timeout)
+            finally:
+                self._release_ticket(session_id, ticket)
+
+    def _is_next(self, session_id, ticket):
+        next_session, tickets = next(iter(self._waiting.items()))
+        return next_session == session_id and tickets[0] is ticket
+
+    def _release_ticket(self, session_id, ticket):
+        # Granted (or abandoned) tickets leave the queue; the session moves to the
+        # back of the round-robin order if it still has requests waiting
+        tickets = self._waiting[session_id]
+        tickets.remove(ticket)
+        if tickets:
+            self._waiting.move_to_end(session_id)
+        else:
+            del self._waiting[session_id]
+        self._cond.notify_all()
+
+    def pause(self, seconds):
+        """Hold every request for this key for `seconds` (e.g. after a 429)."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+class RateLimiterRegistry:
+    """Per-API-key rate limiters, keyed like the client registry and bounded with LRU."""
+
+    def __init__(self, max_keys=OPENAI_MAX_CLIENTS):
+        self.max_keys = max_keys
+        self._limiters = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, api_key):
+        key = OpenAIClientRegistry.key_hash(api_key)
+        with self._lock:
+            limiter = self._limiters.pop(key, None) or KeyRateLimiter()
+            self._limiters[key] = limiter
+            while len(self._limiters) > self.max_keys:
+                self._limiters.popitem(last=False)
+            return limiter
+
+@st.cache_resource(show_spinner=False)
+def get_rate_limiters():
+    """Return the process-wide per-key rate limiter registry."""
+    return RateLimiterRegistry()
+
+_llm_job_context = threading.local()
+
+def current_session_id():
+    """Return the Streamlit session an LLM call is made for (also inside LLM worker threads)."""
+    session_id = getattr(_llm_job_context, "session_id", None)
+    if session_id:
+        return session_id
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else "default"
+
+def bind_llm_session(func):
+    """Wrap `func` so LLM calls it makes on another thread count against the current session."""
+    session_id = current_session_id()
+
+    def run(*args, **kwargs):
+        _llm_job_context.session_id = session_id
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _llm_job_context.session_id = None
+
+    return run
+
+def note_llm_outcome(outcome):
+    """Tell an enclosing profile_llm_call how a completion was served ("api", "response store" or "coalesced")."""
+    outcomes = getattr(_llm_job_context, "outcomes", None)
+    if outcomes is not None:
+        outcomes.append(outcome)
+
+@contextlib.contextmanager
+def _timed_llm_call(profile, name, no_call):
+    outcomes = _llm_job_context.outcomes = []
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        _llm_job_context.outcomes = None
+        if "api" in outcomes:
+            cache = "miss"
+        elif "coalesced" in outcomes:
+            cache = "coalesced"
+        elif "response store" in outcomes:
+            cache = "hit (response store)"
+        else:
+            cache = no_call
+        profile.add_llm_call(name, time.perf_counter() - wall, time.thread_time() - cpu, cache)
+
+def profile_llm_call(name, no_call="hit (st.cache_data)", profile=None):
+    """
+    Context manager recording an LLM-backed call's wall time, CPU time (of the
+    calling thread) and cache outcome in the rerun profile; a no-op when
+    profiling is off. `no_call` labels calls that never reached complete_chat.
+    """
+    profile = profile or current_rerun_profile()
+    return _timed_llm_call(profile, name, no_call) if profile is not None else NULL_SECTION
+
+def profiled_llm_job(func, profile):
+    """Wrap `func` so the worker thread running it records the call in `profile`."""
+    name = getattr(func, "__name__", repr(func))
+
+    def run(*args, **kwargs):
+        with profile_llm_call(name, profile=profile):
+            return func(*args, **kwargs)
+
+    return run
+
+def submit_llm_job(func, *args, **kwargs):
+    """Submit `func` to the LLM worker pool on behalf of the current session."""
+    profile = current_rerun_profile()
+    if profile is not None:
+        func = profiled_llm_job(func, profile)
+    return get_llm_executor().submit(bind_llm_session(func), *args, **kwargs)
+
+def retry_after_seconds(error):
+    """Return the server-requested retry delay from an API error, if any."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    retry_after_ms = response.headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    retry_after = response.headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        try:
+            retry_at = email.utils.parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def retry_delay(error, attempt):
+    """Exponential backoff with jitter, never shorter than the server's Retry-After."""
+    backoff = min(OPENAI_RETRY_MAX_DELAY, OPENAI_RETRY_BASE_DELAY * 2 ** attempt)
+    delay = random.uniform(backoff / 2, backoff)
+    retry_after = retry_after_seconds(error)
+    if retry_after is not None:
+        delay = max(delay, retry_after + random.uniform(0, OPENAI_RETRY_BASE_DELAY))
+    return delay
+
+def retryable_openai_errors():
+    """OpenAI exception types that are retried with backoff."""
+    openai = openai_module()
+    return (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+profile_checkpoint("definitions: core")
+
 # Streamlit Page Configuration
 st.set_page_config(
     page_title="StreamSage AI - Ultimate Streamlit Assistant",
@@ -166,12 +1375,13 @@ st.set_page_config(
 
             **The Most Comprehensive Streamlit Development Platform**
 
-            ### 🔥 8 Powerful Modes
+            ### 🔥 9 Powerful Modes
             - 💬 **AI Chat Assistant** - Intelligent Streamlit conversations
             - 🚀 **Code Generator** - Generate complete applications instantly
             - 🔍 **Project Analyzer** - Comprehensive code analysis & feedback
             - ⚡ **Performance Profiler** - Optimize app speed and efficiency
             - 🔒 **Security Scanner** - Detect vulnerabilities and security issues
+            - 🧪 **Full Audit** - Project, performance and security reports in one run
             - 📚 **Template Library** - 8 pre-built professional templates
             - 🚢 **Deployment Assistant** - Deploy to 8 major platforms
             - 📢 **Latest Updates** - Comprehensive Streamlit updates browser with organized categories
@@ -222,79 +1432,142 @@ st.set_page_config(
 # Professional Title with enhanced styling
 st.markdown('<h1 class="main-title">StreamSage AI Assistant</h1>', unsafe_allow_html=True)
 
-# Premium System Status Bar
-st.markdown("""
-<div style="margin: 2rem 0;">
-""", unsafe_allow_html=True)
-
-col1, col2, col3, col4 = st.columns(4)
-with col1:
-    st.markdown(f"""
-    <div class="status-metric" style="text-align: center; padding: 1rem; background: rgba(26, 32, 44, 0.7); border-radius: 15px; border: 1px solid rgba(255, 154, 158, 0.2);">
-        <div style="font-size: 2rem; margin-bottom: 0.5rem;">📊</div>
-        <div style="color: #ffffff; font-weight: 600; font-size: 0.9rem;">Version</div>
-        <div style="color: #ff9a9e; font-weight: 700; font-size: 1.1rem;">{PROJECT_VERSION}</div>
-    </div>
-    """, unsafe_allow_html=True)
+# Premium System Status Bar (styled by the theme stylesheet)
+STATUS_METRICS = (
+    ("📊", "Version", PROJECT_VERSION, "#ff9a9e", ""),
+    ("🤖", "AI Model", "GPT-4o-mini", "#fecfef", " alt"),
+    ("⚡", "Status", "Online", "#ff6b9d", ""),
+    ("👥", "Sessions", "Active", "#c44569", " alt"),
+)
 
-with col2:
-    st.markdown("""
-    <div class="status-metric" style="text-align: center; padding: 1rem; background: rgba(26, 32, 44, 0.7); border-radius: 15px; border: 1px solid rgba(254, 207, 239, 0.2);">
-        <div style="font-size: 2rem; margin-bottom: 0.5rem;">🤖</div>
-        <div style="color: #ffffff; font-weight: 600; font-size: 0.9rem;">AI Model</div>
-        <div style="color: #fecfef; font-weight: 700; font-size: 1.1rem;">GPT-4o-mini</div>
-    </div>
-    """, unsafe_allow_html=True)
+for column, (icon, label, value, color, variant) in zip(st.columns(len(STATUS_METRICS)), STATUS_METRICS):
+    column.markdown(
+        f'<div class="status-metric{variant}"><div class="status-icon">{icon}</div>'
+        f'<div class="status-label">{label}</div>'
+        f'<div class="status-value" style="color: {color};">{value}</div></div>',
+        unsafe_allow_html=True
+    )
 
-with col3:
-    st.markdown("""
-    <div class="status-metric" style="text-align: center; padding: 1rem; background: rgba(26, 32, 44, 0.7); border-radius: 15px; border: 1px solid rgba(255, 154, 158, 0.2);">
-        <div style="font-size: 2rem; margin-bottom: 0.5rem;">⚡</div>
-        <div style="color: #ffffff; font-weight: 600; font-size: 0.9rem;">Status</div>
-        <div style="color: #ff6b9d; font-weight: 700; font-size: 1.1rem;">Online</div>
-    </div>
-    """, unsafe_allow_html=True)
+st.markdown(
+    '<div class="tagline"><p class="lead">🚀 Your intelligent companion for all things Streamlit ✨</p>'
+    '<p>Generate • Debug • Learn • Optimize</p></div>',
+    unsafe_allow_html=True
+)
+profile_checkpoint("header")
+
+# Image assets: display width in CSS pixels; images are stored at 2x for HiDPI screens
+IMAGE_ASSET_SCALE = 2
+IMAGE_ASSET_QUALITY = 85
+SIDEBAR_LOGO_PATH = "imgs/sidebar_streamsage.png"
+SIDEBAR_LOGO_WIDTH = 120
+SIDEBAR_FOOTER_IMAGE_PATH = "imgs/stsidebarimg.png"
+SIDEBAR_FOOTER_IMAGE_WIDTH = 80
+CHAT_AVATAR_PATHS = {"assistant": "imgs/avatar_streamly.png", "user": "imgs/stuser.png"}
+CHAT_AVATAR_WIDTH = 40
+
+class ImageAssetCache:
+    """
+    Process-wide cache of decoded, downscaled and re-encoded images.
 
-with col4:
-    st.markdown("""
-    <div class="status-metric" style="text-align: center; padding: 1rem; background: rgba(26, 32, 44, 0.7); border-radius: 15px; border: 1px solid rgba(254, 207, 239, 0.2);">
-        <div style="font-size: 2rem; margin-bottom: 0.5rem;">👥</div>
-        <div style="color: #ffffff; font-weight: 600; font-size: 0.9rem;">Sessions</div>
-        <div style="color: #c44569; font-weight: 700; font-size: 1.1rem;">Active</div>
-    </div>
-    """, unsafe_allow_html=True)
+    Each image is read from disk once per (path, mtime, size, width)
+    and kept in memory both as a PIL image and as a compact data URI (WebP
+    when Pillow supports it, optimized PNG otherwise), so reruns embed a few
+    KB instead of re-encoding multi-MB source files.
+    """
 
-st.markdown("""</div>""", unsafe_allow_html=True)
-
-st.markdown("""
-<div style="text-align: center; margin: 2rem 0;">
-    <p style="font-size: 1.3rem; color: #ffffff; margin-bottom: 1rem; font-weight: 500;">
-        🚀 Your intelligent companion for all things Streamlit ✨
-    </p>
-    <p style="font-size: 1rem; color: #e2e8f0;">
-        Generate • Debug • Learn • Optimize
-    </p>
-</div>
-""", unsafe_allow_html=True)
-
-def img_to_base64(image_path):
-    """Convert image to base64."""
-    try:
-        # Check if file exists before trying to open it
-        if not os.path.exists(image_path):
+    def __init__(self, scale=IMAGE_ASSET_SCALE, quality=IMAGE_ASSET_QUALITY):
+        self.scale = scale
+        self.quality = quality
+        self.format = "WEBP" if lazy_import("PIL.features").check("webp") else "PNG"
+        self._entries = {}
+        self._avatars = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def _entry(self, image_path, width=None):
+        try:
+            stat = os.stat(image_path)
+        except OSError:
             logging.warning(f"Image file not found: {image_path}")
             return None
-
-        with open(image_path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
-    except Exception as e:
-        logging.error(f"Error converting image to base64: {str(e)}")
-        return None
+        key = (image_path, stat.st_mtime_ns, stat.st_size, width)
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry
+            try:
+                Image = pil_image()
+                with Image.open(image_path) as source:
+                    img = source.convert("RGBA" if source.mode in ("RGBA", "LA", "P") else "RGB")
+                if width:
+                    pixels = width * self.scale
+                    if img.width > pixels:
+                        img = img.resize((pixels, max(1, round(img.height * pixels / img.width))), Image.LANCZOS)
+            except Exception as e:
+                logging.error(f"Error loading image {image_path}: {str(e)}")
+                return None
+            # Drop entries for older versions of the same file
+            for stale in [k for k in self._entries if k[0] == image_path and k[1:3] != key[1:3]]:
+                del self._entries[stale]
+            entry = {"image": img, "data_uri": None}
+            self._entries[key] = entry
+            self.loads += 1
+            return entry
+
+    def data_uri(self, image_path, width=None):
+        """Return the image as a `data:` URI sized for `width` CSS pixels, or None if it can't be read."""
+        entry = self._entry(image_path, width)
+        if entry is None:
+            return None
+        if entry["data_uri"] is None:
+            buffer = io.BytesIO()
+            if self.format == "WEBP":
+                entry["image"].save(buffer, format="WEBP", quality=self.quality, method=6)
+            else:
+                entry["image"].save(buffer, format="PNG", optimize=True)
+            encoded = base64.b64encode(buffer.getvalue()).decode()
+            entry["data_uri"] = f"data:image/{self.format.lower()};base64,{encoded}"
+        return entry["data_uri"]
+
+    def avatar(self, role):
+        """Resolve a chat role's avatar once per process: a data URI, or an emoji if the image is missing."""
+        if role not in self._avatars:
+            path = CHAT_AVATAR_PATHS.get(role)
+            uri = self.data_uri(path, CHAT_AVATAR_WIDTH) if path else None
+            self._avatars[role] = uri or get_avatar_emoji(role)
+        return self._avatars[role]
+
+@st.cache_resource(show_spinner=False)
+def get_image_assets():
+    """Shared image asset cache for all sessions."""
+    return ImageAssetCache()
+
+def img_to_data_uri(image_path, width=None):
+    """Return a cached `data:` URI for an image, or None if it can't be read."""
+    return get_image_assets().data_uri(image_path, width)
 
 def get_avatar_emoji(role):
     """Get emoji avatar based on role."""
     return "🤖" if role == "assistant" else "👤"
 
+def get_chat_avatar(role):
+    """Get the avatar image for a chat role, falling back to an emoji if the image is missing."""
+    return get_image_assets().avatar(role)
+
+def chat_bubble_html(role, content):
+    """Build the themed bubble HTML for a chat message body."""
+    if role == "user":
+        return f'<div class="chat-message chat-user">👤 {content}</div>'
+    return f'<div class="chat-message chat-assistant">🤖 {content}</div>'
+
+def render_chat_bubble(container, role, content):
+    """Render a chat message body with the themed bubble styling."""
+    container.markdown(chat_bubble_html(role, content), unsafe_allow_html=True)
+
 def get_system_info():
     """Get comprehensive system information."""
     return {
@@ -302,10 +1575,40 @@ def get_system_info():
         "python_version": platform.python_version(),
         "streamlit_version": st.__version__,
         "cpu_count": os.cpu_count(),
-        "memory_usage": psutil.virtual_memory().percent,
+        "memory_usage": psutil_module().virtual_memory().percent,
         "timestamp": datetime.now().isoformat()
     }
 
+def render_startup_profile():
+    """Show cold-start imports (StartupProfile) and this session's rerun import overhead (RerunProfile)."""
+    summary = get_startup_profile().summary()
+    cold = summary["cold_start"]
+    reruns = [
+        section["wall_ms"]
+        for record in st.session_state.get("rerun_profiles", ())
+        for section in record["sections"] if section["name"] == "imports"
+    ]
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        cold_total = cold["top_level_imports"] + summary["lazy_imports"] if cold else None
+        st.metric("🧊 Cold-start imports", f"{cold_total * 1000:.0f} ms" if cold_total is not None else "n/a")
+    with col2:
+        warm = sum(reruns) / len(reruns) if reruns else None
+        st.metric("♻️ Rerun import overhead", f"{warm:.2f} ms" if warm is not None else "n/a")
+    with col3:
+        st.metric("🔁 Reruns profiled", len(reruns))
+    if not reruns:
+        st.caption("Enable the rerun profiler (STREAMSAGE_PROFILE=1) to measure the import overhead of each rerun.")
+    if summary["imports"]:
+        st.caption("First import of each lazily loaded dependency in this process:")
+        st.table([{"module": name, "ms": round(seconds * 1000, 1)} for name, seconds in summary["imports"]])
+    system = get_system_info()
+    st.caption(
+        f"{system['platform']} · Python {system['python_version']} · Streamlit {system['streamlit_version']} · "
+        f"{system['cpu_count']} CPUs · memory {system['memory_usage']}% used · "
+        f"process up since {datetime.fromtimestamp(get_startup_profile().created).strftime('%H:%M:%S')}"
+    )
+
 def generate_session_id():
     """Generate unique session ID."""
     return str(uuid.uuid4())[:8]
@@ -341,101 +1644,1146 @@ def long_running_task(duration):
     time.sleep(duration)
     return "Long-running operation completed."
 
-@st.cache_data(show_spinner=False)
-def load_and_enhance_image(image_path, enhance=False):
+PRERELEASE_RANKS = {"dev": 0, "a": 1, "alpha": 1, "b": 2, "beta": 2, "rc": 3}
+FINAL_RELEASE_RANK = 4
+
+def version_key(version):
     """
-    Load and optionally enhance an image.
+    Parse a version string into a numeric sort key.
 
-    Parameters:
-    - image_path: str, path of the image
-    - enhance: bool, whether to enhance the image or not
+    Handles major.minor[.patch] with an optional pre-release suffix, so
+    "1.10.0" sorts after "1.9", "1.28" equals "1.28.0", and "1.36.0rc1"
+    sorts before "1.36.0".
 
     Returns:
-    - img: PIL.Image.Image, (enhanced) image
+    - tuple: (major, minor, patch, pre-release rank, pre-release number).
     """
-    img = Image.open(image_path)
-    if enhance:
-        enhancer = ImageEnhance.Contrast(img)
-        img = enhancer.enhance(1.8)
-    return img
-
-@st.cache_data(show_spinner=False)
-def load_streamlit_updates():
-    """Load the latest Streamlit updates from local JSON file."""
-    try:
-        with open("data/streamlit_updates.json", "r") as f:
-            data = json.load(f)
-
-        # Add metadata about data source
-        data["_metadata"] = {
-            "source": "local_json",
-            "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M UTC"),
-            "status": "success"
-        }
+    match = re.search(r"(\d+)\.(\d+)(?:\.(\d+))?(?:[-.]?(dev|alpha|beta|rc|a|b)\.?(\d*))?", str(version), re.IGNORECASE)
+    if not match:
+        parts = [int(part) for part in re.findall(r"\d+", str(version))][:3]
+        return tuple(parts + [0] * (3 - len(parts))) + (FINAL_RELEASE_RANK, 0)
+    major, minor, patch, pre, pre_number = match.groups()
+    rank = PRERELEASE_RANKS[pre.lower()] if pre else FINAL_RELEASE_RANK
+    return (int(major), int(minor), int(patch or 0), rank, int(pre_number or 0))
+
+def format_version(key):
+    """Canonical string for a version key ("1.28" and "1.28.0" both become "1.28.0")."""
+    major, minor, patch, rank, pre_number = key
+    if rank == FINAL_RELEASE_RANK:
+        return f"{major}.{minor}.{patch}"
+    pre = {0: "dev", 1: "a", 2: "b", 3: "rc"}[rank]
+    return f"{major}.{minor}.{patch}{pre}{pre_number}"
+
+class ReleaseIndex:
+    """
+    Releases of the updates data in semantic-version order.
 
-        return data
+    Built once per data snapshot: versions are parsed and sorted numerically
+    and each release maps to its change entries, so range queries ("since
+    1.30", "between 1.30 and 1.36") are a bisect plus a slice.
+    """
 
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        logging.error(f"Error loading JSON: {str(e)}")
-        return {
-            "Highlights": {
-                "Error": {
-                    "Description": "Unable to load Streamlit updates data. Please check your data/streamlit_updates.json file.",
-                    "Documentation": "Ensure the data file exists and contains valid JSON."
-                }
-            },
-            "_metadata": {
-                "source": "error",
-                "error": str(e),
-                "status": "failed"
-            }
-        }
+    def __init__(self, updates):
+        release_version = default_release_version(updates)
+        entries = {}
+        for section in UPDATES_SECTIONS:
+            for name, fields in (updates.get(section) or {}).items():
+                version = entry_version(name, fields, release_version)
+                if version:
+                    entries.setdefault(version_key(version), []).append(
+                        {"section": section, "name": name, "fields": fields}
+                    )
+        self.keys = sorted(entries)  # ascending
+        self.versions = [format_version(key) for key in self.keys]
+        self.entries = {format_version(key): entries[key] for key in self.keys}
+
+    def newest_first(self):
+        return list(reversed(self.versions))
+
+    def changes(self, version):
+        """Return the change entries of one release."""
+        return self.entries.get(format_version(version_key(version)), [])
+
+    def between(self, start=None, end=None, include_start=False):
+        """
+        Return [(version, entries)] for releases after `start` up to and including `end`, oldest first.
 
-def get_available_versions():
-    """Get list of available Streamlit versions from local data."""
-    try:
-        # Load from local JSON data
-        with open("data/streamlit_updates.json", "r") as f:
-            data = json.load(f)
+        `start`/`end` of None leave that side open, so `between("1.30")` is
+        everything since 1.30.
+        """
+        low = 0
+        if start:
+            side = bisect.bisect_left if include_start else bisect.bisect_right
+            low = side(self.keys, version_key(start))
+        high = bisect.bisect_right(self.keys, version_key(end)) if end else len(self.keys)
+        return [(self.versions[i], self.entries[self.versions[i]]) for i in range(low, high)]
+
+def describe_changes_between(start, end=None, max_items=UPDATES_COMPARE_MAX_ITEMS):
+    """
+    Summarize what changed after release `start` up to release `end` (or the newest).
 
-        versions = []
-        if "Highlights" in data:
-            for key in data["Highlights"].keys():
-                if key.startswith("Version"):
-                    version_match = re.search(r'Version\s+(\d+\.\d+(?:\.\d+)?)', key)
-                    if version_match:
-                        versions.append(version_match.group(1))
+    Returns:
+    - str: Markdown list grouped by release, newest first.
+    """
+    if end and version_key(start) > version_key(end):
+        start, end = end, start
+    releases = get_updates_repository().snapshot().releases.between(start, end)
+    target = f"{start} and {end}" if end else f"{start} and the newest release"
+    if not releases:
+        return f"No changes are recorded between Streamlit {target}."
+
+    releases = [
+        (version, [entry for entry in entries if not entry["name"].startswith("Version ")])
+        for version, entries in reversed(releases)
+    ]
+    total = sum(len(entries) for _, entries in releases)
+    lines = [f"**{total} changes across {len(releases)} release(s) between Streamlit {target}:**"]
+    shown = 0
+    for version, entries in releases:
+        if shown >= max_items:
+            break
+        lines.append(f"\n**Version {version}**")
+        for entry in entries[:max_items - shown]:
+            description = entry["fields"].get("Description", "No description available.")
+            lines.append(f"- *{UPDATES_SECTION_LABELS[entry['section']][1]}* · **{entry['name']}**: {description}")
+            shown += 1
+    if shown < total:
+        lines.append(f"\n…and {total - shown} more. Use the Latest Updates browser to see every entry.")
+    return "\n".join(lines)
+
+def parse_version_range_question(text):
+    """
+    Recognize "what changed between X and Y" / "since X" questions.
 
-        return sorted(versions, reverse=True) if versions else ["1.32", "1.31", "1.30", "1.29", "1.28"]
+    Returns:
+    - tuple: (start, end) version strings (end may be None), or None.
+    """
+    between = re.search(rf"(?:between|from)\s+(?:version\s+|v)?({VERSION_PATTERN})\s+(?:and|to)\s+(?:version\s+|v)?({VERSION_PATTERN})", text)
+    if between and re.search(r"chang|new|differ|update|release", text):
+        return between.group(1), between.group(2)
+    since = re.search(rf"since\s+(?:version\s+|v)?({VERSION_PATTERN})", text)
+    if since and re.search(r"chang|new|differ|update|release", text):
+        return since.group(1), None
+    return None
 
-    except Exception as e:
-        logging.error(f"Error getting versions: {str(e)}")
-        return ["1.32", "1.31", "1.30", "1.29", "1.28"]
+def default_release_version(updates):
+    """
+    Release that entries without a version of their own belong to.
 
-def get_scraping_info():
-    """Get information about data sources and scraping status."""
-    return {
-        "primary_source": "Local JSON data (data/streamlit_updates.json)",
-        "fallback_source": "Web scraping (if enabled)",
-        "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M UTC"),
-        "status": "Using cached data for reliability"
-    }
+    That is the hand-maintained "Version X" highlight (ingested releases
+    always carry a Version field), or the first one if every release has it.
+    """
+    fallback = None
+    for name, fields in (updates.get("Highlights") or {}).items():
+        match = re.search(rf"Version\s+({VERSION_PATTERN})", name)
+        if match:
+            if not (isinstance(fields, dict) and fields.get("Version")):
+                return match.group(1)
+            fallback = fallback or match.group(1)
+    return fallback
+
+def entry_version(name, fields, release_version=None):
+    """
+    Version an updates entry belongs to: its own Version field, a version in
+    its name, or the release default. Always canonical ("1.28" -> "1.28.0"),
+    so every backend reports and filters versions the same way.
+    """
+    match = re.search(rf"({VERSION_PATTERN})", str(fields.get("Version") or name))
+    version = match.group(1) if match else release_version
+    return format_version(version_key(version)) if version else None
 
-def get_streamlit_api_code_version():
+def validate_updates(data):
     """
-    Get the current Streamlit API code version from the Streamlit API documentation.
+    Check the shape of updates data and drop malformed entries.
 
     Returns:
-    - str: The current Streamlit API code version.
+    - dict: The known sections, each mapping entry names to field dicts.
+
+    Raises:
+    - ValueError: If the data is not a JSON object.
     """
+    if not isinstance(data, dict):
+        raise ValueError("updates data must be a JSON object")
+    validated = {}
+    for section in UPDATES_SECTIONS:
+        entries = data.get(section) or {}
+        if not isinstance(entries, dict):
+            logging.warning(f"Ignoring updates section {section}: expected an object")
+            continue
+        validated[section] = {}
+        for name, fields in entries.items():
+            if isinstance(fields, dict):
+                validated[section][name] = fields
+            else:
+                logging.warning(f"Ignoring malformed updates entry {section}/{name}")
+    return validated
+
+class UpdatesSnapshot:
+    """One parsed version of the updates file plus views precomputed from it."""
+
+    def __init__(self, data, file_version=None, status="success", error=None):
+        self.data = data
+        self.file_version = file_version
+        self.status = status
+        self.error = error
+        self.loaded_at = time.time()
+        self.modified_at = file_version[0] / 1e9 if file_version else None
+        self.counts = {section: len(data.get(section, {})) for section in UPDATES_SECTIONS}
+        self.releases = ReleaseIndex(data)
+        self.versions = self.releases.newest_first()
+        self._index = None
+        self._index_lock = threading.Lock()
+
+    @property
+    def index(self):
+        """Keyword search index over this snapshot, built on first use."""
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    self._index = UpdatesIndex(self.data)
+        return self._index
+
+class UpdatesRepository:
+    """
+    Single owner of the parsed Streamlit updates data.
+
+    Readers get the current snapshot without touching the disk (only the very
+    first access loads synchronously). `revalidate`, run by the background
+    UpdatesRefresher, stats the files and swaps in a freshly parsed snapshot
+    only when a modification time or size changed. A failed reload keeps
+    serving the last good snapshot.
+
+    The tracked updates file is never written. Releases ingested from the
+    changelog are kept in an untracked overlay file (`overlay_path`) and laid
+    over it on load; overlay releases the tracked file has caught up with
+    are ignored.
+    """
+
+    def __init__(self, path=UPDATES_DATA_PATH, overlay_path=UPDATES_OVERLAY_PATH):
+        self.path = path
+        self.overlay_path = overlay_path
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._seen_version = None  # file version of the last load attempt, successful or not
+        self.reloads = 0
+        self.refresh_lock = threading.Lock()
+        self.checked_at = None
+
+    def _file_version(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        try:
+            overlay = os.stat(self.overlay_path) if self.overlay_path else None
+        except OSError:
+            overlay = None
+        if overlay is None:
+            return (stat.st_mtime_ns, stat.st_size, None)
+        return (max(stat.st_mtime_ns, overlay.st_mtime_ns), stat.st_size, overlay.st_size)
+
+    def snapshot(self):
+        """Return the current snapshot (loading it on first use)."""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        self.revalidate()
+        return self._snapshot
+
+    def revalidate(self):
+        """
+        Reload the file if it changed on disk and atomically swap the snapshot.
+
+        Returns:
+        - bool: True if a new snapshot was swapped in.
+        """
+        file_version = self._file_version()
+        self.checked_at = time.time()
+        if self._snapshot is not None and file_version == self._seen_version:
+            return False
+        with self._lock:
+            if self._snapshot is not None and file_version == self._seen_version:
+                return False
+            snapshot = self._load(file_version, self._snapshot)
+            swapped = snapshot is not self._snapshot
+            self._snapshot = snapshot
+            self._seen_version = file_version
+            return swapped
+
+    def merge_releases(self, releases):
+        """
+        Add newly ingested changelog releases to the overlay file.
+
+        Only releases newer than every stored version are merged; new entries
+        are placed ahead of the existing ones so the newest release comes first.
+        The overlay is replaced atomically and the snapshot swapped in place.
+
+        Returns:
+        - list: The versions that were added.
+        """
+        with self._lock:
+            current = self._snapshot or self._load(self._file_version(), None)
+            newest = version_key(current.versions[0]) if current.versions and current.status == "success" else ()
+            added = [release for release in releases if version_key(release["version"]) > newest]
+            if not added or not self.overlay_path:
+                return []
+
+            save_state_file({"releases": added + self._load_overlay()}, self.overlay_path)
+            self._seen_version = self._file_version()
+            self._snapshot = self._load(self._seen_version, current)
+            return [release["version"] for release in added]
+
+    def _load_overlay(self):
+        """Return the ingested releases of the overlay file, newest first ([] if there is none)."""
+        if not self.overlay_path or not os.path.exists(self.overlay_path):
+            return []
+        releases = load_state_file(self.overlay_path).get("releases")
+        if not isinstance(releases, list):
+            logging.warning(f"Ignoring malformed updates overlay {self.overlay_path}")
+            return []
+        return [release for release in releases if isinstance(release, dict) and release.get("version")]
+
+    def _load(self, file_version, previous):
+        try:
+            with open(self.path, "r") as f:
+                data = validate_updates(json.load(f))
+            data = overlay_releases(data, self._load_overlay())
+            self.reloads += 1
+            return UpdatesSnapshot(data, file_version)
+        except (OSError, ValueError) as e:
+            logging.error(f"Error loading JSON: {str(e)}")
+            if previous is not None and previous.status == "success":
+                return previous
+            data = {
+                "Highlights": {
+                    "Error": {
+                        "Description": "Unable to load Streamlit updates data. Please check your data/streamlit_updates.json file.",
+                        "Documentation": "Ensure the data file exists and contains valid JSON."
+                    }
+                }
+            }
+            return UpdatesSnapshot(data, file_version, status="failed", error=str(e))
+
+def overlay_releases(data, releases):
+    """
+    Return updates data with ingested changelog releases laid over it.
+
+    Releases not newer than the newest version in `data` are skipped; the
+    entries of the others are placed first, renamed where a name is taken.
+    """
+    versions = ReleaseIndex(data).newest_first()
+    newest = version_key(versions[0]) if versions else ()
+    releases = [release for release in releases if version_key(release["version"]) > newest]
+    if not releases:
+        return data
+    merged = {section: {} for section in UPDATES_SECTIONS}
+    for release in sorted(releases, key=lambda release: version_key(release["version"]), reverse=True):
+        for section, name, fields in release_entries(release):
+            while name in merged[section] or name in data.get(section, {}):
+                name = f"{name} ({release['version']})"
+            merged[section][name] = fields
+    for section in UPDATES_SECTIONS:
+        merged[section].update(data.get(section, {}))
+    return merged
+
+@st.cache_resource(show_spinner=False)
+def get_updates_repository():
+    """Return the process-wide Streamlit updates repository."""
+    return UpdatesRepository()
+
+class UpdatesRefresher:
+    """
+    Background thread that keeps the updates data fresh (stale-while-revalidate).
+
+    Every `interval` seconds (or only on `trigger()` when `interval` is 0) it
+    revalidates the local file and re-syncs the optional SQLite store; every
+    `changelog_interval` seconds it also pulls new releases from the remote
+    changelog (off unless configured; see CHANGELOG_REFRESH_SECONDS). Reruns never wait on it: they read whatever
+    snapshot is current and pick up the new one once swapped in.
+
+    `last_result` is shared by every session and stamped with `finished_at`,
+    so each session can show a given result once.
+    """
+
+    def __init__(self, repository, interval=UPDATES_REFRESH_SECONDS, changelog_interval=CHANGELOG_REFRESH_SECONDS):
+        self.repository = repository
+        self.interval = interval
+        self.changelog_interval = changelog_interval
+        self.last_changelog_refresh = None
+        self.last_result = None
+        self._force_changelog = False
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="updates-refresher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def trigger(self, changelog=False):
+        """Ask for a refresh now instead of at the next interval (optionally including the remote changelog)."""
+        if changelog:
+            self._force_changelog = True
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.interval <= 0:
+                self._wait()
+                if self._stop.is_set():
+                    return
+            try:
+                self.refresh_once()
+            except Exception as e:
+                logging.error(f"Background updates refresh failed: {str(e)}")
+            if self.interval > 0:
+                self._wait(self.interval)
+
+    def _wait(self, timeout=None):
+        self._wake.wait(timeout)
+        self._wake.clear()
+
+    def refresh_once(self):
+        self.repository.revalidate()
+        store = get_updates_store()
+        if store is not None:
+            store.sync(self.repository.snapshot())
+        due = False
+        if self.changelog_interval > 0:
+            last_check = self.last_changelog_refresh or load_state_file().get("checked_at") or 0
+            due = time.time() - last_check >= self.changelog_interval
+        if due or self._force_changelog:
+            self._force_changelog = False
+            self.last_changelog_refresh = time.time()
+            self.last_result = dict(refresh_changelog(), finished_at=time.time())
+            if store is not None and self.last_result["added"]:
+                store.sync(self.repository.snapshot())
+
+@st.cache_resource(show_spinner=False)
+def get_updates_refresher():
+    """Start (once per process) and return the background updates refresher."""
+    return UpdatesRefresher(get_updates_repository()).start()
+
+def load_streamlit_updates():
+    """
+    Load the latest Streamlit updates from local JSON file.
+
+    The returned dict is shared between sessions and must not be modified.
+    """
+    with profile_section("updates load"):
+        return get_updates_repository().snapshot().data
+
+def get_available_versions():
+    """Get list of available Streamlit versions from local data."""
+    store = get_updates_store()
+    return store.versions() if store is not None else get_updates_repository().snapshot().versions
+
+class ChangelogParser(HTMLParser):
+    """
+    Incremental parser for the Streamlit release notes page.
+
+    Fed the page chunk by chunk; collects releases ("Version X.Y.Z" headings)
+    with their Highlights / Notable Changes / Other Changes list items, and
+    sets `done` as soon as it reaches a release at or below `stop_version`, so
+    the rest of the page need not be downloaded. Permalink anchors inside
+    headings (`<a href="#version-...">#</a>`) are ignored.
+
+    `max_releases` only bounds a first ingestion (no `stop_version`): with a
+    stop version every newer release is collected, so a backlog larger than
+    the cap is never left behind as a gap.
+    """
+
+    SECTION_NAMES = {"highlights": "Highlights", "notablechanges": "NotableChanges", "otherchanges": "OtherChanges"}
+    HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "p", "strong", "b"}
+
+    def __init__(self, stop_version=None, max_releases=CHANGELOG_MAX_NEW_RELEASES):
+        super().__init__(convert_charrefs=True)
+        self.stop_key = version_key(stop_version) if stop_version else None
+        self.max_releases = max_releases
+        self.releases = []
+        self.done = False
+        self._release = None
+        self._section = None
+        self._text_stack = []  # [tag, text parts] for open heading-like elements
+        self._item = None  # [text parts, issue refs] of the open top-level list item
+        self._item_depth = 0
+        self._permalink_depth = 0  # open <a href="#..."> elements inside a heading
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == "li":
+            self._item_depth += 1
+            if self._item_depth == 1:
+                self._item = [[], []]
+            else:
+                self._item[0].append(" ")
+        elif tag == "a" and self._item is not None:
+            match = re.search(r"github\.com/streamlit/streamlit/(?:issues|pull)/(\d+)", dict(attrs).get("href") or "")
+            if match:
+                self._item[1].append(f"#{match.group(1)}")
+        elif tag == "a" and self._text_stack and (dict(attrs).get("href") or "").startswith("#"):
+            self._permalink_depth += 1
+        elif tag in self.HEADING_TAGS and self._item is None:
+            self._text_stack.append([tag, []])
+
+    def handle_endtag(self, tag):
+        if self.done:
+            return
+        if tag == "li" and self._item_depth:
+            self._item_depth -= 1
+            if self._item_depth == 0:
+                self._finish_item()
+        elif tag == "a" and self._permalink_depth:
+            self._permalink_depth -= 1
+        elif self._text_stack and self._text_stack[-1][0] == tag:
+            _, parts = self._text_stack.pop()
+            self._finish_heading(" ".join("".join(parts).split()))
+
+    def handle_data(self, data):
+        if self.done:
+            return
+        if self._item is not None:
+            self._item[0].append(data)
+        if self._permalink_depth:
+            return
+        for _, parts in self._text_stack:
+            parts.append(data)
+
+    def _finish_heading(self, text):
+        version = re.match(rf"^Version\s+({VERSION_PATTERN})\b", text) if len(text) < 40 else None
+        if version:
+            if self.stop_key is not None and version_key(version.group(1)) <= self.stop_key:
+                self.done = True
+                return
+            if self.stop_key is None and len(self.releases) >= self.max_releases:
+                self.done = True
+                return
+            self._release = {"version": version.group(1), "date": None, "sections": {}}
+            self._section = None
+            self.releases.append(self._release)
+            return
+        if self._release is None:
+            return
+        date = re.match(r"^\*?Release date:\s*(.+?)\*?$", text)
+        if date:
+            self._release["date"] = date.group(1)
+            return
+        section = self.SECTION_NAMES.get(re.sub(r"[^a-z]", "", text.lower()))
+        if section:
+            self._section = section
+
+    def _finish_item(self):
+        parts, issues = self._item
+        self._item = None
+        if self._release is None or self._section is None:
+            return
+        text = " ".join("".join(parts).split())
+        issues += [ref for ref in re.findall(r"#\d+", text) if ref not in issues]
+        description = re.sub(r"\s*\(?#\d+(?:\s*,\s*#\d+)*\)?", "", text)
+        description = re.sub(r"^[^\w]+", "", description).strip(" ,.;") + "."
+        if description.strip(".") and len(description) > 2:
+            self._release["sections"].setdefault(self._section, []).append({"Description": description, "Issues": issues})
+
+def parse_changelog_html(chunks, stop_version=None, max_releases=CHANGELOG_MAX_NEW_RELEASES):
+    """
+    Parse release notes HTML from an iterable of text chunks.
+
+    Stops consuming `chunks` once a release at or below `stop_version` is
+    reached, so callers streaming a response only download the new part.
+
+    Returns:
+    - list: Releases, newest first, as dicts with `version`, `date` and
+      `sections` (section name -> list of entry dicts).
+    """
+    parser = ChangelogParser(stop_version, max_releases)
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.done:
+            break
+    parser.close()
+    return parser.releases
+
+def changelog_entry_name(description):
+    """Derive a CamelCase entry name (as used in the updates file) from a changelog line."""
+    stopwords = {
+        "a", "an", "the", "to", "of", "and", "for", "in", "is", "are", "now", "new", "with", "on", "by", "when",
+        "that", "it", "can", "be", "you", "your", "bug", "fix", "streamlit", "st", "supports", "support", "added",
+    }
+    words = [w for w in re.findall(r"[A-Za-z0-9]+", description) if w.lower() not in stopwords]
+    name = "".join(w[:1].upper() + w[1:] for w in words[:3]) or "Change"
+    return name + "Fix" if description.lower().startswith("bug fix") else name
+
+def release_entries(release):
+    """Yield (section, name, fields) for a parsed release in the updates file format."""
+    version = release["version"]
+    highlight = {
+        "Description": f"Streamlit Version {version} is here!",
+        "Documentation": f"Check out the release notes at: {CHANGELOG_URL}#version-{version.replace('.', '-')}",
+        "Version": version,
+    }
+    if release["date"]:
+        highlight["ReleaseDate"] = release["date"]
+    yield "Highlights", f"Version {version}", highlight
+
+    for section in UPDATES_SECTIONS:
+        for item in release["sections"].get(section, []):
+            fields = {"Description": item["Description"], "Version": version}
+            if len(item["Issues"]) == 1:
+                fields["Issue"] = item["Issues"][0]
+            elif item["Issues"]:
+                fields["Issues"] = item["Issues"]
+            yield section, changelog_entry_name(item["Description"]), fields
+
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+    """Return the process-wide pooled HTTP session for docs and changelog requests."""
+    requests = requests_module()
+    retry_module = lazy_import("urllib3.util.retry")
+    session = requests.Session()
+    # Read timeouts are not retried, so a caller's timeout bounds the wait
+    retries = retry_module.Retry(total=2, read=0, backoff_factor=0.5, status_forcelist=(502, 503, 504), allowed_methods=("GET", "HEAD"))
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE, max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = f"StreamSage/{PROJECT_VERSION}"
+    return session
+
+def load_state_file(path=CHANGELOG_STATE_PATH):
+    """Return saved HTTP validators (ETag, Last-Modified) and check times, e.g. of the last changelog check."""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_state_file(state, path=CHANGELOG_STATE_PATH):
+    """Atomically write a state dict for load_state_file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(temp_path, path)
+
+def iter_file_chunks(path, chunk_size=16384):
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+def refresh_changelog(html_path=None, url=CHANGELOG_URL):
+    """
+    Pull new releases from the Streamlit changelog into the updates overlay.
+
+    Sends a conditional GET with the validators from the previous check, so an
+    unchanged page costs a single 304. A changed page is streamed and parsed
+    only down to the newest release already stored, and just the new releases
+    are merged. Pass `html_path` to ingest a saved copy of the page instead
+    (no network access).
+
+    Returns:
+    - dict: `status` ("not_modified", "updated", "unchanged" or "error"),
+      `added` (new versions) and `error` (message, if any).
+    """
+    repository = get_updates_repository()
+    with repository.refresh_lock:
+        snapshot = repository.snapshot()
+        stop_version = snapshot.versions[0] if snapshot.versions and snapshot.status == "success" else None
+        state = load_state_file()
+        response = None
+        try:
+            if html_path:
+                chunks = iter_file_chunks(html_path)
+            else:
+                headers = {}
+                if state.get("url") == url:
+                    if state.get("etag"):
+                        headers["If-None-Match"] = state["etag"]
+                    if state.get("last_modified"):
+                        headers["If-Modified-Since"] = state["last_modified"]
+                response = get_http_session().get(
+                    url, headers=headers, stream=True, timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+                )
+                if response.status_code == 304:
+                    state["checked_at"] = time.time()
+                    save_state_file(state)
+                    return {"status": "not_modified", "added": [], "error": None}
+                response.raise_for_status()
+                response.encoding = response.encoding or "utf-8"
+                chunks = response.iter_content(chunk_size=16384, decode_unicode=True)
+
+            added = repository.merge_releases(parse_changelog_html(chunks, stop_version))
+        except (requests_module().RequestException, OSError) as e:
+            logging.error(f"Error refreshing the Streamlit changelog: {str(e)}")
+            return {"status": "error", "added": [], "error": str(e)}
+        finally:
+            if response is not None:
+                response.close()
+
+        if response is not None:
+            state = {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+        state["checked_at"] = time.time()
+        save_state_file(state)
+        return {"status": "updated" if added else "unchanged", "added": added, "error": None}
+
+def sortable_version(version):
+    """Zero-padded version string that sorts and range-compares correctly as text."""
+    return ".".join(f"{part:05d}" for part in version_key(version))
+
+def updates_search_text(name, fields):
+    """Searchable terms of an updates entry: its name and every field value, tokenized."""
+    return " ".join(tokenize_search_text(" ".join([name] + [str(value) for value in fields.values()])))
+
+UPDATES_DB_SCHEMA_VERSION = "2"
+
+class UpdatesSQLiteStore:
+    """
+    Optional SQLite store for the Streamlit updates, with an FTS5 index.
+
+    Releases and entries are rows, so callers fetch only the section, version
+    range or search hits they need instead of walking the whole document. The
+    JSON updates file stays the source of truth: `sync` re-imports it whenever
+    its modification time or size changes. The FTS table indexes the same
+    terms as UpdatesIndex (name and all fields, tokenized the same way), so
+    both backends return the same hits.
+    """
+
+    def __init__(self, path=UPDATES_DB_PATH):
+        self.path = path
+        self.synced = False
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if not row or row[0] != UPDATES_DB_SCHEMA_VERSION:
+                # Older stores declared items_fts over columns `items` lacks; rebuild from the JSON file
+                self._conn.executescript(
+                    "DROP TABLE IF EXISTS items_fts; DROP TABLE IF EXISTS items; DROP TABLE IF EXISTS releases; "
+                    "DELETE FROM meta;"
+                )
+                self._conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('schema_version', ?)", (UPDATES_DB_SCHEMA_VERSION,)
+                )
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS releases (
+                    version TEXT PRIMARY KEY,
+                    sort_key TEXT NOT NULL,
+                    release_date TEXT
+                );
+                CREATE TABLE IF NOT EXISTS items (
+                    id INTEGER PRIMARY KEY,
+                    section TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    version TEXT,
+                    sort_key TEXT,
+                    position INTEGER NOT NULL,
+                    description TEXT NOT NULL,
+                    fields TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS items_section ON items(section, position);
+                CREATE INDEX IF NOT EXISTS items_version ON items(sort_key);
+                CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(terms);"""
+            )
+
+    def sync(self, snapshot=None):
+        """Re-import the updates snapshot (tracked file plus overlay) if it changed since the last import."""
+        self.synced = True
+        snapshot = snapshot or get_updates_repository().snapshot()
+        if snapshot.status != "success" or snapshot.file_version is None:
+            return False
+        stamp = ":".join(str(part) for part in snapshot.file_version)
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'source_version'").fetchone()
+        if row and row[0] == stamp:
+            return False
+        self.import_updates(snapshot.data, stamp)
+        return True
+
+    def import_updates(self, updates, source_version=""):
+        """Replace the store's contents with updates in the JSON file format."""
+        release_version = default_release_version(updates)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM items")
+            self._conn.execute("DELETE FROM releases")
+            self._conn.execute("DELETE FROM items_fts")
+            position = 0
+            for section in UPDATES_SECTIONS:
+                for name, fields in (updates.get(section) or {}).items():
+                    version = entry_version(name, fields, release_version)
+                    if version:
+                        self._conn.execute(
+                            "INSERT INTO releases (version, sort_key, release_date) VALUES (?, ?, ?) "
+                            "ON CONFLICT(version) DO UPDATE SET release_date = COALESCE(excluded.release_date, release_date)",
+                            (version, sortable_version(version), fields.get("ReleaseDate"))
+                        )
+                    description = str(fields.get("Description", ""))
+                    cursor = self._conn.execute(
+                        "INSERT INTO items (section, name, version, sort_key, position, description, fields) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (section, name, version, sortable_version(version) if version else None, position,
+                         description, json.dumps(fields))
+                    )
+                    self._conn.execute(
+                        "INSERT INTO items_fts (rowid, terms) VALUES (?, ?)",
+                        (cursor.lastrowid, updates_search_text(name, fields))
+                    )
+                    position += 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('source_version', ?)", (source_version,)
+            )
+
+    @staticmethod
+    def _filters(section=None, min_version=None, max_version=None, table="items"):
+        """Return (clauses, params) filtering `table`'s rows by section and version range."""
+        clauses, params = [], []
+        if section:
+            clauses.append(f"{table}.section = ?")
+            params.append(section)
+        if min_version:
+            clauses.append(f"{table}.sort_key >= ?")
+            params.append(sortable_version(min_version))
+        if max_version:
+            clauses.append(f"{table}.sort_key <= ?")
+            params.append(sortable_version(max_version))
+        return clauses, params
+
+    def _where(self, section=None, min_version=None, max_version=None, table="items"):
+        clauses, params = self._filters(section, min_version, max_version, table)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def items(self, section=None, min_version=None, max_version=None, limit=None, offset=0):
+        """Return (name, fields, version) rows in file order, optionally filtered by section and version range."""
+        where, params = self._where(section, min_version, max_version)
+        sql = f"SELECT name, fields, version FROM items{where} ORDER BY position LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit if limit is not None else -1, offset]).fetchall()
+        return [(name, json.loads(fields), version) for name, fields, version in rows]
+
+    def count(self, section=None, min_version=None, max_version=None):
+        """Return the number of entries matching the filters, without reading them."""
+        where, params = self._where(section, min_version, max_version)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM items{where}", params).fetchone()[0]
+
+    def counts(self):
+        """Return the number of entries per section."""
+        with self._lock:
+            rows = dict(self._conn.execute("SELECT section, COUNT(*) FROM items GROUP BY section").fetchall())
+        return {section: rows.get(section, 0) for section in UPDATES_SECTIONS}
+
+    def versions(self):
+        """Return all stored release versions, newest first."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT version FROM releases ORDER BY sort_key DESC")]
+
+    def search(self, query, top_k=UPDATES_SEARCH_TOP_K, section=None, min_version=None, max_version=None):
+        """Full-text search with FTS5 BM25 ranking; same hit format as UpdatesIndex.search."""
+        terms = tokenize_search_text(query)
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"*' for term in terms)
+        clauses, params = self._filters(section, min_version, max_version, table="items")
+        sql = (
+            "SELECT items.section, items.name, items.version, items.fields, -bm25(items_fts) AS score "
+            "FROM items_fts JOIN items ON items.id = items_fts.rowid WHERE "
+            + " AND ".join(["items_fts MATCH ?"] + clauses)
+            + " ORDER BY bm25(items_fts) LIMIT ?"
+        )
+        params = [match] + params
+        with self._lock:
+            rows = self._conn.execute(sql, params + [top_k]).fetchall()
+        return [
+            {"section": row[0], "name": row[1], "version": row[2], "fields": json.loads(row[3]), "score": round(row[4], 4)}
+            for row in rows
+        ]
+
+@st.cache_resource(show_spinner=False)
+def get_updates_sqlite_store():
+    """Return the process-wide SQLite updates store, or None when it is not enabled."""
+    if not UPDATES_DB_PATH:
+        return None
     try:
-        response = requests.get(API_DOCS_URL)
-        if response.status_code == 200:
-            return "1.36"
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error connecting to the Streamlit API documentation: {str(e)}")
+        return UpdatesSQLiteStore(UPDATES_DB_PATH)
+    except sqlite3.Error as e:
+        logging.error(f"SQLite updates store unavailable, using the JSON file: {str(e)}")
+        return None
+
+def get_updates_store():
+    """
+    Return the SQLite updates store if one is configured, else None.
+
+    The store is imported synchronously only on first use; after that the
+    background refresher keeps it in sync with the JSON file.
+    """
+    store = get_updates_sqlite_store()
+    if store is None:
+        return None
+    if not store.synced:
+        try:
+            store.sync()
+        except (OSError, ValueError, sqlite3.Error) as e:
+            logging.error(f"Error syncing the SQLite updates store: {str(e)}")
+    return store
+
+def get_update_items(section, min_version=None, max_version=None, limit=None, offset=0):
+    """
+    Return (name, fields, version) entries of one updates section.
+
+    Uses the SQLite store when configured (only the requested rows are read),
+    otherwise filters the in-memory snapshot.
+    """
+    store = get_updates_store()
+    if store is not None:
+        return store.items(section, min_version, max_version, limit, offset)
+    data = get_updates_repository().snapshot().data
+    release_version = default_release_version(data)
+    items = []
+    for name, fields in data.get(section, {}).items():
+        version = entry_version(name, fields, release_version)
+        if min_version and (not version or version_key(version) < version_key(min_version)):
+            continue
+        if max_version and (not version or version_key(version) > version_key(max_version)):
+            continue
+        items.append((name, fields, version))
+    return items[offset:offset + limit if limit is not None else None]
+
+def get_update_count(section, min_version=None, max_version=None):
+    """Return the number of entries of one updates section in a version range."""
+    store = get_updates_store()
+    if store is not None:
+        return store.count(section, min_version, max_version)
+    return len(get_update_items(section, min_version, max_version))
+
+def get_update_counts():
+    """Return the number of entries per updates section."""
+    store = get_updates_store()
+    return store.counts() if store is not None else dict(get_updates_repository().snapshot().counts)
+
+def get_scraping_info():
+    """Get information about data sources and scraping status."""
+    repository = get_updates_repository()
+    snapshot = repository.snapshot()
+
+    def format_time(timestamp):
+        return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d %H:%M UTC") if timestamp else "never"
+
+    return {
+        "primary_source": f"Local JSON data ({UPDATES_DATA_PATH})",
+        "fallback_source": f"Incremental changelog ingestion ({CHANGELOG_URL}) into {UPDATES_OVERLAY_PATH}",
+        "last_updated": format_time(snapshot.modified_at or snapshot.loaded_at),
+        "last_refreshed": format_time(snapshot.loaded_at),
+        "last_checked": format_time(repository.checked_at),
+        "changelog_checked": format_time(load_state_file().get("checked_at")),
+        "status": "Using cached data for reliability" if snapshot.status == "success" else f"Load failed: {snapshot.error}"
+    }
+
+DOCS_VERSION_PATTERNS = (
+    re.compile(rf'"(?:streamlit_?)?version"\s*:\s*"v?({VERSION_PATTERN})"', re.IGNORECASE),
+    re.compile(rf"\bStreamlit\s+(?:version\s+)?v?({VERSION_PATTERN})", re.IGNORECASE),
+    # Last resort: the "v1.50.0" label of the docs site's version selector, not any "v..." on the page
+    re.compile(rf"<[^>]*version[^>]*>\s*(?:<[^>]*>\s*)*v({VERSION_PATTERN})\b", re.IGNORECASE),
+)
+
+def parse_docs_version(text):
+    """Return the newest Streamlit version mentioned in a docs page, trying the most specific patterns first."""
+    for pattern in DOCS_VERSION_PATTERNS:
+        found = pattern.findall(text)
+        if found:
+            return format_version(max(version_key(version) for version in found))
     return None
 
+class DocsVersionProbe:
+    """
+    Time-bounded, cached probe for the Streamlit version the API docs describe.
+
+    Results are cached for `ttl_seconds`, failures included, so an
+    unreachable page or one without a version is retried once per TTL rather
+    than on every call. A refresh is a conditional GET (If-None-Match /
+    If-Modified-Since) through the pooled session with strict connect/read
+    timeouts, reading at most `max_bytes` of the page within `deadline`
+    seconds. Any failure returns the last known good version, which is also
+    persisted so it survives restarts offline.
+    """
+
+    def __init__(self, url=API_DOCS_URL, ttl_seconds=DOCS_VERSION_TTL_SECONDS, state_path=DOCS_VERSION_STATE_PATH,
+                 deadline=DOCS_PROBE_DEADLINE_SECONDS, max_bytes=DOCS_PROBE_MAX_BYTES):
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self.state_path = state_path
+        self.deadline = deadline
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.state = load_state_file(state_path) if state_path else {}
+        if self.state.get("url") != url:
+            self.state = {"url": url}
+
+    def get(self):
+        """Return the docs version, refreshing it first if the last check is older than the TTL."""
+        if not self._expired():
+            return self.state.get("version")
+        with self._lock:
+            if self._expired():
+                self._refresh()
+            return self.state.get("version")
+
+    def _expired(self):
+        return time.time() - (self.state.get("checked_at") or 0) >= self.ttl_seconds
+
+    def _refresh(self):
+        headers = {}
+        if self.state.get("etag"):
+            headers["If-None-Match"] = self.state["etag"]
+        if self.state.get("last_modified"):
+            headers["If-Modified-Since"] = self.state["last_modified"]
+        started = time.monotonic()
+        response = None
+        try:
+            response = get_http_session().get(
+                self.url, headers=headers, stream=True,
+                timeout=(DOCS_PROBE_CONNECT_TIMEOUT, DOCS_PROBE_READ_TIMEOUT)
+            )
+            if response.status_code == 304 and self.state.get("version"):
+                self.state["checked_at"] = time.time()
+                self._save()
+                return
+            response.raise_for_status()
+
+            # Scan the page as it arrives; stop at the first match, the byte cap or the deadline
+            response.encoding = response.encoding or "utf-8"
+            text, version = "", None
+            for chunk in response.iter_content(chunk_size=16384, decode_unicode=True):
+                text += chunk
+                version = parse_docs_version(text)
+                if version or len(text) >= self.max_bytes or time.monotonic() - started > self.deadline:
+                    break
+            if version is None:
+                raise ValueError("no version found in the API docs page")
+            self.state.update({
+                "version": version,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "checked_at": time.time(),
+            })
+            self._save()
+        except (requests_module().RequestException, ValueError) as e:
+            logging.error(f"Error connecting to the Streamlit API documentation: {str(e)}")
+            # Keep serving the last known good version (if any); retry after the TTL rather than on every call
+            self.state["checked_at"] = time.time()
+            self._save()
+        finally:
+            if response is not None:
+                response.close()
+
+    def _save(self):
+        if self.state_path:
+            try:
+                save_state_file(self.state, self.state_path)
+            except OSError as e:
+                logging.warning(f"Could not save the docs version state: {str(e)}")
+
+@st.cache_resource(show_spinner=False)
+def get_docs_version_probe():
+    """Return the process-wide docs version probe."""
+    return DocsVersionProbe()
+
+def get_streamlit_api_code_version():
+    """
+    Get the current Streamlit API code version from the Streamlit API documentation.
+
+    Returns:
+    - str: The current Streamlit API code version (cached, last known good when
+      offline, else the newest release in the local updates data), or None.
+    """
+    version = get_docs_version_probe().get()
+    if version:
+        return version
+    versions = get_updates_repository().snapshot().versions
+    return versions[0] if versions else None
+
+UPDATES_SECTION_LABELS = {
+    "Highlights": ("🚀", "Highlights"),
+    "NotableChanges": ("⭐", "Notable Changes"),
+    "OtherChanges": ("📝", "Other Changes"),
+}
+
+@st.cache_data(show_spinner=False, max_entries=2000)
+def render_update_item_html(section, name, version, fields_json):
+    """Build (and memoize) the HTML card for one updates entry."""
+    fields = json.loads(fields_json)
+    icon = "✨" if section == "Highlights" else UPDATES_SECTION_LABELS[section][0]
+    version_badge = (
+        f'<span style="font-size: 0.75rem; color: #1a202c; background: #fecfef; padding: 0.1rem 0.5rem; '
+        f'border-radius: 6px; margin-left: 0.5rem;">v{html.escape(version)}</span>'
+    ) if version else ""
+    parts = [
+        '<div style="color: #e2e8f0; line-height: 1.6; background: rgba(26, 32, 44, 0.7); padding: 1rem 1.25rem; '
+        'border-radius: 12px; border: 1px solid rgba(255, 154, 158, 0.2); margin-bottom: 0.75rem;">',
+        f'<div style="font-weight: 600; color: #ffffff;">{icon} {html.escape(name)}{version_badge}</div>',
+        f'<p style="margin: 0.5rem 0 0 0;">{html.escape(str(fields.get("Description", "No description available.")))}</p>',
+    ]
+    if fields.get("Documentation"):
+        parts.append(f'<p style="font-size: 0.9rem; color: #ff9a9e; margin: 0.5rem 0 0 0;">📖 {html.escape(str(fields["Documentation"]))}</p>')
+    issues = fields.get("Issues") or ([fields["Issue"]] if fields.get("Issue") else [])
+    if issues:
+        refs = ", ".join(f"#{str(issue).lstrip('#')}" for issue in issues)
+        parts.append(f'<p style="font-size: 0.85rem; color: #a0aec0; margin: 0.5rem 0 0 0;">🔗 Related: {html.escape(refs)}</p>')
+    parts.append("</div>")
+    return "".join(parts)
+
+def render_updates_page(section, query, version, total):
+    """Render one page of a section: search hits when there is a query, otherwise the section in file order."""
+    truncated = False
+    if query:
+        # One extra hit tells whether the ranked list was cut off at the cap
+        hits = search_updates(query, UPDATES_SEARCH_MAX_RESULTS + 1, section, version, version)
+        truncated = len(hits) > UPDATES_SEARCH_MAX_RESULTS
+        hits = hits[:UPDATES_SEARCH_MAX_RESULTS]
+        total = len(hits)
+    elif version:
+        total = get_update_count(section, version, version)
+
+    if total == 0:
+        st.info("ℹ️ No updates match the current filters.")
+        return
+
+    pages = (total + UPDATES_PAGE_SIZE - 1) // UPDATES_PAGE_SIZE
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1,
+                               key=f"updates_page_{section}_{query}_{version}")
+    offset = (page - 1) * UPDATES_PAGE_SIZE
+
+    if query:
+        items = [(hit["name"], hit["fields"], hit["version"]) for hit in hits[offset:offset + UPDATES_PAGE_SIZE]]
+    else:
+        items = get_update_items(section, version, version, UPDATES_PAGE_SIZE, offset)
+
+    st.markdown(
+        "".join(render_update_item_html(section, name, item_version, json.dumps(fields, sort_keys=True))
+                for name, fields, item_version in items),
+        unsafe_allow_html=True
+    )
+    if truncated:
+        st.caption(f"Showing {offset + 1}–{offset + len(items)} of the top {total} matches; refine the search to narrow them down")
+    else:
+        st.caption(f"Showing {offset + 1}–{offset + len(items)} of {total}")
+
 def display_streamlit_updates():
     """Display the latest Streamlit updates with organized sections."""
     st.markdown("""
@@ -447,88 +2795,37 @@ def display_streamlit_updates():
     </div>
     """, unsafe_allow_html=True)
 
-    # Load updates data
-    updates = load_streamlit_updates()
+    counts = get_update_counts()
 
-    if not updates:
+    if not any(counts.values()):
         st.error("❌ Unable to load Streamlit updates data.")
         return
 
-    # Display Highlights Section
-    if "Highlights" in updates:
-        st.markdown("### 🚀 Highlights")
-
-        highlights = updates["Highlights"]
-
-        # Check if we have version-based highlights
-        version_items = {k: v for k, v in highlights.items() if k.startswith("Version")}
-        other_items = {k: v for k, v in highlights.items() if not k.startswith("Version")}
-
-        # Display version-specific highlights first
-        if version_items:
-            for version_name, version_info in version_items.items():
-                with st.expander(f"🎯 {version_name}", expanded=False):
-                    st.markdown(f"""
-                    <div style="color: #e2e8f0; line-height: 1.6;">
-                        <p><strong>{version_info.get('Description', 'No description available.')}</strong></p>
-                        <p style="font-size: 0.9rem; color: #ff9a9e; margin-top: 1rem;">
-                            📖 {version_info.get('Documentation', 'Check official documentation for more details.')}
-                        </p>
-                    </div>
-                    """, unsafe_allow_html=True)
-
-        # Display other highlights
-        if other_items:
-            for item_name, item_info in other_items.items():
-                with st.expander(f"✨ {item_name}", expanded=False):
-                    st.markdown(f"""
-                    <div style="color: #e2e8f0; line-height: 1.6;">
-                        <p><strong>{item_info.get('Description', 'No description available.')}</strong></p>
-                        <p style="font-size: 0.9rem; color: #ff9a9e; margin-top: 1rem;">
-                            📖 {item_info.get('Documentation', 'Check official documentation for more details.')}
-                        </p>
-                    </div>
-                    """, unsafe_allow_html=True)
-
-    # Display Notable Changes Section
-    if "NotableChanges" in updates:
-        st.markdown("### ⭐ Notable Changes")
-        notable_changes = updates["NotableChanges"]
-
-        for change_name, change_info in notable_changes.items():
-            with st.expander(f"🔧 {change_name}", expanded=False):
-                st.markdown(f"""
-                <div style="color: #e2e8f0; line-height: 1.6;">
-                    <p><strong>{change_info.get('Description', 'No description available.')}</strong></p>
-                </div>
-                """, unsafe_allow_html=True)
-
-                # Show related issues if available
-                if "Issue" in change_info:
-                    st.info(f"🔗 Related Issue: #{change_info['Issue']}")
-                elif "Issues" in change_info:
-                    issues_str = ", ".join(f"#{issue}" for issue in change_info["Issues"])
-                    st.info(f"🔗 Related Issues: {issues_str}")
-
-    # Display Other Changes Section
-    if "OtherChanges" in updates:
-        st.markdown("### 📝 Other Changes")
-        other_changes = updates["OtherChanges"]
-
-        for change_name, change_info in other_changes.items():
-            with st.expander(f"🔄 {change_name}", expanded=False):
-                st.markdown(f"""
-                <div style="color: #e2e8f0; line-height: 1.6;">
-                    <p><strong>{change_info.get('Description', 'No description available.')}</strong></p>
-                </div>
-                """, unsafe_allow_html=True)
-
-                # Show related issues if available
-                if "Issue" in change_info:
-                    st.info(f"🔗 Related Issue: #{change_info['Issue']}")
-                elif "Issues" in change_info:
-                    issues_str = ", ".join(f"#{issue}" for issue in change_info["Issues"])
-                    st.info(f"🔗 Related Issues: {issues_str}")
+    # Filters: the search box queries the prebuilt index, the version filter narrows both views
+    filter_col, version_col = st.columns([3, 1])
+    with filter_col:
+        query = st.text_input("🔎 Search updates", key="updates_search", placeholder="e.g. dataframe toolbar, caching, connection")
+    with version_col:
+        version = st.selectbox("Version", ["All versions"] + get_available_versions(), key="updates_version")
+    version = None if version == "All versions" else version
+
+    versions = get_available_versions()
+    if len(versions) > 1:
+        with st.expander("🔀 What changed between two versions?", expanded=False):
+            from_col, to_col = st.columns(2)
+            with from_col:
+                from_version = st.selectbox("From", versions, index=len(versions) - 1, key="updates_compare_from")
+            with to_col:
+                to_version = st.selectbox("To", versions, index=0, key="updates_compare_to")
+            st.markdown(describe_changes_between(from_version, to_version))
+
+    tabs = st.tabs([
+        f"{UPDATES_SECTION_LABELS[section][0]} {UPDATES_SECTION_LABELS[section][1]} ({counts[section]})"
+        for section in UPDATES_SECTIONS
+    ])
+    for tab, section in zip(tabs, UPDATES_SECTIONS):
+        with tab:
+            render_updates_page(section, query.strip(), version, counts[section])
 
     # Show data source information
     st.markdown("---")
@@ -543,6 +2840,7 @@ def display_streamlit_updates():
         <div style="font-size: 0.9rem; color: #e2e8f0;">
             <p><strong>📊 Data Source:</strong> {scraping_info['primary_source']}</p>
             <p><strong>🔄 Last Updated:</strong> {scraping_info['last_updated']}</p>
+            <p><strong>♻️ Last Refreshed:</strong> {scraping_info['last_refreshed']} (checked {scraping_info['last_checked']}, changelog checked {scraping_info['changelog_checked']})</p>
             <p><strong>📋 Status:</strong> {scraping_info['status']}</p>
         </div>
         """, unsafe_allow_html=True)
@@ -559,10 +2857,33 @@ def display_streamlit_updates():
         </div>
         """, unsafe_allow_html=True)
 
+        refresher = get_updates_refresher()
+        if st.button("🔄 Check for New Releases", key="refresh_changelog"):
+            refresher.trigger(changelog=True)
+            st.info("ℹ️ Checking in the background; new releases appear on the next rerun.")
+        if st.button("📚 Check API Docs Version", key="check_docs_version"):
+            docs_version = get_streamlit_api_code_version()
+            local_versions = get_updates_repository().snapshot().versions
+            if docs_version is None:
+                st.warning("⚠️ Could not determine the API docs version.")
+            elif local_versions and version_key(docs_version) > version_key(local_versions[0]):
+                st.info(f"ℹ️ The API docs describe Streamlit {docs_version}, newer than the local data ({local_versions[0]}).")
+            else:
+                st.info(f"ℹ️ The API docs describe Streamlit {docs_version}.")
+        # Show each refresh result once per session, and none that finished before the session started
+        seen_at = st.session_state.setdefault("changelog_result_seen_at", time.time())
+        result = refresher.last_result
+        if result and result["finished_at"] > seen_at:
+            st.session_state.changelog_result_seen_at = result["finished_at"]
+            if result["status"] == "updated":
+                st.success(f"✅ Added {', '.join(result['added'])}")
+            elif result["status"] == "error":
+                st.error(f"❌ {result['error']}")
+
     # Show total counts
-    total_highlights = len(updates.get("Highlights", {}))
-    total_notable = len(updates.get("NotableChanges", {}))
-    total_other = len(updates.get("OtherChanges", {}))
+    total_highlights = counts["Highlights"]
+    total_notable = counts["NotableChanges"]
+    total_other = counts["OtherChanges"]
 
     st.success(f"✅ **Updates loaded successfully!** Found {total_highlights} highlights, {total_notable} notable changes, and {total_other} other changes.")
 
@@ -585,24 +2906,270 @@ def initialize_conversation():
     ]
     return conversation_history
 
-@st.cache_data(show_spinner=False)
-def get_latest_update_from_json(keyword, latest_updates):
+@st.cache_resource(show_spinner=False)
+def get_tokenizer():
+    """Return the local tokenizer for the chat model, or None if tiktoken is unavailable."""
+    tiktoken = tiktoken_module()
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(OPENAI_MODEL)
+    except Exception:
+        try:
+            return tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            logging.warning(f"Tokenizer unavailable, estimating token counts: {str(e)}")
+            return None
+
+def count_tokens(text):
+    """Count the tokens in `text` with the local tokenizer (or a rough estimate without one)."""
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        return max(1, len(text) // 4)
+    return len(tokenizer.encode(text, disallowed_special=()))
+
+def count_message_tokens(message):
+    """Count the tokens a chat message costs, including per-message overhead."""
+    return count_tokens(message["content"]) + 4
+
+def build_chat_context(conversation_history, summary="", token_budget=HISTORY_TOKEN_BUDGET):
     """
-    Fetch the latest Streamlit update based on a keyword.
+    Select the messages to send for the next chat turn.
+
+    System messages are always sent, followed by the rolling summary of older
+    turns (if any) and then as many recent turns as fit in `token_budget`. The
+    latest message is always included.
 
     Parameters:
-    - keyword (str): The keyword to search for in the Streamlit updates.
-    - latest_updates (dict): The latest Streamlit updates data.
+    - conversation_history (list): System messages plus not-yet-summarized turns.
+    - summary (str): Rolling summary of earlier turns.
+    - token_budget (int): Token budget for the whole request context.
 
     Returns:
-    - str: The latest update related to the keyword, or a message if no update is found.
+    - tuple: (messages to send, number of oldest turns that fell outside the window)
     """
-    for section in ["Highlights", "Notable Changes", "Other Changes"]:
-        for sub_key, sub_value in latest_updates.get(section, {}).items():
-            for key, value in sub_value.items():
-                if keyword.lower() in key.lower() or keyword.lower() in value.lower():
-                    return f"Section: {section}\nSub-Category: {sub_key}\n{key}: {value}"
-    return "No updates found for the specified keyword."
+    system_messages = [m for m in conversation_history if m["role"] == "system"]
+    turns = [m for m in conversation_history if m["role"] != "system"]
+    if summary:
+        system_messages = system_messages + [
+            {"role": "system", "content": f"Summary of the earlier conversation: {summary}"}
+        ]
+
+    remaining = token_budget - sum(count_message_tokens(m) for m in system_messages)
+    window_start = len(turns)
+    while window_start > 0:
+        cost = count_message_tokens(turns[window_start - 1])
+        if cost > remaining and window_start < len(turns):
+            break
+        remaining -= cost
+        window_start -= 1
+    return system_messages + turns[window_start:], window_start
+
+def summarize_conversation(previous_summary, turns):
+    """Fold older conversation turns into the rolling summary."""
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in turns)
+    messages = [
+        {"role": "system", "content": "You maintain a concise running summary of a conversation between a user and StreamSage, "
+                                      "a Streamlit assistant. Keep facts, decisions, code names and open questions. "
+                                      "Reply with the updated summary only."},
+        {"role": "user", "content": f"Current summary:\n{previous_summary or '(none)'}\n\nNew turns:\n{transcript}"}
+    ]
+    return complete_chat(messages, temperature=0.2, max_tokens=HISTORY_SUMMARY_MAX_TOKENS).strip()
+
+def compact_conversation_history(overflow_count):
+    """
+    Compact chat turns that no longer fit the token budget into the rolling summary.
+
+    Summarization runs on the LLM worker pool so it never delays a reply: a
+    finished summary is adopted (and its turns dropped from the history) on the
+    next turn, and a new one is started when turns overflow the window.
+    """
+    pending = st.session_state.get("pending_summary")
+    if pending is not None:
+        future, summarized_count = pending
+        if not future.done():
+            return
+        st.session_state.pending_summary = None
+        try:
+            st.session_state.conversation_summary = future.result()
+        except Exception as e:
+            logging.error(f"Error summarizing conversation: {str(e)}")
+            return
+
+        turns_seen = 0
+        kept = []
+        for message in st.session_state.conversation_history:
+            if message["role"] != "system" and turns_seen < summarized_count:
+                turns_seen += 1
+                continue
+            kept.append(message)
+        st.session_state.conversation_history = kept
+        overflow_count -= summarized_count
+
+    if overflow_count > 0:
+        turns = [m for m in st.session_state.conversation_history if m["role"] != "system"][:overflow_count]
+        future = submit_llm_job(
+            summarize_conversation, st.session_state.get("conversation_summary", ""), turns
+        )
+        st.session_state.pending_summary = (future, overflow_count)
+
+def tokenize_search_text(text):
+    """Case-fold and split text into search terms (CamelCase names are split into words)."""
+    text = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", str(text))
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+class UpdatesIndex:
+    """
+    Inverted index over every Streamlit updates entry with BM25 ranking.
+
+    Each entry (section, name, fields) becomes one document. At build time
+    every term gets a NumPy array of the documents containing it and a
+    matching array of precomputed BM25 weights, so a query only adds up the
+    weight vectors of its own terms instead of scanning the whole changelog.
+    """
+
+    def __init__(self, updates):
+        np = numpy_module()
+        self.documents = []
+        postings = {}
+        doc_lengths = []
+        release_version = default_release_version(updates)
+
+        for section in UPDATES_SECTIONS:
+            for name, fields in (updates.get(section) or {}).items():
+                if not isinstance(fields, dict):
+                    fields = {"Description": str(fields)}
+                terms = Counter(updates_search_text(name, fields).split())
+                doc_id = len(self.documents)
+                self.documents.append({
+                    "section": section,
+                    "name": name,
+                    "fields": fields,
+                    "version": entry_version(name, fields, release_version),
+                })
+                doc_lengths.append(sum(terms.values()))
+                for term, frequency in terms.items():
+                    postings.setdefault(term, []).append((doc_id, frequency))
+
+        self.section_of = np.array([doc["section"] for doc in self.documents], dtype=object)
+        self.version_sort_keys = np.array(
+            [sortable_version(doc["version"]) if doc["version"] else "" for doc in self.documents], dtype=object
+        )
+        lengths = np.asarray(doc_lengths, dtype=np.float64)
+        length_norm = 1 - BM25_B + BM25_B * lengths / (lengths.mean() if len(lengths) else 1.0)
+        count = len(self.documents)
+        self.postings = {}
+        for term, entries in postings.items():
+            doc_ids = np.fromiter((doc_id for doc_id, _ in entries), dtype=np.int64, count=len(entries))
+            frequencies = np.fromiter((tf for _, tf in entries), dtype=np.float64, count=len(entries))
+            idf = math.log(1 + (count - len(entries) + 0.5) / (len(entries) + 0.5))
+            weights = idf * frequencies * (BM25_K1 + 1) / (frequencies + BM25_K1 * length_norm[doc_ids])
+            self.postings[term] = (doc_ids, weights)
+        self.vocabulary = sorted(self.postings)
+
+    def _expand(self, term):
+        """Exact term if indexed, otherwise every indexed term it prefixes (e.g. "cach" -> "cache", "caching")."""
+        if term in self.postings:
+            return [term]
+        start = bisect.bisect_left(self.vocabulary, term)
+        expanded = []
+        for candidate in self.vocabulary[start:]:
+            if not candidate.startswith(term):
+                break
+            expanded.append(candidate)
+        return expanded
+
+    def search(self, query, top_k=UPDATES_SEARCH_TOP_K, section=None, min_version=None, max_version=None):
+        """
+        Rank updates entries against `query` with BM25, optionally within one
+        section and version range.
+
+        Returns:
+        - list: Up to `top_k` hits as dicts with `score`, `section`, `name`,
+          `version` and `fields`, best first.
+        """
+        if not self.documents:
+            return []
+        np = numpy_module()
+        scores = np.zeros(len(self.documents))
+        for term in set(tokenize_search_text(query)):
+            for indexed_term in self._expand(term):
+                doc_ids, weights = self.postings[indexed_term]
+                scores[doc_ids] += weights
+        if section:
+            scores[self.section_of != section] = 0.0
+        if min_version:
+            scores[self.version_sort_keys < sortable_version(min_version)] = 0.0
+        if max_version:
+            scores[(self.version_sort_keys > sortable_version(max_version)) | (self.version_sort_keys == "")] = 0.0
+        matched = np.flatnonzero(scores)
+        if len(matched) > top_k:
+            matched = matched[np.argpartition(-scores[matched], top_k - 1)[:top_k]]
+        best = sorted(matched.tolist(), key=lambda doc_id: (-scores[doc_id], doc_id))
+        return [dict(self.documents[doc_id], score=round(float(scores[doc_id]), 4)) for doc_id in best]
+
+def search_updates(query, top_k=UPDATES_SEARCH_TOP_K, section=None, min_version=None, max_version=None):
+    """Return the top-k updates entries matching `query`, best first."""
+    store = get_updates_store()
+    if store is not None:
+        return store.search(query, top_k, section, min_version, max_version)
+    return get_updates_repository().snapshot().index.search(query, top_k, section, min_version, max_version)
+
+CHAT_RETRIEVAL_STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "is", "are", "was", "be", "it", "i", "me",
+    "my", "you", "your", "we", "how", "what", "when", "why", "which", "do", "does", "can", "could", "should",
+    "would", "there", "this", "that", "about", "please", "hi", "hello", "thanks", "streamlit", "st",
+}
+
+def retrieve_updates_context(query, top_k=CHAT_RETRIEVAL_TOP_K, min_score=CHAT_RETRIEVAL_MIN_SCORE):
+    """
+    Pick the updates entries relevant to a chat turn and format them as compact context.
+
+    Returns:
+    - str: One line per relevant entry (version, section, name, trimmed
+      description and issues), or "" when nothing scores above `min_score`.
+    """
+    terms = [term for term in tokenize_search_text(query) if term not in CHAT_RETRIEVAL_STOPWORDS]
+    if not terms:
+        return ""
+    lines = []
+    for hit in search_updates(" ".join(terms), top_k):
+        if hit["score"] < min_score:
+            continue
+        fields = hit["fields"]
+        description = str(fields.get("Description", ""))
+        if len(description) > CHAT_RETRIEVAL_MAX_CHARS:
+            description = description[:CHAT_RETRIEVAL_MAX_CHARS].rsplit(" ", 1)[0] + "…"
+        issues = fields.get("Issues") or ([fields["Issue"]] if fields.get("Issue") else [])
+        version = f"v{hit['version']}, " if hit["version"] else ""
+        line = f"- [{version}{hit['section']}] {hit['name']}: {description}"
+        if issues:
+            line += f" ({', '.join(issues)})"
+        lines.append(line)
+    return "\n".join(lines)
+
+def get_latest_update_from_json(keyword, top_k=UPDATES_SEARCH_TOP_K):
+    """
+    Fetch the Streamlit updates most relevant to a keyword.
+
+    Parameters:
+    - keyword (str): The keyword(s) to search for in the Streamlit updates.
+    - top_k (int): Maximum number of matching updates to return.
+
+    Returns:
+    - str: The best matching updates with their section and version, or a message if no update is found.
+    """
+    hits = search_updates(keyword, top_k)
+    if not hits:
+        return "No updates found for the specified keyword."
+    results = []
+    for hit in hits:
+        lines = [f"Section: {hit['section']}", f"Sub-Category: {hit['name']}"]
+        if hit["version"]:
+            lines.append(f"Version: {hit['version']}")
+        lines.extend(f"{key}: {value}" for key, value in hit["fields"].items())
+        results.append("\n".join(lines))
+    return "\n\n".join(results)
 
 def construct_formatted_message(latest_updates):
     """
@@ -631,17 +3198,20 @@ def construct_formatted_message(latest_updates):
                 formatted_message.append(f"  - **Documentation**: {documentation}")
     return "\n".join(formatted_message)
 
-@st.cache_data(show_spinner=False)
-def on_chat_submit(chat_input, latest_updates, temperature=TEMPERATURE_DEFAULT, max_tokens=MAX_TOKENS_DEFAULT):
+def on_chat_submit(chat_input, latest_updates, temperature=TEMPERATURE_DEFAULT, max_tokens=MAX_TOKENS_DEFAULT, on_token=None):
     """
     Handle chat input submissions and interact with the OpenAI API.
 
+    Not cached: the call appends to the session's conversation history, which a
+    cache hit would silently skip.
+
     Parameters:
     - chat_input (str): The chat input from the user.
     - latest_updates (dict): The latest Streamlit updates fetched from a JSON file or API.
+    - on_token (callable): Optional callback receiving reply text deltas as they stream in.
 
     Returns:
-    - None: Updates the chat history in Streamlit's session state.
+    - str: The assistant reply (also appended to the chat history in session state).
     """
     user_input = chat_input.strip().lower()
 
@@ -651,10 +3221,13 @@ def on_chat_submit(chat_input, latest_updates, temperature=TEMPERATURE_DEFAULT,
     st.session_state.conversation_history.append({"role": "user", "content": user_input})
 
     try:
-        model_engine = "gpt-4o-mini"
         assistant_reply = ""
 
-        if "latest updates" in user_input:
+        version_range = parse_version_range_question(user_input)
+        if version_range:
+            # Answered from the release index without an LLM call
+            assistant_reply = describe_changes_between(*version_range)
+        elif "latest updates" in user_input:
             assistant_reply = "Here are the latest highlights from Streamlit:\n"
             highlights = latest_updates.get("Highlights", {})
             if highlights:
@@ -664,22 +3237,27 @@ def on_chat_submit(chat_input, latest_updates, temperature=TEMPERATURE_DEFAULT,
             else:
                 assistant_reply = "No highlights found."
         else:
-            client = get_openai_client()
-            response = client.chat.completions.create(
-                model=model_engine,
-                messages=st.session_state.conversation_history,
-                max_tokens=max_tokens,
-                temperature=temperature
+            context, overflow_count = build_chat_context(
+                st.session_state.conversation_history, st.session_state.get("conversation_summary", "")
             )
-            assistant_reply = response.choices[0].message.content
+            # Ground the reply in the few updates entries relevant to this turn
+            retrieved = retrieve_updates_context(user_input)
+            if retrieved:
+                context = context[:-1] + [
+                    {"role": "system", "content": f"Relevant entries from the Streamlit release notes:\n{retrieved}"}
+                ] + context[-1:]
+            assistant_reply = complete_chat(context, temperature, max_tokens, on_token=on_token)
+            compact_conversation_history(overflow_count)
 
         st.session_state.conversation_history.append({"role": "assistant", "content": assistant_reply})
         st.session_state.history.append({"role": "user", "content": user_input})
         st.session_state.history.append({"role": "assistant", "content": assistant_reply})
+        return assistant_reply
 
-    except OpenAIError as e:
+    except openai_module().OpenAIError as e:
         logging.error(f"Error occurred: {e}")
         st.error(f"OpenAI Error: {str(e)}")
+        return None
 
 def initialize_session_state():
     """Initialize session state variables."""
@@ -687,11 +3265,15 @@ def initialize_session_state():
         st.session_state.history = []
     if 'conversation_history' not in st.session_state:
         st.session_state.conversation_history = []
+    if 'conversation_summary' not in st.session_state:
+        st.session_state.conversation_summary = ""
+    if 'pending_summary' not in st.session_state:
+        st.session_state.pending_summary = None
     if 'session_id' not in st.session_state:
         st.session_state.session_id = generate_session_id()
 
 @st.cache_data(show_spinner=False)
-def generate_streamlit_app(prompt, temperature=TEMPERATURE_DEFAULT, max_tokens=MAX_TOKENS_DEFAULT):
+def generate_streamlit_app(prompt, temperature=TEMPERATURE_DEFAULT, max_tokens=MAX_TOKENS_DEFAULT, _on_token=None):
     """Generate a complete Streamlit application based on user prompt."""
     try:
         system_prompt = """You are StreamSage, an expert Streamlit developer. Generate complete, production-ready Streamlit applications with:
@@ -717,22 +3299,145 @@ Generate only the Python code without markdown formatting."""
             {"role": "user", "content": f"Generate a complete Streamlit application for: {prompt}"}
         ]
 
-        client = get_openai_client()
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages,
-            max_tokens=max_tokens,
-            temperature=temperature
-        )
-
-        return response.choices[0].message.content.strip()
+        return complete_chat(messages, temperature, max_tokens, on_token=_on_token).strip()
 
     except Exception as e:
         logging.error(f"Error generating code: {str(e)}")
         return f"Error generating code: {str(e)}"
 
+def split_code_into_chunks(code, max_tokens=ANALYSIS_CHUNK_TOKENS):
+    """
+    Split Python source into analysis chunks along top-level definitions.
+
+    Functions and classes (with their decorators) become their own chunks and
+    runs of other top-level statements are grouped into module-level blocks.
+    Adjacent small chunks are merged up to `max_tokens`; anything still larger is
+    split on line boundaries. Code that does not parse is split by lines only.
+
+    Parameters:
+    - code (str): Python source.
+    - max_tokens (int): Token budget per chunk.
+
+    Returns:
+    - list: Chunks as dicts with `label`, `start_line`, `end_line` and `source`.
+    """
+    lines = code.splitlines()
+    if not lines:
+        return []
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return _split_lines_into_chunks(lines, 1, len(lines), "unparsed code", max_tokens)
+    if not tree.body:
+        return _split_lines_into_chunks(lines, 1, len(lines), "module-level code", max_tokens)
+
+    # Each top-level statement owns the lines up to the next one (comments included)
+    starts = [min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])]) for node in tree.body]
+    starts[0] = 1
+    segments = []
+    for index, node in enumerate(tree.body):
+        end = starts[index + 1] - 1 if index + 1 < len(tree.body) else len(lines)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            label = f"function {node.name}"
+        elif isinstance(node, ast.ClassDef):
+            label = f"class {node.name}"
+        else:
+            label = "module-level code"
+        if label == "module-level code" and segments and segments[-1][2] == label:
+            segments[-1][1] = end
+        else:
+            segments.append([starts[index], end, label])
+
+    chunks = []
+    pending = None
+    for start, end, label in segments:
+        if pending is not None:
+            merged_tokens = count_tokens("\n".join(lines[pending[0] - 1:end]))
+            if merged_tokens <= max_tokens:
+                pending = [pending[0], end, pending[2] + [label]]
+                continue
+            chunks.extend(_split_lines_into_chunks(lines, pending[0], pending[1], ", ".join(pending[2]), max_tokens))
+        pending = [start, end, [label]]
+    chunks.extend(_split_lines_into_chunks(lines, pending[0], pending[1], ", ".join(pending[2]), max_tokens))
+    return chunks
+
+def _split_lines_into_chunks(lines, start, end, label, max_tokens):
+    """Split lines `start`..`end` (1-based, inclusive) into chunks of at most `max_tokens`."""
+    chunks = []
+    chunk_start = start
+    chunk_tokens = 0
+    for line_number in range(start, end + 1):
+        line_tokens = count_tokens(lines[line_number - 1]) + 1
+        if chunk_tokens + line_tokens > max_tokens and line_number > chunk_start:
+            chunks.append(_make_chunk(lines, chunk_start, line_number - 1, label))
+            chunk_start = line_number
+            chunk_tokens = 0
+        chunk_tokens += line_tokens
+    chunks.append(_make_chunk(lines, chunk_start, end, label))
+    return chunks
+
+def _make_chunk(lines, start, end, label):
+    return {
+        "label": label,
+        "start_line": start,
+        "end_line": end,
+        "source": "\n".join(f"{n:>5}| {lines[n - 1]}" for n in range(start, end + 1)),
+    }
+
+def build_code_outline(code, chunks):
+    """Summarize a file's imports and chunk layout as context for per-chunk analysis."""
+    imports = [line.strip() for line in code.splitlines() if line.startswith(("import ", "from "))]
+    parts = [f"- lines {c['start_line']}-{c['end_line']}: {c['label']}" for c in chunks]
+    return "Imports:\n" + ("\n".join(imports) or "(none)") + "\n\nLayout:\n" + "\n".join(parts)
+
+def analyze_code_chunk(chunk, outline, index, total, temperature):
+    """Review one chunk of a larger file and return brief findings (the map step)."""
+    messages = [
+        {"role": "system", "content": "You are StreamSage, a senior Streamlit code reviewer. You are reviewing one part of a "
+                                      "larger file. Report concrete findings for the code shown only: code quality, "
+                                      "performance, security, UI/UX, bugs and Streamlit best practices. Cite line numbers. "
+                                      "Use short bullet points and no introduction."},
+        {"role": "user", "content": f"File outline:\n{outline}\n\nPart {index} of {total}, lines "
+                                    f"{chunk['start_line']}-{chunk['end_line']} ({chunk['label']}):\n\n{chunk['source']}"}
+    ]
+    return complete_chat(messages, temperature, ANALYSIS_CHUNK_REPLY_TOKENS, persist=True).strip()
+
+def analyze_project_in_chunks(code, chunks, system_prompt, temperature, max_tokens, on_token=None):
+    """
+    Analyze a large file with map-reduce: review chunks in parallel, then merge the findings.
+
+    Chunk reviews run with bounded concurrency and are cached individually, so
+    editing one function only re-reviews that chunk. The reduce step writes the
+    final report (and streams it when `on_token` is given).
+    """
+    outline = build_code_outline(code, chunks)
+    review = bind_llm_session(analyze_code_chunk)
+
+    def review_chunk(numbered_chunk):
+        index, chunk = numbered_chunk
+        try:
+            return review(chunk, outline, index, len(chunks), temperature)
+        except Exception as e:
+            logging.error(f"Error analyzing lines {chunk['start_line']}-{chunk['end_line']}: {str(e)}")
+            return f"(Review of this part failed: {str(e)})"
+
+    with ThreadPoolExecutor(max_workers=min(ANALYSIS_MAX_PARALLEL_CHUNKS, len(chunks))) as pool:
+        findings = list(pool.map(review_chunk, enumerate(chunks, start=1)))
+
+    merged_findings = "\n\n".join(
+        f"### Part {index} (lines {chunk['start_line']}-{chunk['end_line']}: {chunk['label']})\n{finding}"
+        for index, (chunk, finding) in enumerate(zip(chunks, findings), start=1)
+    )
+    messages = [
+        {"role": "system", "content": system_prompt + "\n\nThe file was reviewed in parts. Merge the per-part findings "
+                                                      "below into one report, removing duplicates and keeping line references."},
+        {"role": "user", "content": f"The file has {len(code.splitlines())} lines.\n\n{outline}\n\n"
+                                    f"Per-part findings:\n\n{merged_findings}"}
+    ]
+    return complete_chat(messages, temperature, max_tokens, on_token=on_token, persist=True)
+
 @st.cache_data(show_spinner=False)
-def analyze_streamlit_project(code, temperature=TEMPERATURE_DEFAULT, max_tokens=MAX_TOKENS_DEFAULT):
+def analyze_streamlit_project(code, temperature=TEMPERATURE_DEFAULT, max_tokens=MAX_TOKENS_DEFAULT, _on_token=None):
     """Analyze a Streamlit project and provide comprehensive feedback."""
     try:
         system_prompt = """You are StreamSage, a senior Streamlit code reviewer and optimization expert. Analyze the provided Streamlit code and provide:
@@ -747,27 +3452,217 @@ def analyze_streamlit_project(code, temperature=TEMPERATURE_DEFAULT, max_tokens=
 
 Format your response with clear sections and actionable insights. Be constructive and specific."""
 
+        # Large files are reviewed in parallel chunks and merged, instead of one huge prompt
+        chunks = split_code_into_chunks(code)
+        if len(chunks) > 1:
+            return analyze_project_in_chunks(code, chunks, system_prompt, temperature, max_tokens, _on_token).strip()
+
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": f"Analyze this Streamlit code and provide comprehensive feedback:\n\n{code}"}
         ]
 
-        client = get_openai_client()
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages,
-            max_tokens=max_tokens,
-            temperature=temperature
-        )
-
-        return response.choices[0].message.content.strip()
+        return complete_chat(messages, temperature, max_tokens, on_token=_on_token, persist=True).strip()
 
     except Exception as e:
         logging.error(f"Error analyzing project: {str(e)}")
         return f"Error analyzing project: {str(e)}"
 
+# Static performance rules
+PERF_DATA_LOAD_CALLS = {
+    "pandas.read_csv", "pandas.read_excel", "pandas.read_parquet", "pandas.read_json", "pandas.read_sql",
+    "pandas.read_sql_query", "pandas.read_sql_table", "pandas.read_table", "pandas.read_feather",
+    "pandas.read_pickle", "numpy.load", "numpy.loadtxt", "numpy.genfromtxt", "json.load", "pickle.load",
+}
+PERF_NETWORK_CALLS = {
+    "requests.get", "requests.post", "requests.put", "requests.delete", "requests.head", "requests.request",
+    "httpx.get", "httpx.post", "httpx.request", "urllib.request.urlopen",
+}
+PERF_CACHE_DECORATORS = {
+    "streamlit.cache_data", "streamlit.cache_resource", "streamlit.cache", "streamlit.experimental_memo",
+    "streamlit.experimental_singleton", "functools.lru_cache", "functools.cache",
+}
+PERF_LARGE_LOOP_SIZE = 100
+PERF_SEVERITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+class PerformanceRuleVisitor(ast.NodeVisitor):
+    """
+    AST pass that flags common Streamlit performance problems.
+
+    Rules:
+    - uncached-data-load: file/DB/network loads outside @st.cache_data or @st.cache_resource
+    - module-level-network-call: network requests that run on every rerun
+    - st-call-in-loop: st.* elements emitted from inside a loop
+    - repeated-data-load: the same data source loaded more than once
+    - pandas-iterrows: row-by-row DataFrame iteration
+    """
+
+    def __init__(self):
+        self.aliases = {"st": "streamlit", "pd": "pandas", "np": "numpy"}
+        self.findings = []
+        self.loads = {}  # (call name, first argument) -> line numbers
+        self._functions = []  # stack of "is cached" flags for enclosing functions
+        self._loops = []  # stack of (loop node, is large)
+
+    def add(self, rule, severity, node, message):
+        self.findings.append({
+            "rule": rule,
+            "severity": severity,
+            "line": node.lineno,
+            "end_line": getattr(node, "end_lineno", node.lineno) or node.lineno,
+            "message": message,
+        })
+
+    def resolve(self, node):
+        """Return the dotted, alias-resolved name of a call target (or None)."""
+        parts = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        if not isinstance(node, ast.Name):
+            return None
+        parts.append(self.aliases.get(node.id, node.id))
+        return ".".join(reversed(parts))
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            if alias.asname:
+                self.aliases[alias.asname] = alias.name
+            else:
+                self.aliases.pop(alias.name.split(".")[0], None)
+
+    def visit_ImportFrom(self, node):
+        for alias in node.names:
+            if node.module:
+                self.aliases[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+
+    def visit_FunctionDef(self, node):
+        cached = any(
+            self.resolve(d.func if isinstance(d, ast.Call) else d) in PERF_CACHE_DECORATORS
+            for d in node.decorator_list
+        )
+        self._functions.append(cached or (bool(self._functions) and self._functions[-1]))
+        loops, self._loops = self._loops, []
+        self.generic_visit(node)
+        self._functions.pop()
+        self._loops = loops
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_For(self, node):
+        self._visit_loop(node, self._is_large_iterable(node.iter))
+
+    visit_AsyncFor = visit_For
+
+    def visit_While(self, node):
+        self._visit_loop(node, False)
+
+    def _visit_loop(self, node, is_large):
+        st_calls = [
+            child for child in ast.walk(node)
+            if isinstance(child, ast.Call) and (self.resolve(child.func) or "").startswith("streamlit.")
+            and not (self.resolve(child.func) or "").startswith(("streamlit.cache", "streamlit.session_state"))
+        ]
+        if st_calls and not self._loops:
+            nested = any(isinstance(child, (ast.For, ast.While)) for child in ast.walk(node) if child is not node)
+            severity = "high" if is_large or nested else "medium"
+            self.add("st-call-in-loop", severity, node,
+                     f"{len(st_calls)} st.* call(s) inside a {'large ' if is_large else ''}loop; each iteration adds "
+                     "elements to the page on every rerun. Build the data first and render it once "
+                     "(e.g. st.dataframe), or paginate.")
+        self._loops.append((node, is_large))
+        self.generic_visit(node)
+        self._loops.pop()
+
+    def _is_large_iterable(self, node):
+        if isinstance(node, ast.Call):
+            name = self.resolve(node.func) or ""
+            if name == "range" and node.args:
+                bound = node.args[-1] if len(node.args) == 1 else node.args[1]
+                return isinstance(bound, ast.Constant) and isinstance(bound.value, int) and bound.value >= PERF_LARGE_LOOP_SIZE
+            if name.endswith((".iterrows", ".itertuples")):
+                return True
+        return False
+
+    def visit_Call(self, node):
+        name = self.resolve(node.func) or ""
+        in_function = bool(self._functions)
+        cached = in_function and self._functions[-1]
+
+        if name in PERF_DATA_LOAD_CALLS or name in PERF_NETWORK_CALLS:
+            source = ast.unparse(node.args[0]) if node.args else ""
+            self.loads.setdefault((name, source), []).append(node.lineno)
+
+        if name in PERF_NETWORK_CALLS and not in_function:
+            self.add("module-level-network-call", "high", node,
+                     f"`{name}` runs at module level, so it is repeated on every rerun. Move it into a "
+                     "function decorated with @st.cache_data(ttl=...).")
+        elif (name in PERF_DATA_LOAD_CALLS or name in PERF_NETWORK_CALLS) and not cached:
+            where = "inside an uncached function" if in_function else "at module level"
+            self.add("uncached-data-load", "high" if not in_function else "medium", node,
+                     f"`{name}` loads data {where}. Wrap the load in a function decorated with "
+                     "@st.cache_data so it is not repeated on every rerun.")
+        elif name.endswith(".iterrows"):
+            self.add("pandas-iterrows", "low", node,
+                     "`iterrows()` iterates row by row; prefer vectorized pandas operations.")
+        self.generic_visit(node)
+
+    def finish(self):
+        for (name, source), lines in self.loads.items():
+            if len(lines) > 1:
+                self.findings.append({
+                    "rule": "repeated-data-load",
+                    "severity": "medium",
+                    "line": lines[0],
+                    "end_line": lines[0],
+                    "message": f"`{name}({source})` is called {len(lines)} times (lines "
+                               f"{', '.join(map(str, lines))}). Load it once and reuse the result.",
+                })
+        return sorted(self.findings, key=lambda f: (PERF_SEVERITY_ORDER[f["severity"]], f["line"]))
+
+def find_performance_issues(code):
+    """
+    Run the local static performance rules over `code`.
+
+    Returns:
+    - list: Findings as dicts with `rule`, `severity`, `line`, `end_line` and
+      `message`, most severe first, or None if the code does not parse.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+    visitor = PerformanceRuleVisitor()
+    visitor.visit(tree)
+    return visitor.finish()
+
+def format_findings_for_prompt(code, findings, max_snippet_lines=8):
+    """Render static findings with their (line-numbered) code snippets for the LLM prompt."""
+    lines = code.splitlines()
+    parts = []
+    for finding in findings:
+        end_line = min(finding["end_line"], finding["line"] + max_snippet_lines - 1)
+        snippet = "\n".join(f"{n:>5}| {lines[n - 1]}" for n in range(finding["line"], end_line + 1))
+        parts.append(f"- [{finding['severity']}] {finding['rule']} (line {finding['line']}): "
+                     f"{finding['message']}\n```python\n{snippet}\n```")
+    return "\n".join(parts)
+
+def render_performance_findings(findings):
+    """Show static performance findings immediately, before the AI narrative arrives."""
+    if findings is None:
+        st.warning("⚠️ The code could not be parsed, so only the AI analysis is available.")
+        return
+    if not findings:
+        st.success("✅ **Static checks passed.** No common performance issues detected.")
+        return
+    icons = {"high": "🔴", "medium": "🟠", "low": "🟡"}
+    st.markdown(f"#### 🧭 Static Checks ({len(findings)} finding{'s' if len(findings) != 1 else ''})")
+    st.markdown("\n".join(
+        f"- {icons[f['severity']]} **Line {f['line']}** · `{f['rule']}` — {f['message']}" for f in findings
+    ))
+
 @st.cache_data(show_spinner=False)
-def analyze_performance(code, temperature=TEMPERATURE_DEFAULT, max_tokens=MAX_TOKENS_DEFAULT):
+def analyze_performance(code, temperature=TEMPERATURE_DEFAULT, max_tokens=MAX_TOKENS_DEFAULT, _on_token=None):
     """Analyze Streamlit app performance and provide optimization suggestions."""
     try:
         system_prompt = """You are StreamSage, a senior Streamlit performance optimization expert. Analyze the provided Streamlit code for:
@@ -782,27 +3677,33 @@ def analyze_performance(code, temperature=TEMPERATURE_DEFAULT, max_tokens=MAX_TO
 
 Provide specific code improvements with before/after examples. Be technical but actionable."""
 
+        # Static findings are detected locally; only the flagged snippets go to the model
+        # The source fingerprint keeps the prompt (and its cache key) specific to this code, as the full-code prompt was
+        findings = find_performance_issues(code)
+        if findings:
+            fingerprint = hashlib.sha256(code.encode("utf-8")).hexdigest()[:16]
+            user_content = (
+                "A static analysis of a Streamlit app found these performance issues. For each one, explain the "
+                "impact and give a concrete fix with before/after code, then add any related advice:\n\n"
+                + format_findings_for_prompt(code, findings)
+                + f"\n\n(Source: {len(code.splitlines())} lines, sha256 {fingerprint})"
+            )
+        else:
+            user_content = f"Analyze this Streamlit code for performance issues and provide optimization suggestions:\n\n{code}"
+
         messages = [
             {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"Analyze this Streamlit code for performance issues and provide optimization suggestions:\n\n{code}"}
+            {"role": "user", "content": user_content}
         ]
 
-        client = get_openai_client()
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages,
-            max_tokens=max_tokens,
-            temperature=temperature
-        )
-
-        return response.choices[0].message.content.strip()
+        return complete_chat(messages, temperature, max_tokens, on_token=_on_token, persist=True).strip()
 
     except Exception as e:
         logging.error(f"Error analyzing performance: {str(e)}")
         return f"Error analyzing performance: {str(e)}"
 
 @st.cache_data(show_spinner=False)
-def analyze_security(code, temperature=TEMPERATURE_DEFAULT, max_tokens=MAX_TOKENS_DEFAULT):
+def analyze_security(code, temperature=TEMPERATURE_DEFAULT, max_tokens=MAX_TOKENS_DEFAULT, _on_token=None):
     """Analyze Streamlit code for security vulnerabilities."""
     try:
         system_prompt = """You are StreamSage, a cybersecurity expert specializing in Streamlit applications. Analyze the code for:
@@ -822,22 +3723,14 @@ Provide a security score (1-10) and specific remediation steps."""
             {"role": "user", "content": f"Security analysis of this Streamlit application:\n\n{code}"}
         ]
 
-        client = get_openai_client()
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages,
-            max_tokens=max_tokens,
-            temperature=temperature
-        )
-
-        return response.choices[0].message.content.strip()
+        return complete_chat(messages, temperature, max_tokens, on_token=_on_token, persist=True).strip()
 
     except Exception as e:
         logging.error(f"Error analyzing security: {str(e)}")
         return f"Error analyzing security: {str(e)}"
 
 @st.cache_data(show_spinner=False)
-def generate_template(template_type, temperature=TEMPERATURE_DEFAULT, max_tokens=MAX_TOKENS_DEFAULT):
+def generate_template(template_type, temperature=TEMPERATURE_DEFAULT, max_tokens=MAX_TOKENS_DEFAULT, _on_token=None):
     """Generate Streamlit app templates based on category."""
     try:
         template_prompts = {
@@ -870,22 +3763,14 @@ Include detailed comments and documentation."""
             {"role": "user", "content": f"Generate a complete Streamlit template for: {prompt}"}
         ]
 
-        client = get_openai_client()
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages,
-            max_tokens=max_tokens,
-            temperature=temperature
-        )
-
-        return response.choices[0].message.content.strip()
+        return complete_chat(messages, temperature, max_tokens, on_token=_on_token, persist=True).strip()
 
     except Exception as e:
         logging.error(f"Error generating template: {str(e)}")
         return f"Error generating template: {str(e)}"
 
 @st.cache_data(show_spinner=False)
-def generate_deployment_guide(platform, temperature=TEMPERATURE_DEFAULT, max_tokens=MAX_TOKENS_DEFAULT):
+def generate_deployment_guide(platform, temperature=TEMPERATURE_DEFAULT, max_tokens=MAX_TOKENS_DEFAULT, _on_token=None):
     """Generate deployment guides for different platforms."""
     try:
         system_prompt = """You are StreamSage, a DevOps and deployment expert. Provide comprehensive deployment guides for Streamlit applications including:
@@ -905,530 +3790,564 @@ Include code snippets, file structures, and best practices."""
             {"role": "user", "content": f"Create a comprehensive deployment guide for Streamlit on: {platform}"}
         ]
 
-        client = get_openai_client()
-        client = get_openai_client()
-        client = get_openai_client()
-        client = get_openai_client()
-        client = get_openai_client()
-        client = get_openai_client()
-        client = get_openai_client()
-        client = get_openai_client()
-        client = get_openai_client()
-        client = get_openai_client()
-        client = get_openai_client()
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages,
-            max_tokens=max_tokens,
-            temperature=temperature
-        )
-
-        return response.choices[0].message.content.strip()
+        return complete_chat(messages, temperature, max_tokens, on_token=_on_token, persist=True).strip()
 
     except Exception as e:
         logging.error(f"Error generating deployment guide: {str(e)}")
         return f"Error generating deployment guide: {str(e)}"
 
-def main():
-    """
-    Display Streamlit updates and handle the chat interface.
-    """
-    initialize_session_state()
+@st.fragment
+@profiled_fragment("mode: Code Generator")
+def render_code_generator_mode(temperature, max_tokens, stream_responses):
+    """Code Generator: describe an app and generate it."""
+    code_prompt = st.text_area(
+        "Describe the Streamlit app you want to create:",
+        height=100,
+        placeholder="e.g., Create a data visualization dashboard with charts, filters, and interactive widgets...",
+        key="code_generator_input"
+    )
 
-    if not st.session_state.history:
-        initial_bot_message = "Hello! How can I assist you with Streamlit today?"
-        st.session_state.history.append({"role": "assistant", "content": initial_bot_message})
-        st.session_state.conversation_history = initialize_conversation()
-
-    # Enhanced professional CSS styling
-    st.markdown(
-        """
-        <style>
-        /* Premium Animated Background */
-        .main-container {
-            background:
-                radial-gradient(circle at 20% 80%, rgba(255, 154, 158, 0.15) 0%, transparent 50%),
-                radial-gradient(circle at 80% 20%, rgba(254, 207, 239, 0.15) 0%, transparent 50%),
-                linear-gradient(135deg, #0f1419 0%, #1a202c 50%, #2d3748 100%);
-            background-size: 400% 400%;
-            animation: gradientShift 15s ease infinite;
-            padding: 2.5rem;
-            border-radius: 25px;
-            margin: 1rem 0;
-            border: 1px solid rgba(255, 154, 158, 0.1);
-            position: relative;
-            overflow: hidden;
-        }
-
-        .main-container::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background:
-                linear-gradient(45deg, transparent 49%, rgba(255, 154, 158, 0.03) 50%, transparent 51%),
-                linear-gradient(-45deg, transparent 49%, rgba(254, 207, 239, 0.03) 50%, transparent 51%);
-            background-size: 40px 40px;
-            animation: gridMove 20s linear infinite;
-            opacity: 0.4;
-        }
-
-        .main-container::after {
-            content: '';
-            position: absolute;
-            top: -50%;
-            left: -50%;
-            width: 200%;
-            height: 200%;
-            background: radial-gradient(circle, rgba(255, 154, 158, 0.1) 0%, transparent 70%);
-            animation: rotate 30s linear infinite;
-            opacity: 0.1;
-        }
-
-        /* Premium Glassmorphism Cards */
-        .content-card {
-            background: rgba(26, 32, 44, 0.85);
-            backdrop-filter: blur(25px) saturate(180%);
-            border-radius: 25px;
-            padding: 2.5rem;
-            box-shadow:
-                0 25px 80px rgba(0, 0, 0, 0.4),
-                0 0 0 1px rgba(255, 255, 255, 0.05),
-                inset 0 1px 0 rgba(255, 255, 255, 0.1);
-            border: 1px solid rgba(255, 154, 158, 0.15);
-            margin: 1.5rem 0;
-            position: relative;
-            transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-        }
-
-        .content-card::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: linear-gradient(135deg, rgba(255, 154, 158, 0.05) 0%, rgba(254, 207, 239, 0.05) 100%);
-            border-radius: 25px;
-            opacity: 0;
-            transition: opacity 0.3s ease;
-        }
-
-        .content-card:hover {
-            transform: translateY(-8px) scale(1.02);
-            box-shadow:
-                0 35px 100px rgba(0, 0, 0, 0.5),
-                0 0 0 1px rgba(255, 154, 158, 0.2),
-                inset 0 1px 0 rgba(255, 255, 255, 0.15);
-            border-color: rgba(255, 154, 158, 0.3);
-        }
-
-        .content-card:hover::before {
-            opacity: 1;
-        }
-
-        @keyframes gradientShift {
-            0% { background-position: 0% 50%; }
-            50% { background-position: 100% 50%; }
-            100% { background-position: 0% 50%; }
-        }
-
-        @keyframes gridMove {
-            0% { background-position: 0px 0px; }
-            100% { background-position: 80px 80px; }
-        }
-
-        @keyframes rotate {
-            0% { transform: rotate(0deg); }
-            100% { transform: rotate(360deg); }
-        }
-
-        /* Premium Avatar with Advanced Glow */
-        .avatar-glow {
-            width: 100%;
-            height: auto;
-            padding: 6px;
-            background:
-                linear-gradient(45deg, #ff9a9e, #fecfef, #ff6b9d, #c44569, #ff9a9e);
-            background-size: 400% 400%;
-            animation: rainbowGlow 3s ease infinite;
-            border-radius: 50%;
-            box-shadow:
-                0 0 40px rgba(255, 154, 158, 0.6),
-                0 0 80px rgba(255, 154, 158, 0.3),
-                inset 0 0 20px rgba(255, 255, 255, 0.1);
-            position: relative;
-            transition: all 0.3s ease;
-        }
-
-        .avatar-glow::before {
-            content: '';
-            position: absolute;
-            top: -2px;
-            left: -2px;
-            right: -2px;
-            bottom: -2px;
-            background: linear-gradient(45deg, #ff9a9e, #fecfef, #ff6b9d, #c44569);
-            background-size: 400% 400%;
-            border-radius: 50%;
-            z-index: -1;
-            animation: rainbowGlow 3s ease infinite reverse;
-            filter: blur(10px);
-            opacity: 0.7;
-        }
-
-        .avatar-glow:hover {
-            transform: scale(1.05);
-            box-shadow:
-                0 0 60px rgba(255, 154, 158, 0.8),
-                0 0 120px rgba(255, 154, 158, 0.4),
-                inset 0 0 30px rgba(255, 255, 255, 0.2);
-        }
+    if st.button("🎯 Generate Code", type="primary"):
+        if code_prompt.strip():
+            code_output = st.empty()
+            generated_code = run_llm_task(
+                generate_streamlit_app,
+                (code_prompt, temperature, max_tokens),
+                lambda text: code_output.code(text, language="python"),
+                stream=stream_responses,
+                spinner_text="Generating your Streamlit application..."
+            )
+            if generated_code:
+                # Export functionality
+                col1, col2 = st.columns(2)
+                with col1:
+                    export_code_to_file(generated_code)
+                with col2:
+                    if st.button("📋 Copy to Clipboard", key="copy_code"):
+                        st.code(generated_code, language="python")
+                        st.success("Code copied!")
+
+@st.fragment
+@profiled_fragment("mode: Project Analyzer")
+def render_project_analyzer_mode(temperature, max_tokens, stream_responses):
+    """Project Analyzer: review pasted code."""
+    analysis_input = st.text_area(
+        "Paste your Streamlit code for analysis:",
+        height=150,
+        placeholder="Paste your Streamlit code here for comprehensive analysis...",
+        key="project_analyzer_input"
+    )
 
-        @keyframes rainbowGlow {
-            0% { background-position: 0% 50%; }
-            25% { background-position: 100% 50%; }
-            50% { background-position: 100% 100%; }
-            75% { background-position: 0% 100%; }
-            100% { background-position: 0% 50%; }
-        }
+    if st.button("🔍 Analyze Project", type="primary"):
+        if analysis_input.strip():
+            result_output = st.empty()
+            run_llm_task(
+                analyze_streamlit_project,
+                (analysis_input, temperature, max_tokens),
+                lambda text: render_result_card(result_output, text),
+                stream=stream_responses,
+                spinner_text="Analyzing your project..."
+            )
 
-        /* Premium Sidebar with Enhanced Effects */
-        .sidebar-header {
-            background:
-                linear-gradient(135deg, rgba(255, 154, 158, 0.1) 0%, rgba(254, 207, 239, 0.1) 100%),
-                linear-gradient(135deg, #2d3748 0%, #1a202c 100%);
-            color: #ffffff;
-            padding: 2rem;
-            border-radius: 20px;
-            margin-bottom: 1.5rem;
-            text-align: center;
-            font-weight: 600;
-            position: relative;
-            border: 1px solid rgba(255, 154, 158, 0.2);
-        }
+@st.fragment
+@profiled_fragment("mode: Performance Profiler")
+def render_performance_profiler_mode(temperature, max_tokens, stream_responses):
+    """Performance Profiler: static checks plus an LLM review of pasted code."""
+    st.markdown("""
+    <div style="margin-bottom: 2rem;">
+        <h3 style="color: #ffffff; margin-bottom: 1rem;">⚡ Performance Profiler</h3>
+        <p style="color: #e2e8f0; margin-bottom: 1.5rem;">
+            Analyze your Streamlit app's performance and get optimization recommendations.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
 
-        .sidebar-header::after {
-            content: '';
-            position: absolute;
-            bottom: 0;
-            left: 50%;
-            transform: translateX(-50%);
-            width: 60%;
-            height: 2px;
-            background: linear-gradient(90deg, transparent, #ff9a9e, #fecfef, #ff9a9e, transparent);
-            border-radius: 2px;
-        }
+    profile_input = st.text_area(
+        "Paste your Streamlit code for performance analysis:",
+        height=120,
+        placeholder="Paste your Streamlit code to analyze performance bottlenecks and optimization opportunities...",
+        key="performance_input"
+    )
 
-        .sidebar-section {
-            background: rgba(45, 55, 72, 0.7);
-            backdrop-filter: blur(12px) saturate(150%);
-            padding: 1.2rem;
-            border-radius: 16px;
-            margin: 0.7rem 0;
-            border: 1px solid rgba(255, 154, 158, 0.15);
-            position: relative;
-            transition: all 0.3s ease;
-        }
+    if st.button("🔍 Profile Performance", type="primary"):
+        if profile_input.strip():
+            render_performance_findings(find_performance_issues(profile_input))
+            result_output = st.empty()
+            run_llm_task(
+                analyze_performance,
+                (profile_input, temperature, max_tokens),
+                lambda text: render_result_card(result_output, text),
+                stream=stream_responses,
+                spinner_text="Analyzing performance characteristics..."
+            )
 
-        .sidebar-section:hover {
-            background: rgba(45, 55, 72, 0.9);
-            border-color: rgba(255, 154, 158, 0.3);
-            transform: translateX(5px);
-        }
+@st.fragment
+@profiled_fragment("mode: Security Scanner")
+def render_security_scanner_mode(temperature, max_tokens, stream_responses):
+    """Security Scanner: scan pasted code for vulnerabilities."""
+    st.markdown("""
+    <div style="margin-bottom: 2rem;">
+        <h3 style="color: #ffffff; margin-bottom: 1rem;">🔒 Security Scanner</h3>
+        <p style="color: #e2e8f0; margin-bottom: 1.5rem;">
+            Scan your Streamlit application for security vulnerabilities and best practices.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
 
-        /* Premium Button Styling */
-        .mode-button {
-            background:
-                linear-gradient(135deg, #ff9a9e 0%, #fecfef 50%, #ff6b9d 100%);
-            color: #1a202c;
-            border: none;
-            padding: 1rem 2rem;
-            border-radius: 30px;
-            font-weight: 700;
-            font-size: 0.9rem;
-            transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-            box-shadow:
-                0 8px 25px rgba(255, 154, 158, 0.4),
-                inset 0 1px 0 rgba(255, 255, 255, 0.2);
-            position: relative;
-            overflow: hidden;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-        }
+    security_input = st.text_area(
+        "Paste your Streamlit code for security analysis:",
+        height=120,
+        placeholder="Analyze your code for security vulnerabilities, data exposure, and unsafe practices...",
+        key="security_input"
+    )
 
-        .mode-button::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.3), transparent);
-            transition: left 0.5s ease;
-        }
+    if st.button("🛡️ Scan Security", type="primary"):
+        if security_input.strip():
+            result_output = st.empty()
+            run_llm_task(
+                analyze_security,
+                (security_input, temperature, max_tokens),
+                lambda text: render_result_card(result_output, text),
+                stream=stream_responses,
+                spinner_text="Scanning for security issues..."
+            )
 
-        .mode-button:hover {
-            transform: translateY(-4px) scale(1.05);
-            box-shadow:
-                0 15px 40px rgba(255, 154, 158, 0.6),
-                inset 0 1px 0 rgba(255, 255, 255, 0.3);
-            background:
-                linear-gradient(135deg, #fecfef 0%, #ff9a9e 50%, #ff6b9d 100%);
-        }
+@st.fragment
+@profiled_fragment("mode: Full Audit")
+def render_full_audit_mode(temperature, max_tokens, stream_responses):
+    """Full Audit: project, performance and security reviews run concurrently."""
+    st.markdown("""
+    <div style="margin-bottom: 2rem;">
+        <h3 style="color: #ffffff; margin-bottom: 1rem;">🧪 Full Audit</h3>
+        <p style="color: #e2e8f0; margin-bottom: 1.5rem;">
+            Run the project, performance and security analyses on your code at the same time.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
 
-        .mode-button:hover::before {
-            left: 100%;
-        }
+    audit_input = st.text_area(
+        "Paste your Streamlit code for a full audit:",
+        height=150,
+        placeholder="Paste your Streamlit code to get all three reports in one run...",
+        key="full_audit_input"
+    )
 
-        /* Premium Chat Messages */
-        .chat-message {
-            padding: 1.5rem;
-            border-radius: 25px;
-            margin: 1rem 0;
-            animation: slideInFade 0.5s ease-out;
-            font-size: 1.1rem;
-            line-height: 1.7;
-            position: relative;
-        }
+    if st.button("🧪 Run Full Audit", type="primary"):
+        if audit_input.strip():
+            audit_calls = []
+            for title, analyzer in [
+                ("🔍 Project Analysis", analyze_streamlit_project),
+                ("⚡ Performance Profile", analyze_performance),
+                ("🔒 Security Scan", analyze_security),
+            ]:
+                st.markdown(f"### {title}")
+                if analyzer is analyze_performance:
+                    render_performance_findings(find_performance_issues(audit_input))
+                report_output = st.empty()
+                audit_calls.append((
+                    analyzer,
+                    (audit_input, temperature, max_tokens),
+                    lambda text, output=report_output: render_result_card(output, text)
+                ))
+            run_llm_tasks(audit_calls, stream=stream_responses, spinner_text="Running the full audit...")
+
+@st.fragment
+@profiled_fragment("mode: Template Library")
+def render_template_library_mode(temperature, max_tokens, stream_responses):
+    """Template Library: generate a starter app for a category."""
+    st.markdown("""
+    <div style="margin-bottom: 2rem;">
+        <h3 style="color: #ffffff; margin-bottom: 1rem;">📚 Template Library</h3>
+        <p style="color: #e2e8f0; margin-bottom: 1.5rem;">
+            Browse and customize pre-built Streamlit application templates.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
 
-        .chat-user {
-            background:
-                linear-gradient(135deg, rgba(255, 154, 158, 0.1) 0%, rgba(254, 207, 239, 0.1) 100%),
-                linear-gradient(135deg, #2d3748 0%, #1a202c 100%);
-            margin-left: 3rem;
-            border-left: 6px solid #ff9a9e;
-            color: #ffffff;
-            font-weight: 500;
-            box-shadow: 0 8px 25px rgba(0, 0, 0, 0.2);
-        }
+    template_type = st.selectbox(
+        "Choose a template category:",
+        [
+            "📊 Data Dashboard",
+            "📈 Analytics Platform",
+            "🛒 E-commerce Site",
+            "📝 Blog/Content Manager",
+            "🎮 Game Dashboard",
+            "📱 Mobile-Responsive App",
+            "🔧 Admin Panel",
+            "📊 Business Intelligence"
+        ],
+        key="template_selector"
+    )
 
-        .chat-assistant {
-            background:
-                linear-gradient(135deg, rgba(254, 207, 239, 0.1) 0%, rgba(255, 154, 158, 0.1) 100%),
-                linear-gradient(135deg, #2d3748 0%, #1a202c 100%);
-            margin-right: 3rem;
-            border-left: 6px solid #fecfef;
-            color: #ffffff;
-            font-weight: 500;
-            box-shadow: 0 8px 25px rgba(0, 0, 0, 0.2);
-        }
+    if st.button("🚀 Generate Template", type="primary"):
+        template_output = st.empty()
+        template_result = run_llm_task(
+            generate_template,
+            (template_type, temperature, max_tokens),
+            lambda text: template_output.code(text, language="python"),
+            stream=stream_responses,
+            spinner_text=f"Generating {template_type} template..."
+        )
+        if template_result:
+            # Export functionality
+            col1, col2 = st.columns(2)
+            with col1:
+                export_code_to_file(template_result, f"{template_type.replace(' ', '_').lower()}.py")
+            with col2:
+                if st.button("📋 Copy Template", key="copy_template"):
+                    st.success("Template copied!")
+
+@st.fragment
+@profiled_fragment("mode: Deployment Assistant")
+def render_deployment_assistant_mode(temperature, max_tokens, stream_responses):
+    """Deployment Assistant: deployment guide for a platform."""
+    st.markdown("""
+    <div style="margin-bottom: 2rem;">
+        <h3 style="color: #ffffff; margin-bottom: 1rem;">🚢 Deployment Assistant</h3>
+        <p style="color: #e2e8f0; margin-bottom: 1.5rem;">
+            Get deployment configurations and instructions for major cloud platforms.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
 
-        @keyframes slideInFade {
-            from {
-                opacity: 0;
-                transform: translateY(30px) scale(0.95);
-            }
-            to {
-                opacity: 1;
-                transform: translateY(0) scale(1);
-            }
-        }
+    deployment_platform = st.selectbox(
+        "Select your deployment platform:",
+        [
+            "🌐 Streamlit Cloud",
+            "☁️ Heroku",
+            "🐳 Docker",
+            "☁️ AWS",
+            "🔵 Google Cloud",
+            "🌥️ Azure",
+            "🔥 PythonAnywhere",
+            "⚡ Railway"
+        ],
+        key="deployment_platform"
+    )
 
-        /* Dark Theme - Chat Messages */
-        .chat-message {
-            padding: 1.2rem;
-            border-radius: 18px;
-            margin: 0.7rem 0;
-            animation: slideIn 0.3s ease-out;
-            font-size: 1rem;
-            line-height: 1.6;
-        }
+    if st.button("📋 Get Deployment Guide", type="primary"):
+        deployment_output = st.empty()
+        run_llm_task(
+            generate_deployment_guide,
+            (deployment_platform, temperature, max_tokens),
+            lambda text: render_result_card(deployment_output, text),
+            stream=stream_responses,
+            spinner_text=f"Generating {deployment_platform} deployment guide..."
+        )
 
-        .chat-user {
-            background: linear-gradient(135deg, #2d3748 0%, #1a202c 100%);
-            margin-left: 2rem;
-            border-left: 5px solid #ff9a9e;
-            color: #ffffff;
-            font-weight: 500;
-        }
+@st.fragment
+@profiled_fragment("mode: API Configuration")
+def render_api_configuration_mode(temperature, max_tokens, stream_responses):
+    """API Configuration: set the session's API key and show the startup profile."""
+    # API Configuration Section
+    st.markdown("""
+    <div style="background: rgba(26, 32, 44, 0.8); padding: 2rem; border-radius: 15px; border: 1px solid rgba(255, 154, 158, 0.3); margin: 1rem 0;">
+        <h3 style="color: #ffffff; margin-top: 0;">🚀 Setup Your OpenAI API Key</h3>
+    </div>
+    """, unsafe_allow_html=True)
 
-        .chat-assistant {
-            background: linear-gradient(135deg, #2d3748 0%, #1a202c 100%);
-            margin-right: 2rem;
-            border-left: 5px solid #fecfef;
-            color: #ffffff;
-            font-weight: 500;
-        }
+    st.markdown("""
+        <div style="margin: 1.5rem 0;">
+            <h4 style="color: #ff9a9e;">📋 Step 1: Get Your API Key</h4>
+            <p style="color: #e2e8f0; margin-bottom: 1rem;">
+                🌐 Visit: <a href="https://platform.openai.com/api-keys" style="color: #ff9a9e; text-decoration: none;" target="_blank">https://platform.openai.com/api-keys</a>
+            </p>
+            <ol style="color: #e2e8f0; line-height: 1.6;">
+                <li>🔐 Sign up or log in to your OpenAI account</li>
+                <li>🗝️ Navigate to "API Keys" section</li>
+                <li>➕ Click "Create new secret key"</li>
+                <li>📋 Copy the generated key (format: <code>sk-...</code>)</li>
+                <li>💾 Save it securely in a password manager</li>
+            </ol>
+        </div>
+        """, unsafe_allow_html=True)
 
-        @keyframes slideIn {
-            from {
-                opacity: 0;
-                transform: translateY(20px);
-            }
-            to {
-                opacity: 1;
-                transform: translateY(0);
-            }
-        }
+    st.markdown("""
+        <div style="margin: 1.5rem 0;">
+            <h4 style="color: #fecfef;">⚙️ Step 2: Configure StreamSage</h4>
+            <p style="color: #e2e8f0; margin-bottom: 1rem;">
+            <!-- API Key Input Form -->
+            <div style="background: rgba(26, 32, 44, 0.8); padding: 1.5rem; border-radius: 12px; border: 1px solid rgba(255, 154, 158, 0.2); margin: 1rem 0;">
+                <h5 style="color: #ffffff; margin-top: 0;">🔑 Enter Your API Key</h5>
+                <p style="color: #e2e8f0; margin-bottom: 1rem; font-size: 0.9rem;">
+                    Paste your OpenAI API key below and we'll configure it automatically:
+                </p>
+            </div>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
 
-        /* Premium Typography with Advanced Effects */
-        .main-title {
-            background:
-                linear-gradient(135deg, #ff9a9e 0%, #fecfef 25%, #ff6b9d 50%, #c44569 75%, #ff9a9e 100%);
-            background-size: 300% 300%;
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-            font-size: 3.5rem;
-            font-weight: 900;
-            text-align: center;
-            margin-bottom: 2.5rem;
-            animation: titleGlow 4s ease-in-out infinite;
-            letter-spacing: 2px;
-            text-shadow: 0 0 40px rgba(255, 154, 158, 0.5);
-            position: relative;
-        }
+    # API Key Input Section
+    st.markdown("""
+    <div style="background: rgba(26, 32, 44, 0.8); padding: 2rem; border-radius: 15px; border: 1px solid rgba(255, 154, 158, 0.3); margin: 1rem 0;">
+        <h4 style="color: #ffffff; margin-top: 0;">🔑 API Key Configuration</h4>
+    """, unsafe_allow_html=True)
 
-        .main-title::after {
-            content: '';
-            position: absolute;
-            bottom: -10px;
-            left: 50%;
-            transform: translateX(-50%);
-            width: 200px;
-            height: 3px;
-            background: linear-gradient(90deg, transparent, #ff9a9e, #fecfef, #ff9a9e, transparent);
-            border-radius: 3px;
-            animation: underlineGlow 4s ease-in-out infinite;
-        }
+    col1, col2 = st.columns([2, 1])
 
-        /* Premium Loading Animation */
-        .typing-indicator {
-            display: inline-block;
-            width: 24px;
-            height: 24px;
-            border-radius: 50%;
-            background:
-                radial-gradient(circle, #ff9a9e 0%, #fecfef 50%, #ff6b9d 100%);
-            animation: premiumPulse 2s infinite;
-            position: relative;
-        }
+    with col1:
+        api_key_input = st.text_input(
+            "🔑 OpenAI API Key",
+            type="password",
+            placeholder="sk-your-openai-api-key-here",
+            help="Enter your OpenAI API key (starts with 'sk-')",
+            key="api_config_input"
+        )
 
-        .typing-indicator::after {
-            content: '';
-            position: absolute;
-            top: -3px;
-            left: -3px;
-            right: -3px;
-            bottom: -3px;
-            border-radius: 50%;
-            border: 2px solid transparent;
-            border-top-color: #ff9a9e;
-            animation: spin 1s linear infinite;
-        }
+    with col2:
+        if st.button("💾 Use This API Key", help="Use API key for this session", use_container_width=True, key="api_config_save"):
+            if api_key_input and api_key_input.startswith("sk-"):
+                try:
+                    # Store API key in session state for this session
+                    st.session_state.user_api_key = api_key_input
+
+                    # Check for placeholder text
+                    placeholder_texts = [
+                        "your-openai-api-key-here",
+                        "sk-your-actual-openai-api-key-here",
+                        "your-ope************here",
+                        "your-api-key-here"
+                    ]
+
+                    if any(placeholder in api_key_input for placeholder in placeholder_texts):
+                        st.error("❌ **Please enter a real API key, not placeholder text.**")
+                    else:
+                        st.success("✅ **API Key set for this session!**")
+                        st.info("🔄 **The app will now restart with your API key.**")
+                        st.rerun()  # Restart the app with the new API key
+
+                except Exception as e:
+                    st.error(f"❌ **Error setting API key:** {str(e)}")
+            elif api_key_input and not api_key_input.startswith("sk-"):
+                st.error("❌ **Invalid API key format.** API keys should start with 'sk-'")
+            else:
+                st.warning("⚠️ **Please enter your API key first.**")
 
-        @keyframes titleGlow {
-            0%, 100% {
-                background-position: 0% 50%;
-                filter: brightness(1);
-            }
-            50% {
-                background-position: 100% 50%;
-                filter: brightness(1.2);
-            }
-        }
+    with col2:
+        if st.button("🧪 Test API Key", help="Test if your API key works", use_container_width=True, key="api_config_test"):
+            if api_key_input and api_key_input.startswith("sk-"):
+                with st.spinner("Testing API key..."):
+                    try:
+                        # Try a simple API call with the provided key (no retries, so
+                        # rate limits are reported straight away)
+                        test_reply = request_chat_completion(
+                            [{"role": "user", "content": "Hello"}],
+                            max_tokens=5,
+                            model="gpt-3.5-turbo",
+                            api_key=api_key_input,
+                            max_retries=0
+                        )
+
+                        if test_reply:
+                            st.success("✅ **API key is valid!** Your key works correctly.")
+                            st.info("💡 **Tip:** Click 'Use This API Key' to start using it in this session.")
+                        else:
+                            st.error("❌ **API key accepted but returned empty response.**")
+                            st.warning("This might indicate account issues or billing problems.")
+
+                    except Exception as test_error:
+                        status_code = getattr(test_error, "status_code", None)
+                        if status_code == 401:
+                            st.error("❌ **Invalid API key.** Please check your key and try again.")
+                        elif status_code == 429:
+                            st.warning("⚠️ **API key valid but rate limited.** Try again in a moment.")
+                        elif status_code == 402:
+                            st.error("❌ **Payment required.** Please check your OpenAI billing.")
+                        else:
+                            st.error(f"❌ **API Error:** {str(test_error)}")
+            else:
+                st.warning("⚠️ **Please enter a valid API key first.** (should start with 'sk-')")
 
-        @keyframes underlineGlow {
-            0%, 100% {
-                opacity: 0.5;
-                box-shadow: 0 0 20px rgba(255, 154, 158, 0.3);
-            }
-            50% {
-                opacity: 1;
-                box-shadow: 0 0 40px rgba(255, 154, 158, 0.8);
-            }
-        }
+        if st.button("📋 Show Env Command", help="Show environment variable command (alternative method)", use_container_width=True, key="api_config_manual"):
+            if api_key_input and api_key_input.startswith("sk-"):
+                st.info("🔧 **Alternative: Run this command in your terminal for permanent setup:**")
+                st.code(f'export OPENAI_API_KEY="{api_key_input}"', language="bash")
+                st.success("✅ **Command ready! This sets up the API key permanently.**")
+            else:
+                st.warning("⚠️ **Please enter your API key first to generate the command.**")
 
-        @keyframes premiumPulse {
-            0%, 100% {
-                opacity: 0.6;
-                transform: scale(0.9);
-            }
-            50% {
-                opacity: 1;
-                transform: scale(1.1);
-            }
-        }
+    st.markdown("""
+        <div style="margin: 1.5rem 0;">
+            <h4 style="color: #ff6b9d;">🔧 Alternative: Environment Variable</h4>
+            <p style="color: #e2e8f0;">
+                For permanent setup, set the environment variable:
+            </p>
+            <code style="background: rgba(0,0,0,0.3); color: #ffffff; padding: 0.5rem; border-radius: 8px; display: block; margin: 0.5rem 0;">
+                export OPENAI_API_KEY="sk-your-actual-api-key-here"
+            </code>
+        </div>
+        """, unsafe_allow_html=True)
 
-        @keyframes spin {
-            0% { transform: rotate(0deg); }
-            100% { transform: rotate(360deg); }
-        }
+    st.markdown("""
+        <div style="margin: 1.5rem 0; padding: 1rem; background: rgba(255, 154, 158, 0.1); border-radius: 10px; border-left: 4px solid #ff9a9e;">
+            <h4 style="color: #ff9a9e; margin-top: 0;">💡 Session vs Permanent</h4>
+            <p style="color: #e2e8f0; margin-bottom: 1rem;">
+                Choose your preferred setup method:
+            </p>
+            <ul style="color: #e2e8f0; margin: 0.5rem 0 0 0;">
+                <li><strong>🚀 Session Only:</strong> Enter API key each time you open the app</li>
+                <li><strong>💾 Permanent:</strong> Set environment variable for automatic detection</li>
+            </ul>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
 
-        /* Dark Theme - Expander Styling */
-        .streamlit-expander {
-            background: rgba(26, 32, 44, 0.9);
-            backdrop-filter: blur(5px);
-            border-radius: 10px;
-            border: 1px solid rgba(255, 154, 158, 0.2);
-        }
+    st.info("🔑 **Once configured, restart your Streamlit app to apply the new API key.**")
 
-        /* Premium Scrollbar */
-        ::-webkit-scrollbar {
-            width: 12px;
-        }
+    # Add a simple test section
+    st.markdown("""
+    <div style="margin-top: 2rem; padding: 1rem; background: rgba(254, 207, 239, 0.1); border-radius: 10px; border-left: 4px solid #fecfef;">
+        <h4 style="color: #fecfef; margin-top: 0;">🧪 Test Your Setup</h4>
+        <p style="color: #e2e8f0; margin-bottom: 1rem;">
+            You can test your API key right here before using it in this session:
+        </p>
+        <ol style="color: #e2e8f0; line-height: 1.6;">
+            <li>🔑 Enter your API key in the text box above</li>
+            <li>🧪 Click "Test API Key" to verify it works</li>
+            <li>💾 Click "Use This API Key" to start using it</li>
+            <li>✅ Enjoy the full StreamSage experience!</li>
+        </ol>
+        <p style="color: #ff9a9e; margin-top: 1rem; font-size: 0.9rem;">
+            💡 <strong>Pro Tip:</strong> Use the "Test API Key" feature to verify your key works before activating it for this session!
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
 
-        ::-webkit-scrollbar-track {
-            background: rgba(26, 32, 44, 0.3);
-            border-radius: 12px;
-            border: 1px solid rgba(255, 154, 158, 0.1);
-        }
+    with st.expander("⏱️ Startup profile", expanded=False):
+        render_startup_profile()
+
+@st.fragment
+@profiled_fragment("mode: Latest Updates")
+def render_latest_updates_mode(temperature, max_tokens, stream_responses):
+    """Latest Updates: browse and search the Streamlit release notes."""
+    # Enhanced Updates Section with Organized Display
+    display_streamlit_updates()
+
+def render_rerun_profile_panel():
+    """Debug panel: section timings of this session's recent runs (the current run is logged when it ends)."""
+    history = list(st.session_state.get("rerun_profiles", []))
+    if not history:
+        st.caption("No completed runs profiled yet; interact with the app and reopen this panel.")
+        return
+    last = history[-1]
+    sent = f"{last['bytes']:,} bytes in {last['messages']} messages" if last["bytes"] is not None else "bytes not counted"
+    st.caption(
+        f"Last run ({last['kind']}, {last['ts']}): {last['wall_ms']:.1f} ms wall, {last['cpu_ms']:.1f} ms CPU, "
+        f"{sent} · log: {PROFILE_LOG_PATH}"
+    )
+    st.table([
+        {"section": sec["name"], "wall ms": round(sec["wall_ms"], 1), "CPU ms": round(sec["cpu_ms"], 1), "bytes": sec["bytes"]}
+        for sec in last["sections"]
+    ])
+    if last["llm_calls"]:
+        st.table([
+            {"LLM call": call["name"], "wall ms": round(call["wall_ms"], 1), "CPU ms": round(call["cpu_ms"], 1), "cache": call["cache"]}
+            for call in last["llm_calls"]
+        ])
+    st.table([
+        {"run": run["ts"][11:], "kind": run["kind"], "wall ms": round(run["wall_ms"], 1),
+         "CPU ms": round(run["cpu_ms"], 1), "bytes": run["bytes"], "LLM calls": len(run["llm_calls"])}
+        for run in reversed(history)
+    ])
+
+def show_earlier_chat_messages():
+    """Pager callback: reveal one more page of older chat messages."""
+    st.session_state.chat_visible_count = st.session_state.get("chat_visible_count", CHAT_PAGE_SIZE) + CHAT_PAGE_SIZE
+
+@st.fragment
+@profiled_fragment("mode: Chat with StreamSage")
+def render_chat_view(temperature, max_tokens, stream_responses):
+    """
+    Chat input and history, isolated in a fragment.
 
-        ::-webkit-scrollbar-thumb {
-            background:
-                linear-gradient(135deg, #ff9a9e 0%, #fecfef 50%, #ff6b9d 100%);
-            border-radius: 12px;
-            border: 2px solid rgba(255, 255, 255, 0.1);
-            box-shadow: inset 0 1px 0 rgba(255, 255, 255, 0.2);
-        }
+    A chat turn reruns only this fragment, and only the newest CHAT_PAGE_SIZE
+    messages are drawn (older ones sit behind a "load earlier" pager), so the
+    cost of a turn does not grow with the length of the conversation.
+    """
+    # Enhanced chat input section
+    st.markdown('<div class="content-card">', unsafe_allow_html=True)
+    chat_input = st.chat_input("💬 Ask me anything about Streamlit...", key="chat_input")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    if chat_input:
+        # A new turn goes back to showing just the latest page
+        st.session_state.chat_visible_count = CHAT_PAGE_SIZE
+
+    if chat_input and not stream_responses:
+        latest_updates = load_streamlit_updates()
+        with profile_llm_call("on_chat_submit", no_call="answered locally"):
+            on_chat_submit(chat_input, latest_updates, temperature, max_tokens)
 
-        ::-webkit-scrollbar-thumb:hover {
-            background:
-                linear-gradient(135deg, #fecfef 0%, #ff9a9e 50%, #ff6b9d 100%);
-            box-shadow:
-                inset 0 1px 0 rgba(255, 255, 255, 0.3),
-                0 0 20px rgba(255, 154, 158, 0.5);
-            transform: scale(1.1);
-        }
+    # Enhanced chat history display
+    st.markdown("""
+    <div class="content-card" style="max-height: 600px; overflow-y: auto;">
+    """, unsafe_allow_html=True)
 
-        /* Premium Animations and Effects */
-        @keyframes fadeInUp {
-            from {
-                opacity: 0;
-                transform: translateY(40px);
-            }
-            to {
-                opacity: 1;
-                transform: translateY(0);
-            }
-        }
+    history = st.session_state.history
+    visible_count = st.session_state.get("chat_visible_count", CHAT_PAGE_SIZE)
+    hidden_count = max(0, len(history) - visible_count)
+    if hidden_count:
+        st.button(
+            f"⬆️ Load earlier messages ({hidden_count} more)",
+            key="chat_load_earlier",
+            on_click=show_earlier_chat_messages,
+        )
 
-        @keyframes glow {
-            0%, 100% {
-                box-shadow: 0 0 20px rgba(255, 154, 158, 0.3);
-            }
-            50% {
-                box-shadow: 0 0 40px rgba(255, 154, 158, 0.6);
-            }
-        }
+    for message in history[hidden_count:]:
+        with st.chat_message(message["role"], avatar=get_chat_avatar(message["role"])):
+            render_chat_bubble(st, message["role"], message["content"])
+
+    if chat_input and stream_responses:
+        # Show the new turn right away and stream the reply into its bubble
+        with st.chat_message("user", avatar=get_chat_avatar("user")):
+            render_chat_bubble(st, "user", chat_input.strip().lower())
+        with st.chat_message("assistant", avatar=get_chat_avatar("assistant")):
+            reply_placeholder = st.empty()
+
+        streamed = {"text": "", "rendered_at": 0.0}
+
+        def on_token(delta):
+            streamed["text"] += delta
+            now = time.monotonic()
+            if now - streamed["rendered_at"] >= STREAM_RENDER_INTERVAL:
+                render_chat_bubble(reply_placeholder, "assistant", streamed["text"] + " ▌")
+                streamed["rendered_at"] = now
+
+        latest_updates = load_streamlit_updates()
+        with profile_llm_call("on_chat_submit", no_call="answered locally"):
+            reply = on_chat_submit(chat_input, latest_updates, temperature, max_tokens, on_token=on_token)
+        if reply:
+            render_chat_bubble(reply_placeholder, "assistant", reply)
+        else:
+            reply_placeholder.empty()
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
+MODE_VIEWS = {
+    "Chat with StreamSage": render_chat_view,
+    "Code Generator": render_code_generator_mode,
+    "Project Analyzer": render_project_analyzer_mode,
+    "Performance Profiler": render_performance_profiler_mode,
+    "Security Scanner": render_security_scanner_mode,
+    "Full Audit": render_full_audit_mode,
+    "Template Library": render_template_library_mode,
+    "Deployment Assistant": render_deployment_assistant_mode,
+    "API Configuration": render_api_configuration_mode,
+    "Latest Updates": render_latest_updates_mode,
+}
 
-        /* Enhanced Status Bar */
-        .status-metric {
-            animation: fadeInUp 0.6s ease-out;
-            transition: all 0.3s ease;
-        }
+def main():
+    """
+    Display Streamlit updates and handle the chat interface.
+    """
+    profile_checkpoint("definitions: modes")
+    initialize_session_state()
+    get_updates_refresher()
 
-        .status-metric:hover {
-            transform: translateY(-2px);
-            animation: glow 2s ease-in-out infinite;
-        }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+    if not st.session_state.history:
+        initial_bot_message = "Hello! How can I assist you with Streamlit today?"
+        st.session_state.history.append({"role": "assistant", "content": initial_bot_message})
+        st.session_state.conversation_history = initialize_conversation()
 
     # Enhanced sidebar header
     st.sidebar.markdown("""
@@ -1444,11 +4363,10 @@ def main():
     """, unsafe_allow_html=True)
 
     # Load and display sidebar avatar with enhanced styling
-    img_path = "imgs/sidebar_streamsage.png"
-    img_base64 = img_to_base64(img_path)
-    if img_base64:
+    img_uri = img_to_data_uri(SIDEBAR_LOGO_PATH, SIDEBAR_LOGO_WIDTH)
+    if img_uri:
         st.sidebar.markdown(
-            f'<div style="text-align: center; margin: 1rem 0;"><img src="data:image/png;base64,{img_base64}" class="avatar-glow" style="width: 120px; height: 120px;"></div>',
+            f'<div style="text-align: center; margin: 1rem 0;"><img src="{img_uri}" class="avatar-glow" style="width: {SIDEBAR_LOGO_WIDTH}px; height: {SIDEBAR_LOGO_WIDTH}px;"></div>',
             unsafe_allow_html=True,
         )
     else:
@@ -1474,6 +4392,7 @@ def main():
                 "Project Analyzer",
                 "Performance Profiler",
                 "Security Scanner",
+                "Full Audit",
                 "Template Library",
                 "Deployment Assistant"
             ].index(st.session_state.mode_selection)
@@ -1490,6 +4409,7 @@ def main():
             "Project Analyzer",
             "Performance Profiler",
             "Security Scanner",
+            "Full Audit",
             "Template Library",
             "Deployment Assistant"
         ],
@@ -1529,6 +4449,12 @@ def main():
         step=100,
         help="Maximum length of AI responses"
     )
+
+    stream_responses = st.sidebar.checkbox(
+        "⚡ Stream responses",
+        value=True,
+        help="Show AI responses token by token as they are generated"
+    )
     
     st.sidebar.markdown('<div class="sidebar-section">', unsafe_allow_html=True)
     
@@ -1632,11 +4558,10 @@ def main():
     """, unsafe_allow_html=True)
 
     # Load and display footer image with enhanced styling
-    img_path = "imgs/stsidebarimg.png"
-    img_base64 = img_to_base64(img_path)
-    if img_base64:
+    img_uri = img_to_data_uri(SIDEBAR_FOOTER_IMAGE_PATH, SIDEBAR_FOOTER_IMAGE_WIDTH)
+    if img_uri:
         st.sidebar.markdown(
-            f'<div style="text-align: center; margin-top: 1rem;"><img src="data:image/png;base64,{img_base64}" class="avatar-glow" style="width: 80px; height: 80px; border-radius: 10px;"></div>',
+            f'<div style="text-align: center; margin-top: 1rem;"><img src="{img_uri}" class="avatar-glow" style="width: {SIDEBAR_FOOTER_IMAGE_WIDTH}px; height: {SIDEBAR_FOOTER_IMAGE_WIDTH}px; border-radius: 10px;"></div>',
             unsafe_allow_html=True,
         )
     else:
@@ -1647,391 +4572,17 @@ def main():
         </div>
         """, unsafe_allow_html=True)
 
-    if mode == "Chat with StreamSage":
-        # Enhanced chat input section
-        st.markdown('<div class="content-card">', unsafe_allow_html=True)
-        chat_input = st.chat_input("💬 Ask me anything about Streamlit...", key="chat_input")
-        st.markdown('</div>', unsafe_allow_html=True)
-
-        if chat_input:
-            latest_updates = load_streamlit_updates()
-            on_chat_submit(chat_input, latest_updates, temperature, max_tokens)
-
-        # Enhanced chat history display
-        st.markdown("""
-        <div class="content-card" style="max-height: 600px; overflow-y: auto;">
-        """, unsafe_allow_html=True)
-
-        for message in st.session_state.history[-NUMBER_OF_MESSAGES_TO_DISPLAY:]:
-            role = message["role"]
-            avatar_image = "imgs/avatar_streamly.png" if role == "assistant" else "imgs/stuser.png" if role == "user" else None
-
-            # Use fallback avatar if image doesn't exist
-            if avatar_image and not os.path.exists(avatar_image):
-                avatar_display = get_avatar_emoji(role)
-            else:
-                avatar_display = avatar_image
-
-            with st.chat_message(role, avatar=avatar_display):
-                if role == "user":
-                    st.markdown(f'<div class="chat-message chat-user">👤 {message["content"]}</div>',
-                               unsafe_allow_html=True)
-                else:
-                    st.markdown(f'<div class="chat-message chat-assistant">🤖 {message["content"]}</div>',
-                               unsafe_allow_html=True)
+    profile_checkpoint("sidebar")
+    # Each mode is a fragment: interacting with it reruns only that mode, not the
+    # header, sidebar and theme
+    MODE_VIEWS[mode](temperature, max_tokens, stream_responses)
 
-        st.markdown('</div>', unsafe_allow_html=True)
-
-    elif mode == "Code Generator":
-        code_prompt = st.text_area(
-            "Describe the Streamlit app you want to create:",
-            height=100,
-            placeholder="e.g., Create a data visualization dashboard with charts, filters, and interactive widgets...",
-            key="code_generator_input"
-        )
-
-        if st.button("🎯 Generate Code", type="primary"):
-            if code_prompt.strip():
-                with st.spinner("Generating your Streamlit application..."):
-                    generated_code = generate_streamlit_app(code_prompt, temperature, max_tokens)
-                    if generated_code:
-                        st.code(generated_code, language="python")
-
-                        # Export functionality
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            export_code_to_file(generated_code)
-                        with col2:
-                            if st.button("📋 Copy to Clipboard", key="copy_code"):
-                                st.code(generated_code, language="python")
-                                st.success("Code copied!")
-
-    elif mode == "Project Analyzer":
-        analysis_input = st.text_area(
-            "Paste your Streamlit code for analysis:",
-            height=150,
-            placeholder="Paste your Streamlit code here for comprehensive analysis...",
-            key="project_analyzer_input"
-        )
-
-        if st.button("🔍 Analyze Project", type="primary"):
-            if analysis_input.strip():
-                with st.spinner("Analyzing your project..."):
-                    analysis_result = analyze_streamlit_project(analysis_input, temperature, max_tokens)
-                    if analysis_result:
-                        st.markdown(f"""
-                        <div style="color: #ffffff; line-height: 1.6; white-space: pre-line; background: rgba(26, 32, 44, 0.7); padding: 2rem; border-radius: 15px; border: 1px solid rgba(255, 154, 158, 0.2);">
-                            {analysis_result}
-                        </div>
-                        """, unsafe_allow_html=True)
-
-    elif mode == "Performance Profiler":
-        st.markdown("""
-        <div style="margin-bottom: 2rem;">
-            <h3 style="color: #ffffff; margin-bottom: 1rem;">⚡ Performance Profiler</h3>
-            <p style="color: #e2e8f0; margin-bottom: 1.5rem;">
-                Analyze your Streamlit app's performance and get optimization recommendations.
-            </p>
-        </div>
-        """, unsafe_allow_html=True)
-
-        profile_input = st.text_area(
-            "Paste your Streamlit code for performance analysis:",
-            height=120,
-            placeholder="Paste your Streamlit code to analyze performance bottlenecks and optimization opportunities...",
-            key="performance_input"
-        )
-
-        if st.button("🔍 Profile Performance", type="primary"):
-            if profile_input.strip():
-                with st.spinner("Analyzing performance characteristics..."):
-                    profile_result = analyze_performance(profile_input, temperature, max_tokens)
-                    if profile_result:
-                        st.markdown(f"""
-                        <div style="color: #ffffff; line-height: 1.6; white-space: pre-line; background: rgba(26, 32, 44, 0.7); padding: 2rem; border-radius: 15px; border: 1px solid rgba(255, 154, 158, 0.2);">
-                            {profile_result}
-                        </div>
-                        """, unsafe_allow_html=True)
-
-    elif mode == "Security Scanner":
-        st.markdown("""
-        <div style="margin-bottom: 2rem;">
-            <h3 style="color: #ffffff; margin-bottom: 1rem;">🔒 Security Scanner</h3>
-            <p style="color: #e2e8f0; margin-bottom: 1.5rem;">
-                Scan your Streamlit application for security vulnerabilities and best practices.
-            </p>
-        </div>
-        """, unsafe_allow_html=True)
-
-        security_input = st.text_area(
-            "Paste your Streamlit code for security analysis:",
-            height=120,
-            placeholder="Analyze your code for security vulnerabilities, data exposure, and unsafe practices...",
-            key="security_input"
-        )
-
-        if st.button("🛡️ Scan Security", type="primary"):
-            if security_input.strip():
-                with st.spinner("Scanning for security issues..."):
-                    security_result = analyze_security(security_input, temperature, max_tokens)
-                    if security_result:
-                        st.markdown(f"""
-                        <div style="color: #ffffff; line-height: 1.6; white-space: pre-line; background: rgba(26, 32, 44, 0.7); padding: 2rem; border-radius: 15px; border: 1px solid rgba(255, 154, 158, 0.2);">
-                            {security_result}
-                        </div>
-                        """, unsafe_allow_html=True)
-
-    elif mode == "Template Library":
-        st.markdown("""
-        <div style="margin-bottom: 2rem;">
-            <h3 style="color: #ffffff; margin-bottom: 1rem;">📚 Template Library</h3>
-            <p style="color: #e2e8f0; margin-bottom: 1.5rem;">
-                Browse and customize pre-built Streamlit application templates.
-            </p>
-        </div>
-        """, unsafe_allow_html=True)
-
-        template_type = st.selectbox(
-            "Choose a template category:",
-            [
-                "📊 Data Dashboard",
-                "📈 Analytics Platform",
-                "🛒 E-commerce Site",
-                "📝 Blog/Content Manager",
-                "🎮 Game Dashboard",
-                "📱 Mobile-Responsive App",
-                "🔧 Admin Panel",
-                "📊 Business Intelligence"
-            ],
-            key="template_selector"
-        )
-
-        if st.button("🚀 Generate Template", type="primary"):
-            with st.spinner(f"Generating {template_type} template..."):
-                template_result = generate_template(template_type, temperature, max_tokens)
-                if template_result:
-                    st.code(template_result, language="python")
-
-                    # Export functionality
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        export_code_to_file(template_result, f"{template_type.replace(' ', '_').lower()}.py")
-                    with col2:
-                        if st.button("📋 Copy Template", key="copy_template"):
-                            st.success("Template copied!")
-
-    elif mode == "Deployment Assistant":
-        st.markdown("""
-        <div style="margin-bottom: 2rem;">
-            <h3 style="color: #ffffff; margin-bottom: 1rem;">🚢 Deployment Assistant</h3>
-            <p style="color: #e2e8f0; margin-bottom: 1.5rem;">
-                Get deployment configurations and instructions for major cloud platforms.
-            </p>
-        </div>
-        """, unsafe_allow_html=True)
-
-        deployment_platform = st.selectbox(
-            "Select your deployment platform:",
-            [
-                "🌐 Streamlit Cloud",
-                "☁️ Heroku",
-                "🐳 Docker",
-                "☁️ AWS",
-                "🔵 Google Cloud",
-                "🌥️ Azure",
-                "🔥 PythonAnywhere",
-                "⚡ Railway"
-            ],
-            key="deployment_platform"
-        )
-
-        if st.button("📋 Get Deployment Guide", type="primary"):
-            with st.spinner(f"Generating {deployment_platform} deployment guide..."):
-                deployment_result = generate_deployment_guide(deployment_platform, temperature, max_tokens)
-                if deployment_result:
-                    st.markdown(f"""
-                    <div style="color: #ffffff; line-height: 1.6; white-space: pre-line; background: rgba(26, 32, 44, 0.7); padding: 2rem; border-radius: 15px; border: 1px solid rgba(255, 154, 158, 0.2);">
-                        {deployment_result}
-                    </div>
-                    """, unsafe_allow_html=True)
-
-    elif mode == "API Configuration":
-        # API Configuration Section
-        st.markdown("""
-        <div style="background: rgba(26, 32, 44, 0.8); padding: 2rem; border-radius: 15px; border: 1px solid rgba(255, 154, 158, 0.3); margin: 1rem 0;">
-            <h3 style="color: #ffffff; margin-top: 0;">🚀 Setup Your OpenAI API Key</h3>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("""
-            <div style="margin: 1.5rem 0;">
-                <h4 style="color: #ff9a9e;">📋 Step 1: Get Your API Key</h4>
-                <p style="color: #e2e8f0; margin-bottom: 1rem;">
-                    🌐 Visit: <a href="https://platform.openai.com/api-keys" style="color: #ff9a9e; text-decoration: none;" target="_blank">https://platform.openai.com/api-keys</a>
-                </p>
-                <ol style="color: #e2e8f0; line-height: 1.6;">
-                    <li>🔐 Sign up or log in to your OpenAI account</li>
-                    <li>🗝️ Navigate to "API Keys" section</li>
-                    <li>➕ Click "Create new secret key"</li>
-                    <li>📋 Copy the generated key (format: <code>sk-...</code>)</li>
-                    <li>💾 Save it securely in a password manager</li>
-                </ol>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        st.markdown("""
-            <div style="margin: 1.5rem 0;">
-                <h4 style="color: #fecfef;">⚙️ Step 2: Configure StreamSage</h4>
-                <p style="color: #e2e8f0; margin-bottom: 1rem;">
-                <!-- API Key Input Form -->
-                <div style="background: rgba(26, 32, 44, 0.8); padding: 1.5rem; border-radius: 12px; border: 1px solid rgba(255, 154, 158, 0.2); margin: 1rem 0;">
-                    <h5 style="color: #ffffff; margin-top: 0;">🔑 Enter Your API Key</h5>
-                    <p style="color: #e2e8f0; margin-bottom: 1rem; font-size: 0.9rem;">
-                        Paste your OpenAI API key below and we'll configure it automatically:
-                    </p>
-                </div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-
-        # API Key Input Section
-        st.markdown("""
-        <div style="background: rgba(26, 32, 44, 0.8); padding: 2rem; border-radius: 15px; border: 1px solid rgba(255, 154, 158, 0.3); margin: 1rem 0;">
-            <h4 style="color: #ffffff; margin-top: 0;">🔑 API Key Configuration</h4>
-        """, unsafe_allow_html=True)
-
-        col1, col2 = st.columns([2, 1])
-
-        with col1:
-            api_key_input = st.text_input(
-                "🔑 OpenAI API Key",
-                type="password",
-                placeholder="sk-your-openai-api-key-here",
-                help="Enter your OpenAI API key (starts with 'sk-')",
-                key="api_config_input"
-            )
-
-        with col2:
-            if st.button("💾 Use This API Key", help="Use API key for this session", use_container_width=True, key="api_config_save"):
-                if api_key_input and api_key_input.startswith("sk-"):
-                    try:
-                        # Store API key in session state for this session
-                        st.session_state.user_api_key = api_key_input
-
-                        # Check for placeholder text
-                        placeholder_texts = [
-                            "your-openai-api-key-here",
-                            "sk-your-actual-openai-api-key-here",
-                            "your-ope************here",
-                            "your-api-key-here"
-                        ]
-
-                        if any(placeholder in api_key_input for placeholder in placeholder_texts):
-                            st.error("❌ **Please enter a real API key, not placeholder text.**")
-                        else:
-                            st.success("✅ **API Key set for this session!**")
-                            st.info("🔄 **The app will now restart with your API key.**")
-                            st.rerun()  # Restart the app with the new API key
-
-                    except Exception as e:
-                        st.error(f"❌ **Error setting API key:** {str(e)}")
-                elif api_key_input and not api_key_input.startswith("sk-"):
-                    st.error("❌ **Invalid API key format.** API keys should start with 'sk-'")
-                else:
-                    st.warning("⚠️ **Please enter your API key first.**")
-
-        with col2:
-            if st.button("🧪 Test API Key", help="Test if your API key works", use_container_width=True, key="api_config_test"):
-                if api_key_input and api_key_input.startswith("sk-"):
-                    with st.spinner("Testing API key..."):
-                        try:
-                            # Create a test client with the provided key
-                            test_client = openai.OpenAI(api_key=api_key_input)
-
-                            # Try a simple API call
-                            response = test_client.chat.completions.create(
-                                model="gpt-3.5-turbo",
-                                messages=[{"role": "user", "content": "Hello"}],
-                                max_tokens=5
-                            )
-
-                            if response.choices[0].message.content:
-                                st.success("✅ **API key is valid!** Your key works correctly.")
-                                st.info("💡 **Tip:** Click 'Use This API Key' to start using it in this session.")
-                            else:
-                                st.error("❌ **API key accepted but returned empty response.**")
-                                st.warning("This might indicate account issues or billing problems.")
-
-                        except Exception as test_error:
-                            if "401" in str(test_error):
-                                st.error("❌ **Invalid API key.** Please check your key and try again.")
-                            elif "429" in str(test_error):
-                                st.warning("⚠️ **API key valid but rate limited.** Try again in a moment.")
-                            elif "402" in str(test_error):
-                                st.error("❌ **Payment required.** Please check your OpenAI billing.")
-                            else:
-                                st.error(f"❌ **API Error:** {str(test_error)}")
-                else:
-                    st.warning("⚠️ **Please enter a valid API key first.** (should start with 'sk-')")
-
-            if st.button("📋 Show Env Command", help="Show environment variable command (alternative method)", use_container_width=True, key="api_config_manual"):
-                if api_key_input and api_key_input.startswith("sk-"):
-                    st.info("🔧 **Alternative: Run this command in your terminal for permanent setup:**")
-                    st.code(f'export OPENAI_API_KEY="{api_key_input}"', language="bash")
-                    st.success("✅ **Command ready! This sets up the API key permanently.**")
-                else:
-                    st.warning("⚠️ **Please enter your API key first to generate the command.**")
-
-        st.markdown("""
-            <div style="margin: 1.5rem 0;">
-                <h4 style="color: #ff6b9d;">🔧 Alternative: Environment Variable</h4>
-                <p style="color: #e2e8f0;">
-                    For permanent setup, set the environment variable:
-                </p>
-                <code style="background: rgba(0,0,0,0.3); color: #ffffff; padding: 0.5rem; border-radius: 8px; display: block; margin: 0.5rem 0;">
-                    export OPENAI_API_KEY="sk-your-actual-api-key-here"
-                </code>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        st.markdown("""
-            <div style="margin: 1.5rem 0; padding: 1rem; background: rgba(255, 154, 158, 0.1); border-radius: 10px; border-left: 4px solid #ff9a9e;">
-                <h4 style="color: #ff9a9e; margin-top: 0;">💡 Session vs Permanent</h4>
-                <p style="color: #e2e8f0; margin-bottom: 1rem;">
-                    Choose your preferred setup method:
-                </p>
-                <ul style="color: #e2e8f0; margin: 0.5rem 0 0 0;">
-                    <li><strong>🚀 Session Only:</strong> Enter API key each time you open the app</li>
-                    <li><strong>💾 Permanent:</strong> Set environment variable for automatic detection</li>
-                </ul>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-
-        st.info("🔑 **Once configured, restart your Streamlit app to apply the new API key.**")
-
-        # Add a simple test section
-        st.markdown("""
-        <div style="margin-top: 2rem; padding: 1rem; background: rgba(254, 207, 239, 0.1); border-radius: 10px; border-left: 4px solid #fecfef;">
-            <h4 style="color: #fecfef; margin-top: 0;">🧪 Test Your Setup</h4>
-            <p style="color: #e2e8f0; margin-bottom: 1rem;">
-                You can test your API key right here before using it in this session:
-            </p>
-            <ol style="color: #e2e8f0; line-height: 1.6;">
-                <li>🔑 Enter your API key in the text box above</li>
-                <li>🧪 Click "Test API Key" to verify it works</li>
-                <li>💾 Click "Use This API Key" to start using it</li>
-                <li>✅ Enjoy the full StreamSage experience!</li>
-            </ol>
-            <p style="color: #ff9a9e; margin-top: 1rem; font-size: 0.9rem;">
-                💡 <strong>Pro Tip:</strong> Use the "Test API Key" feature to verify your key works before activating it for this session!
-            </p>
-        </div>
-        """, unsafe_allow_html=True)
-
-    elif mode == "Latest Updates":
-        # Enhanced Updates Section with Organized Display
-        display_streamlit_updates()
+    if current_rerun_profile() is not None:
+        with st.expander("🐞 Rerun profile", expanded=False):
+            render_rerun_profile_panel()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        main()
+    finally:
+        finish_rerun_profile()
\ No newline at end of file
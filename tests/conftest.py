@@ -0,0 +1,52 @@
+"""
+Shared fixtures for the StreamSage tests.
+
+streamsage.py is a Streamlit script; importing it outside `streamlit run`
+defines everything without starting the UI (main() only runs as __main__).
+The environment below is set before that import so nothing touches the
+network, the tracked data files or the repository's .streamsage_cache/.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(REPO_ROOT, "tests", "fixtures")
+STATE_DIR = tempfile.mkdtemp(prefix="streamsage-tests-")
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-tests")
+os.environ["STREAMSAGE_RESPONSE_CACHE"] = os.path.join(STATE_DIR, "llm_responses.sqlite3")
+os.environ["STREAMSAGE_CHANGELOG_STATE"] = os.path.join(STATE_DIR, "changelog_state.json")
+os.environ["STREAMSAGE_DOCS_VERSION_STATE"] = os.path.join(STATE_DIR, "docs_version.json")
+os.environ["STREAMSAGE_PROFILE_LOG"] = os.path.join(STATE_DIR, "rerun_profile.jsonl")
+os.environ["STREAMSAGE_UPDATES_OVERLAY"] = os.path.join(STATE_DIR, "ingested_releases.json")
+os.environ["STREAMSAGE_UPDATES_REFRESH_SECONDS"] = "0"
+os.environ["STREAMSAGE_CHANGELOG_REFRESH_SECONDS"] = "0"
+
+sys.path.insert(0, REPO_ROOT)
+os.chdir(REPO_ROOT)
+
+
+@pytest.fixture(scope="session")
+def mock_openai():
+    """A local OpenAI-compatible endpoint; streamsage's clients are created against it."""
+    from mock_openai_server import MockOpenAIServer, MockSettings
+
+    server = MockOpenAIServer(settings=MockSettings(latency=0.2, tokens_per_second=0, reply_tokens=20)).start()
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="session")
+def streamsage():
+    import streamsage as module
+
+    return module
+
+
+def fixture_path(name):
+    return os.path.join(FIXTURES, name)
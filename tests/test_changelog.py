@@ -0,0 +1,51 @@
+from conftest import fixture_path
+
+
+def read_chunks(size=64):
+    """Stream the saved release notes page in small chunks, like iter_content would."""
+    with open(fixture_path("release_notes.html"), encoding="utf-8") as f:
+        text = f.read()
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_heading_with_permalink_anchor_is_parsed(streamsage):
+    releases = streamsage.parse_changelog_html(read_chunks())
+
+    assert [r["version"] for r in releases] == ["1.50.0", "1.49.1", "1.49.0", "1.48.0"]
+    newest = releases[0]
+    assert newest["date"] == "September 23, 2025"
+    assert set(newest["sections"]) == {"Highlights", "NotableChanges", "OtherChanges"}
+    notable = newest["sections"]["NotableChanges"]
+    assert len(notable) == 2
+    assert "Nested detail" in notable[1]["Description"]
+
+
+def test_issue_links_are_collected(streamsage):
+    newest = streamsage.parse_changelog_html(read_chunks())[0]
+    date_input = newest["sections"]["NotableChanges"][0]
+    assert date_input["Issues"] == ["#12050", "#11900"]
+    assert date_input["Description"].startswith("st.date_input accepts a format parameter")
+
+
+def test_cap_applies_to_first_ingestion(streamsage):
+    releases = streamsage.parse_changelog_html(read_chunks(), max_releases=2)
+    assert [r["version"] for r in releases] == ["1.50.0", "1.49.1"]
+
+
+def test_stop_version_backfills_past_the_cap(streamsage):
+    releases = streamsage.parse_changelog_html(read_chunks(), stop_version="1.48.0", max_releases=1)
+    assert [r["version"] for r in releases] == ["1.50.0", "1.49.1", "1.49.0"]
+
+
+def test_stop_version_stops_reading_chunks(streamsage):
+    consumed = []
+
+    def chunks():
+        for chunk in read_chunks():
+            consumed.append(chunk)
+            yield chunk
+
+    releases = streamsage.parse_changelog_html(chunks(), stop_version="1.49.1")
+
+    assert [r["version"] for r in releases] == ["1.50.0"]
+    assert len(consumed) < len(read_chunks())
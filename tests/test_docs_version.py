@@ -0,0 +1,98 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+SELECTOR_PAGE = b"""<html><body>
+<p>Upgrade from v0.84.0 to get the new caching commands.</p>
+<div class="versionSelector"><button aria-label="Select docs version"><span>v1.50.0</span></button></div>
+</body></html>"""
+NO_VERSION_PAGE = b"<html><body><p>API reference</p></body></html>"
+
+
+class DocsServer:
+    """Serve one page from localhost, honouring If-None-Match, and count the requests."""
+
+    def __init__(self, body):
+        self.body = body
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(dict(self.headers))
+                if self.headers.get("If-None-Match") == '"docs-v1"':
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(server.body)))
+                self.send_header("ETag", '"docs-v1"')
+                self.end_headers()
+                self.wfile.write(server.body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/library/api-reference"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def docs_server():
+    servers = []
+
+    def start(body):
+        servers.append(DocsServer(body))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def test_parse_docs_version_prefers_the_version_selector(streamsage):
+    assert streamsage.parse_docs_version(SELECTOR_PAGE.decode()) == "1.50.0"
+    assert streamsage.parse_docs_version("Upgrade from v0.84.0 or v1.2.0 today") is None
+    assert streamsage.parse_docs_version('{"streamlit_version": "1.49.1"}') == "1.49.1"
+
+
+def test_probe_caches_the_version_and_revalidates(streamsage, docs_server, tmp_path):
+    server = docs_server(SELECTOR_PAGE)
+    state_path = str(tmp_path / "docs_version.json")
+    probe = streamsage.DocsVersionProbe(url=server.url, ttl_seconds=3600, state_path=state_path)
+
+    assert probe.get() == "1.50.0"
+    assert probe.get() == "1.50.0"
+    assert len(server.requests) == 1
+
+    # A restarted process reuses the saved state and sends a conditional request once the TTL has passed
+    restarted = streamsage.DocsVersionProbe(url=server.url, ttl_seconds=0, state_path=state_path)
+    assert restarted.get() == "1.50.0"
+    assert server.requests[-1].get("If-None-Match") == '"docs-v1"'
+
+
+def test_probe_caches_a_missing_version_for_the_ttl(streamsage, docs_server, tmp_path):
+    server = docs_server(NO_VERSION_PAGE)
+    probe = streamsage.DocsVersionProbe(url=server.url, ttl_seconds=3600, state_path=str(tmp_path / "state.json"))
+
+    assert probe.get() is None
+    assert probe.get() is None
+    assert len(server.requests) == 1
+
+
+def test_probe_keeps_the_last_known_version_when_offline(streamsage, docs_server, tmp_path):
+    server = docs_server(SELECTOR_PAGE)
+    state_path = str(tmp_path / "docs_version.json")
+    assert streamsage.DocsVersionProbe(url=server.url, ttl_seconds=0, state_path=state_path).get() == "1.50.0"
+    server.stop()
+
+    offline = streamsage.DocsVersionProbe(url=server.url, ttl_seconds=3600, state_path=state_path)
+    offline.state["checked_at"] = 0
+    assert offline.get() == "1.50.0"
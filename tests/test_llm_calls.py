@@ -0,0 +1,215 @@
+import threading
+import time
+
+import pytest
+
+MESSAGES = [{"role": "system", "content": "You are terse."}, {"role": "user", "content": "Say hi."}]
+
+
+@pytest.fixture
+def llm(streamsage, mock_openai, monkeypatch):
+    """streamsage talking to the mock server, with error injection reset after each test."""
+    settings = mock_openai.settings
+    monkeypatch.setattr(settings, "error_rate", 0.0)
+    monkeypatch.setattr(settings, "latency", 0.2)
+    return streamsage
+
+
+def run_concurrently(count, target):
+    results = [None] * count
+
+    def run(index):
+        results[index] = target(index)
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def unique_messages(label):
+    return [MESSAGES[0], {"role": "user", "content": f"Say hi. [{label} {time.time_ns()}]"}]
+
+
+def test_identical_in_flight_calls_are_coalesced(llm, mock_openai):
+    messages = unique_messages("coalesce")
+    served = mock_openai.settings.requests_served
+    coalesced = llm.get_inflight_calls().stats()["coalesced"]
+
+    replies = run_concurrently(4, lambda _: llm.complete_chat(messages))
+
+    assert len(set(replies)) == 1 and replies[0]
+    assert mock_openai.settings.requests_served - served == 1
+    assert llm.get_inflight_calls().stats() == {"in_flight": 0, "coalesced": coalesced + 3}
+
+
+def test_coalesced_followers_receive_streamed_tokens(llm):
+    messages = unique_messages("stream")
+    streamed = [[] for _ in range(3)]
+
+    replies = run_concurrently(3, lambda index: llm.complete_chat(messages, on_token=streamed[index].append))
+
+    for reply, tokens in zip(replies, streamed):
+        assert "".join(tokens) == reply
+
+
+def test_calls_are_not_coalesced_across_api_keys(llm, mock_openai, monkeypatch):
+    messages = unique_messages("tenants")
+    served = mock_openai.settings.requests_served
+    flight_keys = []
+    original_run = llm.SingleFlight.run
+
+    def run(self, key, call, on_token=None):
+        flight_keys.append(key)
+        return original_run(self, key, call, on_token)
+
+    monkeypatch.setattr(llm.SingleFlight, "run", run)
+    for api_key in ("sk-tenant-a", "sk-tenant-b"):
+        monkeypatch.setattr(llm, "OPENAI_API_KEY", api_key)
+        llm.complete_chat(messages)
+
+    assert flight_keys[0] != flight_keys[1]
+    assert flight_keys[0].split(":")[1] == flight_keys[1].split(":")[1]
+    assert mock_openai.settings.requests_served - served == 2
+
+
+def test_persisted_replies_are_served_from_the_response_store(llm, mock_openai):
+    messages = unique_messages("persist")
+    first = llm.complete_chat(messages, persist=True)
+    served = mock_openai.settings.requests_served
+
+    assert llm.complete_chat(messages, persist=True) == first
+    assert mock_openai.settings.requests_served == served
+
+
+def test_rate_limited_requests_are_retried_then_raised(llm, mock_openai, monkeypatch):
+    monkeypatch.setattr(mock_openai.settings, "error_rate", 1.0)
+    monkeypatch.setattr(mock_openai.settings, "retry_after", 0.1)
+    monkeypatch.setattr(mock_openai.settings, "latency", 0.0)
+    served = mock_openai.settings.requests_served
+
+    with pytest.raises(llm.openai_module().RateLimitError):
+        llm.request_chat_completion(unique_messages("retry"), api_key="sk-retry", max_retries=2)
+
+    assert mock_openai.settings.requests_served - served == 3
+
+
+def test_token_budget_delays_requests(streamsage):
+    limiter = streamsage.KeyRateLimiter(requests_per_minute=1000, tokens_per_minute=6000)  # 100 tokens/s
+    limiter.acquire("session-a", 6000)
+
+    started = time.monotonic()
+    limiter.acquire("session-a", 30)
+    assert 0.2 <= time.monotonic() - started < 1.5
+
+
+def test_pause_holds_every_session(streamsage):
+    limiter = streamsage.KeyRateLimiter()
+    limiter.pause(0.3)
+
+    started = time.monotonic()
+    limiter.acquire("session-b", 1)
+    assert time.monotonic() - started >= 0.25
+
+
+def test_full_audit_runs_the_analyzers_concurrently(llm, mock_openai, monkeypatch):
+    monkeypatch.setattr(mock_openai.settings, "latency", 0.5)
+    code = f"import streamlit as st\nst.write('audit {time.time_ns()}')\n"
+    rendered = {}
+    calls = [
+        (analyzer, (code, llm.TEMPERATURE_DEFAULT, llm.MAX_TOKENS_DEFAULT),
+         lambda text, name=analyzer.__name__: rendered.__setitem__(name, text))
+        for analyzer in (llm.analyze_streamlit_project, llm.analyze_performance, llm.analyze_security)
+    ]
+
+    started = time.monotonic()
+    results = llm.run_llm_tasks(calls)
+    elapsed = time.monotonic() - started
+
+    assert all(results) and len(rendered) == 3
+    assert not any(result.startswith("Error") for result in results)
+    assert elapsed < 1.3  # three sequential calls would take at least 1.5 s
+
+
+class FakeRerun(BaseException):
+    """Stands in for Streamlit's RerunException / StopException (BaseException subclasses)."""
+
+
+def test_interrupted_leader_releases_its_flight(streamsage):
+    flight = streamsage.SingleFlight()
+    with pytest.raises(FakeRerun):
+        flight.run("key", lambda emit: (_ for _ in ()).throw(FakeRerun()))
+    assert flight.stats()["in_flight"] == 0
+
+    assert flight.run("key", lambda emit: "reply") == "reply"
+
+
+def test_followers_of_an_interrupted_leader_retry(streamsage):
+    flight = streamsage.SingleFlight()
+    leader_started = threading.Event()
+    follower_waiting = threading.Event()
+    calls = []
+
+    def leader_call(emit):
+        calls.append("leader")
+        leader_started.set()
+        follower_waiting.wait(5)
+        time.sleep(0.2)  # let the follower join the flight
+        raise FakeRerun()
+
+    def follower_call(emit):
+        calls.append("follower")
+        return "follower reply"
+
+    def leader():
+        with pytest.raises(FakeRerun):
+            flight.run("key", leader_call)
+
+    thread = threading.Thread(target=leader)
+    thread.start()
+    leader_started.wait(5)
+    follower_waiting.set()
+    reply = flight.run("key", follower_call)
+    thread.join(5)
+
+    assert reply == "follower reply"
+    assert calls == ["leader", "follower"]
+    assert flight.stats() == {"in_flight": 0, "coalesced": 1}
+
+
+class FakeClient:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_evicted_client_is_closed_after_its_last_lease(streamsage, monkeypatch):
+    registry = streamsage.OpenAIClientRegistry(max_clients=1)
+    monkeypatch.setattr(registry, "_create_client", lambda api_key: FakeClient())
+
+    with registry.lease("sk-a") as streaming:
+        with registry.lease("sk-b") as other:
+            assert registry.stats()["clients"] == 1  # sk-a fell off the LRU order
+            assert not streaming.closed
+        assert not other.closed
+        assert not streaming.closed
+    assert streaming.closed
+    assert registry.stats()["leased"] == 0
+
+
+def test_idle_clients_in_use_are_not_expired(streamsage, monkeypatch):
+    registry = streamsage.OpenAIClientRegistry(idle_seconds=0)
+    monkeypatch.setattr(registry, "_create_client", lambda api_key: FakeClient())
+
+    with registry.lease("sk-a") as client:
+        time.sleep(0.01)
+        with registry.lease("sk-b"):
+            assert not client.closed
+            assert registry.stats() == {"clients": 2, "leased": 2, "max_clients": registry.max_clients, "idle_seconds": 0}
+    with registry.lease("sk-b"):
+        pass
+    assert client.closed
@@ -0,0 +1,25 @@
+SLOW_APP = """import streamlit as st
+import pandas as pd
+
+df = pd.read_csv("data.csv")
+for i in range(len(df)):
+    st.write(df.iloc[i])
+"""
+
+
+def test_findings_prompt_stays_specific_to_the_source(streamsage, monkeypatch):
+    prompts = []
+
+    def fake_complete_chat(messages, *args, **kwargs):
+        prompts.append(messages[-1]["content"])
+        return "report"
+
+    monkeypatch.setattr(streamsage, "complete_chat", fake_complete_chat)
+    assert streamsage.find_performance_issues(SLOW_APP)
+
+    streamsage.analyze_performance(SLOW_APP + "# [bench-1]\n")
+    streamsage.analyze_performance(SLOW_APP + "# [bench-2]\n")
+
+    assert len(prompts) == 2
+    assert prompts[0] != prompts[1]
+    assert "pd.read_csv" in prompts[0]
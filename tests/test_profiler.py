@@ -0,0 +1,53 @@
+import logging
+
+
+class FakeContext:
+    def __init__(self, with_enqueue=True):
+        self.sent = []
+        if with_enqueue:
+            self._enqueue = self.sent.append
+
+
+class FakeMessage:
+    def ByteSize(self):
+        return 42
+
+
+def test_sent_messages_are_counted_for_the_active_profile(streamsage):
+    ctx = FakeContext()
+    profile = streamsage.RerunProfile("script", "session")
+    assert streamsage.count_sent_messages(ctx)
+    assert streamsage.count_sent_messages(ctx)  # installed once
+
+    ctx._streamsage_profile = profile
+    ctx._enqueue(FakeMessage())
+    assert len(ctx.sent) == 1
+    assert (profile.bytes_sent, profile.messages_sent) == (42, 1)
+
+
+def test_byte_counting_is_disabled_without_enqueue(streamsage, caplog):
+    ctx = FakeContext(with_enqueue=False)
+    with caplog.at_level(logging.WARNING):
+        assert not streamsage.count_sent_messages(ctx)
+        assert not streamsage.count_sent_messages(ctx)
+    assert len([r for r in caplog.records if "_enqueue" in r.getMessage()]) == 1
+
+    profile = streamsage.RerunProfile("script", "session")
+    profile.counts_bytes = False
+    profile.checkpoint("imports")
+    record = profile.finish()
+    assert record["bytes"] is None
+    assert record["sections"][0]["bytes"] is None
+
+
+def test_query_param_needs_the_allow_flag(streamsage, monkeypatch):
+    monkeypatch.setattr(streamsage, "PROFILE_ENABLED", False)
+    monkeypatch.setattr(streamsage.st, "query_params", {"profile": "1"})
+
+    monkeypatch.setattr(streamsage, "PROFILE_ALLOW_QUERY", False)
+    assert not streamsage.profiling_enabled()  # no flag in the environment and no secrets file
+
+    monkeypatch.setattr(streamsage, "PROFILE_ALLOW_QUERY", True)
+    assert streamsage.profiling_enabled()
+    monkeypatch.setattr(streamsage.st, "query_params", {})
+    assert not streamsage.profiling_enabled()
@@ -0,0 +1,37 @@
+from test_updates_repository import ingested_releases, make_repository
+
+
+def make_index(streamsage, tmp_path):
+    repository, _ = make_repository(streamsage, tmp_path)
+    repository.merge_releases(ingested_releases(streamsage))
+    return repository.snapshot().index
+
+
+def test_search_ranks_the_matching_entry_first(streamsage, tmp_path):
+    hits = make_index(streamsage, tmp_path).search("expander flickers")
+    assert hits[0]["section"] == "OtherChanges"
+    assert "expander" in hits[0]["fields"]["Description"]
+    assert [hit["score"] for hit in hits] == sorted((hit["score"] for hit in hits), reverse=True)
+
+
+def test_search_filters_by_section_and_version(streamsage, tmp_path):
+    index = make_index(streamsage, tmp_path)
+    hits = index.search("bug fix", 50, "OtherChanges", "1.49.1", "1.49.1")
+    assert hits and all(hit["section"] == "OtherChanges" and hit["version"] == "1.49.1" for hit in hits)
+
+
+def test_search_without_matches(streamsage, tmp_path):
+    index = make_index(streamsage, tmp_path)
+    assert index.search("zzqqxx") == []
+    assert index.search("   ") == []
+
+
+def test_chat_context_lists_relevant_entries(streamsage):
+    context = streamsage.retrieve_updates_context("How do I use caching with hash_funcs?")
+    lines = context.splitlines()
+    assert lines and all(line.startswith("- [") for line in lines)
+    assert len(lines) <= streamsage.CHAT_RETRIEVAL_TOP_K
+
+
+def test_chat_context_is_empty_for_small_talk(streamsage):
+    assert streamsage.retrieve_updates_context("hi, thanks!") == ""
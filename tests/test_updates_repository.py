@@ -0,0 +1,85 @@
+import json
+import os
+import shutil
+import threading
+import time
+
+from conftest import REPO_ROOT, fixture_path
+
+
+def make_repository(streamsage, tmp_path):
+    tracked = tmp_path / "streamlit_updates.json"
+    shutil.copy(os.path.join(REPO_ROOT, "data", "streamlit_updates.json"), tracked)
+    return streamsage.UpdatesRepository(path=str(tracked), overlay_path=str(tmp_path / "overlay.json")), tracked
+
+
+def ingested_releases(streamsage):
+    with open(fixture_path("release_notes.html"), encoding="utf-8") as f:
+        return streamsage.parse_changelog_html([f.read()], stop_version="1.28.0")
+
+
+def test_merge_writes_the_overlay_not_the_tracked_file(streamsage, tmp_path):
+    repository, tracked = make_repository(streamsage, tmp_path)
+    original = tracked.read_bytes()
+
+    added = repository.merge_releases(ingested_releases(streamsage))
+
+    assert added == ["1.50.0", "1.49.1", "1.49.0", "1.48.0"]
+    assert tracked.read_bytes() == original
+    assert repository.snapshot().versions[:2] == ["1.50.0", "1.49.1"]
+    assert next(iter(repository.snapshot().data["Highlights"])) == "Version 1.50.0"
+    assert repository.merge_releases(ingested_releases(streamsage)) == []
+
+
+def test_overlay_survives_a_restart(streamsage, tmp_path):
+    repository, tracked = make_repository(streamsage, tmp_path)
+    repository.merge_releases(ingested_releases(streamsage))
+
+    restarted = streamsage.UpdatesRepository(path=repository.path, overlay_path=repository.overlay_path)
+    assert restarted.snapshot().versions == repository.snapshot().versions
+    assert restarted.snapshot().counts == repository.snapshot().counts
+
+
+def test_overlay_releases_the_tracked_file_caught_up_with_are_ignored(streamsage, tmp_path):
+    repository, tracked = make_repository(streamsage, tmp_path)
+    repository.merge_releases(ingested_releases(streamsage))
+
+    data = json.loads(tracked.read_text())
+    data["Highlights"]["Version 1.49.1"] = {"Description": "Streamlit Version 1.49.1 is here!", "Version": "1.49.1"}
+    tracked.write_text(json.dumps(data))
+    assert repository.revalidate()
+
+    snapshot = repository.snapshot()
+    assert snapshot.versions[:2] == ["1.50.0", "1.49.1"]
+    assert "Version 1.49.0" not in snapshot.data["Highlights"]
+    assert "Version 1.49.1 (1.49.1)" not in snapshot.data["Highlights"]
+
+
+class CountingRefresher:
+    """Mixin counting refresh passes instead of touching the repository."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.passes = 0
+        self.refreshed = threading.Event()
+
+    def refresh_once(self):
+        self.passes += 1
+        self.refreshed.set()
+
+
+def test_zero_interval_refreshes_only_when_triggered(streamsage):
+    refresher_class = type("Refresher", (CountingRefresher, streamsage.UpdatesRefresher), {})
+    refresher = refresher_class(None, interval=0, changelog_interval=0).start()
+    try:
+        time.sleep(0.2)
+        assert refresher.passes == 0
+
+        refresher.trigger()
+        assert refresher.refreshed.wait(2)
+        time.sleep(0.2)
+        assert refresher.passes == 1
+    finally:
+        refresher.stop()
+    refresher._thread.join(2)
+    assert not refresher._thread.is_alive()
@@ -0,0 +1,53 @@
+import pytest
+
+from test_updates_repository import ingested_releases, make_repository
+
+
+@pytest.fixture
+def snapshot(streamsage, tmp_path):
+    repository, _ = make_repository(streamsage, tmp_path)
+    repository.merge_releases(ingested_releases(streamsage))
+    return repository.snapshot()
+
+
+@pytest.fixture
+def store(streamsage, snapshot, tmp_path):
+    store = streamsage.UpdatesSQLiteStore(str(tmp_path / "updates.sqlite3"))
+    assert store.sync(snapshot)
+    assert not store.sync(snapshot)
+    return store
+
+
+def test_store_counts_match_the_snapshot(streamsage, snapshot, store):
+    assert store.counts() == snapshot.counts
+    assert store.versions() == snapshot.versions
+    for section in streamsage.UPDATES_SECTIONS:
+        assert store.count(section, "1.50.0", "1.50.0") == len(store.items(section, "1.50.0", "1.50.0"))
+    assert store.count("NotableChanges", "1.50.0", "1.50.0") == 2
+    assert store.count("OtherChanges", "1.49.0", "1.50.0") == 2
+
+
+def test_fts_index_is_consistent(store):
+    store._conn.execute("INSERT INTO items_fts(items_fts) VALUES ('integrity-check')")
+
+
+@pytest.mark.parametrize("query, section, version", [
+    ("expander flickers", None, None),
+    ("caching", "NotableChanges", None),
+    ("bug fix", "OtherChanges", "1.49.1"),
+    ("version", "Highlights", "1.50.0"),
+])
+def test_store_search_matches_the_in_memory_index(snapshot, store, query, section, version):
+    expected = snapshot.index.search(query, 50, section, version, version)
+    hits = store.search(query, 50, section, version, version)
+
+    assert {(hit["section"], hit["name"]) for hit in hits} == {(hit["section"], hit["name"]) for hit in expected}
+    for hit in hits:
+        assert section is None or hit["section"] == section
+        assert version is None or hit["version"] == version
+
+
+def test_filtered_search_does_not_leak_other_sections(store):
+    # "section" appears in entry text; filters must apply to the column, not to matched text
+    hits = store.search("section", 50, "Highlights")
+    assert all(hit["section"] == "Highlights" for hit in hits)
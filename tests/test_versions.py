@@ -0,0 +1,36 @@
+import pytest
+
+
+@pytest.mark.parametrize("older, newer", [
+    ("1.9.0", "1.10.0"),
+    ("1.36.0rc1", "1.36.0"),
+    ("1.36.0a2", "1.36.0b1"),
+    ("1.28", "1.28.1"),
+])
+def test_version_key_orders_numerically(streamsage, older, newer):
+    assert streamsage.version_key(older) < streamsage.version_key(newer)
+
+
+@pytest.mark.parametrize("raw, canonical", [("1.28", "1.28.0"), ("v1.28.0", "1.28.0"), ("1.36.0-rc.1", "1.36.0rc1")])
+def test_format_version_is_canonical(streamsage, raw, canonical):
+    assert streamsage.format_version(streamsage.version_key(raw)) == canonical
+
+
+def test_entry_version_is_canonical_for_every_source(streamsage):
+    assert streamsage.entry_version("Version 1.28", {}) == "1.28.0"
+    assert streamsage.entry_version("Fix", {"Version": "1.30"}) == "1.30.0"
+    assert streamsage.entry_version("Fix", {}, "1.31") == "1.31.0"
+    assert streamsage.entry_version("Fix", {}) is None
+
+
+def test_release_index_range_queries(streamsage):
+    updates = {
+        "Highlights": {f"Version {version}": {"Version": version} for version in ("1.9", "1.10.0", "1.30.0", "1.36.0rc1")},
+        "NotableChanges": {"Faster": {"Version": "1.10"}},
+    }
+    releases = streamsage.ReleaseIndex(updates)
+
+    assert releases.newest_first() == ["1.36.0rc1", "1.30.0", "1.10.0", "1.9.0"]
+    assert [version for version, _ in releases.between("1.9")] == ["1.10.0", "1.30.0", "1.36.0rc1"]
+    assert [version for version, _ in releases.between("1.9", "1.30", include_start=True)] == ["1.9.0", "1.10.0", "1.30.0"]
+    assert {entry["name"] for entry in releases.changes("1.10")} == {"Version 1.10.0", "Faster"}